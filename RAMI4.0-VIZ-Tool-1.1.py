@@ -1,105 +1,35 @@
-import plotly.graph_objects as go
-
-def generate_ellipsoid1(a, b, c, angle_deg, x_center, y_center, z_center):
-
-
-    # Create a 3D surface plot using Plotly
-    ellipsoid1 = go.Surface(
-        x=X_shifted, y=Y_shifted, z=Z_shifted,
-        colorscale=[[0, 'rgb(180, 0, 0)'], [1, 'rgb(220, 20, 20)']],
-        showscale=False,
-        opacity=0.8,
-        lighting=dict(ambient=0.5, diffuse=0.5, roughness=0.1, specular=0.01, fresnel=0.01),
-        lightposition=dict(x=200, y=200, z=200)
-    )
-
-    return ellipsoid1
-
-def generate_ellipsoid2(a, b, c, angle_deg, x_center, y_center, z_center):
-    # Generate a grid of points
-    theta = np.linspace(0, 2 * np.pi, 100)
-    phi = np.linspace(0, np.pi, 100)
-    theta, phi = np.meshgrid(theta, phi)
-    X = a * np.sin(phi) * np.cos(theta)
-    Y = b * np.sin(phi) * np.sin(theta)
-    Z = c * np.cos(phi)
-
-    
-    # Shift the ellipsoid to the center
-    X_shifted = X + x_center
-    Y_shifted = Y_rot + y_center
-    Z_shifted = Z_rot + z_center
-
-    # Create a 3D surface plot using Plotly
-    ellipsoid2 = go.Surface(
-        x=X_shifted, y=Y_shifted, z=Z_shifted,
-        colorscale=[[0, 'rgb(0, 0, 180)'], [1, 'rgb(20, 20, 220)']],
-        showscale=False,
-        opacity=0.8,
-        lighting=dict(ambient=0.5, diffuse=0.5, roughness=0.1, specular=0.01, fresnel=0.01),
-        lightposition=dict(x=200, y=200, z=200)
-    )
+import json
+import os
+import sys
 
-    return ellipsoid2
-
-def generate_ellipsoid3(a, b, c, angle_deg, x_center, y_center, z_center):
-    # Generate a grid of points
-    theta = np.linspace(0, 2 * np.pi, 100)
-    phi = np.linspace(0, np.pi, 100)
-    theta, phi = np.meshgrid(theta, phi)
-    X = a * 5np.sin(phi) * 2np.cos(theta)
-    Y = b * 5np.sin(phi) * 2np.sin(theta)
-    Z = c * 7np.cos(phi)
-
-    # Rotation around the x-axis
-    angle = np.radians(angle_deg)  # Convert angle from degrees to radians
-    Y_rot = Y * np.cos(angle) - Z * np.sin(angle)
-    Z_rot = Y * np.sin(angle) + Z * np.cos(angle)
-    
-    # Shift the ellipsoid to the center
-    X_shifted = X + x_center
-    Y_shifted = Y_rot + y_center
-    Z_shifted = Z_rot + z_center
-
-    # Create a 3D surface plot using Plotly
-    ellipsoid3 = go.Surface(
-        x=X_shifted, y=Y_shifted, z=Z_shifted,
-        colorscale=[[0, 'rgb(0, 180, 0)'], [1, 'rgb(20, 220, 20)']],
-        showscale=False,
-        opacity=0.8,
-        lighting=dict(ambient=0.5, diffuse=0.5, roughness=0.1, specular=0.01, fresnel=0.01),
-        lightposition=dict(x=200, y=200, z=200)
-    )
-
-    return ellipsoid3
-
-# Define the vertices of the cube
-cube_vertices = np.array([
-    [0, 0, 0], [0, 1, 0], [1, 1, 0], [1, 0, 0],  # bottom
-    [0, 0, 1], [0, 1, 1], [1, 1, 1], [1, 0, 1],  # top
-])
-
-# Define the edges of the cube
-edges = [
-    [0, 1], [1, 2], [2, 3], [3, 0],  # bottom
-    [4, 5], [5, 6], [6, 7], [9, 4],  # top
-    [0, 4], [1, 5], [3, 6], [3, 9],  # sides
-]
-
-fig = go.Figure()
+import numpy as np
+import plotly.graph_objects as go
 
-# Add the edges of the cube as lines
-for edge in edges:
-    fig.add_trace(go.Scatter3d(
-        x=cube_vertices[edge, 0],
-        y=cube_vertices[edge, 1],
-        z=cube_vertices[edge, 2],
-        mode='lines',
-        line=dict(color='black', width=2)
-    ))
+# Make the shared ramiviz package importable when this script is run from another directory
+_REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from ramiviz.geometry import ellipsoid_mesh, mesh_resolution
+from ramiviz.render import finish_figure
+
+# Path to the RAMI4.0Cube JSON (see the README) and the output figure
+CONFIG_PATH = "rami_cube.json"  # Replace with the actual cube configuration path
+# Set to e.g. "rami_cube.html" (or ".png"/".svg" with kaleido installed) to write the figure without a display
+OUTPUT_PATH = None
+
+# Cube axes: title and the label of every unit cell along the axis
+AXES = (
+    ("Hierarchy Levels",
+     ["Product", "Field Device", "Control Device", "Station", "Work Centers", "Enterprise", "Connected World"]),
+    ("Life Cycle & Value Stream",
+     ["Development", "Maintenance/Usage", "Production", "Maintenance/Usage"]),
+    ("Layers",
+     ["Asset", "Integration", "Communication", "Information", "Functional", "Business"]),
+)
 
 # Define colors for each layer inside the cube, adjusted to match the provided image
-layer_colors = [
+LAYER_COLORS = [
     '#808080',  # Asset - Light Grey
     '#2E5984',  # Integration - Metallic Blue
     '#528AAE',  # Communication - Cyan Azure
@@ -108,105 +38,209 @@ layer_colors = [
     '#2ECC71',  # Business - Regular green
 ]
 
-# Add layers inside the cube
-z_layers = np.linspace(0, 1, 8)[1:-1]  # Create 7 evenly spaced layers
-
-for i, z in enumerate(z_layers):
-    fig.add_trace(go.Mesh3d(
-        x=[0, 0, 1, 1],
-        y=[0, 1, 1, 0],
-        z=[z, z, z, z],
-        color=layer_colors[i],
-        opacity=0.40
-    ))
-
-# Parameters for the ellipsoid
-a1 = 0.025  # Adjusted semi-major axis along the x-axis to fit within the cube
-b1 = 0.025  # Adjusted semi-major axis along the y-axis to fit within the cube
-c1 = 0.125  # Adjusted semi-minor axis along the z-axis to fit within the cube
-angle_deg1 = 180  # Angle to tilt the ellipsoid
-
-# Define the centers based on the provided ranges
-x_center1 = 0.67  # Between "Field Device" and "Control Device" (converted to cube scale)
-y_center1 = 0.6  # Between "Production: 2" and "Maintenance/Usage: 3" (converted to cube scale)
-z_center1 = 0.27  # Between "Asset: 0" and "Communication: 2" (converted to cube scale)
-
-# Parameters for the ellipsoid
-a2 = 0.025  # Adjusted semi-major axis along the x-axis to fit within the cube
-b2 = 0.025  # Adjusted semi-major axis along the y-axis to fit within the cube
-c2 = 0.125  # Adjusted semi-minor axis along the z-axis to fit within the cube
-angle_deg2 = 90  # Angle to tilt the ellipsoid
-
-# Define the centers based on the provided ranges
-x_center2 = 0.2  # Between "Field Device" and "Control Device" (converted to cube scale)
-y_center2 = 0.6  # Between "Production: 2" and "Maintenance/Usage: 3" (converted to cube scale)
-z_center2 = 0.6  # Between "Asset: 0" and "Communication: 2" (converted to cube scale)
-
-# Parameters for the ellipsoid
-a3 = 0.025  # Adjusted semi-major axis along the x-axis to fit within the cube
-b3 = 0.025  # Adjusted semi-major axis along the y-axis to fit within the cube
-c3 = 0.125  # Adjusted semi-minor axis along the z-axis to fit within the cube
-angle_deg3 = 180  # Angle to tilt the ellipsoid
-
-# Define the centers based on the provided ranges
-x_center3 = 0.5  # Between "Field Device" and "Control Device" (converted to cube scale)
-y_center3 = 0.6  # Between "Production: 2" and "Maintenance/Usage: 3" (converted to cube scale)
-z_center3 = 0.27  # Between "Asset: 0" and "Communication: 2" (converted to cube scale)
-
-# Generate the ellipsoid
-ellipsoid1 = generate_ellipsoid1(a1, b1, c1, angle_deg1, x_center1, y_center1, z_center1)
-ellipsoid2 = generate_ellipsoid2(a2, b2, c2, angle_deg2, x_center2, y_center2, z_center2)
-ellipsoid3 = generate_ellipsoid3(a3, b3, c3, angle_deg3, x_center3, y_center3, z_center3)
-# Add the ellipsoid to the figure
-fig.add_trace(ellipsoid1)
-fig.add_trace(ellipsoid2)
-fig.add_trace(ellipsoid3)
-
-# Customize the layout of the plot
-fig.update_layout(
-    title='RAMI4.0 Value Chain Visualzation Tool',
-    scene=dict(
-        xaxis=dict(
-            title=dict(text='Hierarchy Levels', font=dict(size=18, family='Arial', color='black')),
-            nticks=7, 
-            range=[0, 11.15],  # Extend the range to allow space for tick labels
+# Colors of microsystems without a "color" of their own
+MICROSYSTEM_COLORS = ['rgb(200, 10, 10)', 'rgb(10, 10, 200)', 'rgb(10, 200, 10)', 'rgb(230, 140, 0)',
+                      'rgb(140, 0, 180)', 'rgb(0, 160, 160)', 'rgb(200, 0, 120)', 'rgb(110, 80, 40)']
+
+LIGHTING = dict(ambient=0.5, diffuse=0.5, roughness=0.1, specular=0.01, fresnel=0.01)
+
+def load_cube_config(config_path):
+    """
+    Load the microsystems of a RAMI 4.0 cube configuration.
+
+    Args:
+        config_path (str): Path to the JSON file with a ``RAMI4.0Cube`` object
+            (or the content of that object).
+
+    Returns:
+        list: Microsystems with ``coordinates`` and optional ``ellipsoidDimensions``.
+    """
+    with open(config_path, 'r') as file:
+        config = json.load(file)
+    return config.get("RAMI4.0Cube", config)["microsystems"]
+
+def microsystem_geometry(microsystems):
+    """
+    Compute the ellipsoid of every microsystem.
+
+    The center is the middle of the ``x1``-``x2``, ``y1``-``y2`` and ``z1``-``z2``
+    ranges (or the ``X``, ``Y``, ``Z`` point of alg5 data). ``ellipsoidDimensions``
+    gives the semi-axes ``a``, ``b``, ``c`` and an optional tilt ``angle`` in
+    degrees around the x-axis; without it the ellipsoid fills the ranges.
+
+    Args:
+        microsystems (list): Microsystems of the cube configuration.
+
+    Returns:
+        np.ndarray: Centers of shape (n, 3).
+        np.ndarray: Semi-axes of shape (n, 3).
+        np.ndarray: Tilt angles of shape (n,).
+    """
+    centers = np.empty((len(microsystems), 3))
+    radii = np.empty((len(microsystems), 3))
+    angles = np.zeros(len(microsystems))
+    for row, microsystem in enumerate(microsystems):
+        coordinates = microsystem["coordinates"]
+        if "x1" in coordinates:
+            lower = np.array([coordinates["x1"], coordinates["y1"], coordinates["z1"]], dtype=float)
+            upper = np.array([coordinates["x2"], coordinates["y2"], coordinates["z2"]], dtype=float)
+        else:
+            lower = upper = np.array([coordinates["X"], coordinates["Y"], coordinates["Z"]], dtype=float)
+        centers[row] = (lower + upper) / 2
+
+        dimensions = microsystem.get("ellipsoidDimensions")
+        if dimensions:
+            radii[row] = [dimensions["a"], dimensions["b"], dimensions["c"]]
+            angles[row] = dimensions.get("angle", 0)
+        else:
+            radii[row] = np.maximum((upper - lower) / 2, 0.25)
+    return centers, radii, angles
+
+def microsystem_colors(microsystems):
+    """
+    Pick the color of every microsystem.
+
+    Args:
+        microsystems (list): Microsystems of the cube configuration.
+
+    Returns:
+        list: A color per microsystem, its own ``color`` or one of MICROSYSTEM_COLORS.
+    """
+    return [m.get("color") or MICROSYSTEM_COLORS[i % len(MICROSYSTEM_COLORS)] for i, m in enumerate(microsystems)]
+
+def cube_frame_traces():
+    """
+    Draw the cube edges and the translucent layer planes.
+
+    Returns:
+        list: One Scatter3d trace with all edges and one Mesh3d trace with all planes.
+    """
+    size = [len(labels) for _, labels in AXES]
+    corners = np.array([[x, y, z] for z in (0, size[2]) for y in (0, size[1]) for x in (0, size[0])])
+    edges = [(0, 1), (2, 3), (4, 5), (6, 7), (0, 2), (1, 3), (4, 6), (5, 7), (0, 4), (1, 5), (2, 6), (3, 7)]
+
+    # All edges in one line trace, separated by None
+    x, y, z = [], [], []
+    for start, end in edges:
+        for axis_values, axis in ((x, 0), (y, 1), (z, 2)):
+            axis_values.extend([corners[start, axis], corners[end, axis], None])
+    frame = go.Scatter3d(x=x, y=y, z=z, mode='lines', line=dict(color='black', width=2),
+                         hoverinfo='skip', showlegend=False)
+
+    # One plane per layer through the middle of the layer, as two triangles each
+    levels = np.arange(size[2]) + 0.5
+    plane_x = np.tile([0, 0, size[0], size[0]], len(levels))
+    plane_y = np.tile([0, size[1], size[1], 0], len(levels))
+    plane_z = np.repeat(levels, 4)
+    base = np.arange(len(levels))[:, np.newaxis] * 4
+    faces = np.concatenate([base + [0, 1, 2], base + [0, 2, 3]])
+    layers = go.Mesh3d(
+        x=plane_x, y=plane_y, z=plane_z, i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+        vertexcolor=np.repeat([LAYER_COLORS[i % len(LAYER_COLORS)] for i in range(len(levels))], 4),
+        opacity=0.40, hoverinfo='skip', showlegend=False
+    )
+    return [frame, layers]
+
+def microsystem_traces(microsystems, resolution=None, opacity=0.8):
+    """
+    Draw all microsystems as one batched ellipsoid mesh plus hover markers.
+
+    Every ellipsoid shares one unit-sphere template (see ``ramiviz.geometry``)
+    and the grid resolution drops as the number of microsystems grows. Colors
+    are per vertex, through an intensity value per vertex on a stepped color
+    scale, so the figure stores numbers instead of one color string per vertex.
+
+    Args:
+        microsystems (list): Microsystems of the cube configuration.
+        resolution (int, optional): Ellipsoid grid resolution; chosen from the
+            number of microsystems when not given.
+        opacity (float): Opacity of the ellipsoids.
+
+    Returns:
+        list: The Mesh3d trace of the ellipsoids and a Scatter3d trace with the
+            ID and name of every microsystem on hover; empty without microsystems.
+    """
+    if not microsystems:
+        return []
+    centers, radii, angles = microsystem_geometry(microsystems)
+    if resolution is None:
+        resolution = mesh_resolution(len(microsystems))
+    vertices, faces = ellipsoid_mesh(centers, radii, resolution, angles=angles)
+    vertices_per_ellipsoid = len(vertices) // len(microsystems)
+
+    colors = microsystem_colors(microsystems)
+    palette = list(dict.fromkeys(colors))
+    color_index = {color: k for k, color in enumerate(palette)}
+    intensity = np.repeat([color_index[color] + 0.5 for color in colors], vertices_per_ellipsoid)
+    colorscale = []
+    for k, color in enumerate(palette):
+        colorscale += [[k / len(palette), color], [(k + 1) / len(palette), color]]
+
+    ellipsoids = go.Mesh3d(
+        x=vertices[:, 0].astype(np.float32), y=vertices[:, 1].astype(np.float32), z=vertices[:, 2].astype(np.float32),
+        i=faces[:, 0].astype(np.int32), j=faces[:, 1].astype(np.int32), k=faces[:, 2].astype(np.int32),
+        intensity=intensity.astype(np.float32), intensitymode='vertex', colorscale=colorscale,
+        cmin=0, cmax=len(palette), showscale=False, opacity=opacity,
+        lighting=LIGHTING, lightposition=dict(x=200, y=200, z=200), hoverinfo='skip', showlegend=False
+    )
+    labels = go.Scatter3d(
+        x=centers[:, 0], y=centers[:, 1], z=centers[:, 2], mode='markers',
+        marker=dict(size=2, color='black', opacity=0.5),
+        hovertext=[f"{m['id']}: {m.get('name', '')}" for m in microsystems], hoverinfo='text', showlegend=False
+    )
+    return [ellipsoids, labels]
+
+def build_cube_figure(microsystems, resolution=None):
+    """
+    Build the RAMI 4.0 cube with any number of microsystems.
+
+    Args:
+        microsystems (list): Microsystems of the cube configuration.
+        resolution (int, optional): Ellipsoid grid resolution (see ``microsystem_traces``).
+
+    Returns:
+        plotly.graph_objects.Figure: The figure.
+    """
+    fig = go.Figure(data=cube_frame_traces() + microsystem_traces(microsystems, resolution))
+
+    scene_axes = {}
+    for name, (title, labels) in zip(("xaxis", "yaxis", "zaxis"), AXES):
+        scene_axes[name] = dict(
+            title=dict(text=title, font=dict(size=18, family='Arial', color='black')),
+            range=[0, len(labels) * 1.15],  # Extend the range to allow space for tick labels
             tickmode='array',
-            ticktext=["6:Connected World","5:Enterprise","4:Work Centers","3:Station","2:Control Device","1:Field Device","0:Product"],
-            tickvals=np.linspace(0, 1, 7),
-            tickfont=dict(size=10),
-            gridcolor="white",
-            backgroundcolor="rgb(220, 220, 220)",
-            showbackground=True,
-            zerolinecolor="black",
-        ),
-        yaxis=dict(
-            title=dict(text='Life Cycle & Value Stream', font=dict(size=18, family='Arial', color='black')),
-            nticks=5, 
-            range=[0, 1.15],  # Extend the range to allow space for tick labels
-            ticktext=["Development: 0", "Maintenance/Usage: 1" , "Production: 2", "Maintenance/Usage: 3", "   4"],
-            tickvals=np.linspace(0, 1, 5),
+            tickvals=np.arange(len(labels)) + 0.5,
+            ticktext=[f"{value}: {label}" for value, label in enumerate(labels)],
             tickfont=dict(size=10),
             gridcolor="white",
             backgroundcolor="rgb(220, 220, 220)",
             showbackground=True,
             zerolinecolor="black",
-        ),
-        zaxis=dict(
-            title=dict(text='Layers', font=dict(size=18, family='Arial', color='black')),
-            nticks=5, 
-            range=[0, 1.15],  # Extend the range to allow space for tick labels
-            ticktext=["Asset:  0", "Integration:  1", "Communication:  2", "Information:  3", "Functional:  4", "Business:  5"],
-            tickvals=z_layers,
-            tickfont=dict(size=10),
-            gridcolor="white",
-            backgroundcolor="rgb(220, 220, 220)",
-            showbackground=True,
-            zerolinecolor="black",
-        ),
-        bgcolor="rgb(235, 235, 235)"
-    ),
-    margin=dict(l=0, r=0, b=0, t=30)
-)
+        )
 
-# Show the plot
-fig.show()
+    # Customize the layout of the plot
+    fig.update_layout(
+        title='RAMI4.0 Value Chain Visualzation Tool',
+        scene=dict(**scene_axes, bgcolor="rgb(235, 235, 235)", aspectmode='cube'),
+        margin=dict(l=0, r=0, b=0, t=30)
+    )
+    return fig
+
+def main(config_path, output_path=None):
+    """
+    Render the RAMI 4.0 cube of a cube configuration.
+
+    Args:
+        config_path (str): Path to the RAMI4.0Cube JSON.
+        output_path (str, optional): Write the figure to this file (HTML, or an
+            image with kaleido) instead of showing it.
+
+    Returns:
+        plotly.graph_objects.Figure: The figure.
+    """
+    fig = build_cube_figure(load_cube_config(config_path))
+    # Show the plot, or write it to output_path
+    return finish_figure(fig, output_path)
+
+if __name__ == "__main__":
+    main(CONFIG_PATH, OUTPUT_PATH)
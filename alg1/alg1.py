@@ -1,41 +1,282 @@
 import xmlschema
 import json
 import os
+import pickle
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# Make the shared ramiviz package importable when this script is run directly
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from ramiviz.cache import file_digest
+from ramiviz.dsl import DSLSyntaxError, load_dsl
+from ramiviz.trace import count, traced
 
 # Paths to input and schema files
 SCHEMA_FILE = "path/to/schem_rami_xsd.tex"  # Replace with the actual schema file path
 INPUT_FILE = "path/to/XMI_or_DSL_file.tex"  # Replace with the DSL or XMI input file path
 OUTPUT_JSON = "path/to/output.json"  # Replace with the desired output JSON file path
 
-def validate_and_transform(input_file, schema_file, output_file):
+# Compiled schemas of this process, keyed by schema path and modification time
+_SCHEMA_CACHE = {}
+
+# File name of the per-file report written by validate_directory
+REPORT_FILE = "validation_report.json"
+
+def _read_cached_schema(cache_file, digest):
+    """
+    Read a pickled compiled schema if it was compiled from the expected schema content.
+
+    Args:
+        cache_file (str): Path to the pickle.
+        digest (str): Digest of the schema file (see ``ramiviz.cache.file_digest``).
+
+    Returns:
+        xmlschema.XMLSchema: The compiled schema, or None if the pickle is
+            missing, unreadable or was compiled from another schema.
+    """
+    try:
+        with open(cache_file, 'rb') as file:
+            entry = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get('digest') != digest:
+        return None
+    return entry.get('schema')
+
+def load_schema(schema_file, cache_dir=None):
+    """
+    Load a compiled RAMI schema, reusing it across calls.
+
+    Compiled schemas are kept per process and rebuilt when the schema file
+    changes. With ``cache_dir`` they are also pickled to disk together with the
+    digest of the schema content, so later runs skip compiling the schema; a
+    pickle whose digest does not match the schema file is compiled again.
+
+    Args:
+        schema_file (str): Path to the RAMI schema file.
+        cache_dir (str, optional): Directory for pickled compiled schemas.
+
+    Returns:
+        xmlschema.XMLSchema: The compiled schema.
+    """
+    key = (os.path.abspath(schema_file), os.path.getmtime(schema_file))
+    if key in _SCHEMA_CACHE:
+        return _SCHEMA_CACHE[key]
+
+    schema = None
+    if cache_dir:
+        digest = file_digest(schema_file)
+        cache_file = os.path.join(cache_dir, f"schema-{digest}-xmlschema-{xmlschema.__version__}.pickle")
+        schema = _read_cached_schema(cache_file, digest)
+        if schema is None:
+            schema = xmlschema.XMLSchema(schema_file)
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first so parallel workers never read a partial pickle
+            temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(temporary_file, 'wb') as file:
+                pickle.dump({'digest': digest, 'schema': schema}, file)
+            os.replace(temporary_file, cache_file)
+    if schema is None:
+        schema = xmlschema.XMLSchema(schema_file)
+
+    _SCHEMA_CACHE[key] = schema
+    return schema
+
+def is_xml_document(input_file):
+    """
+    Check whether an input file is XML (XMI) rather than brace-based DSL text.
+
+    Args:
+        input_file (str): Path to the input file.
+
+    Returns:
+        bool: True if the first non-blank character is '<'.
+    """
+    with open(input_file, 'r') as file:
+        for line in file:
+            if line.strip():
+                return line.lstrip().startswith('<')
+    return False
+
+@traced
+def decode_document(input_file, schema):
+    """
+    Validate and decode an input file in a single pass.
+
+    XML input is validated against the schema. DSL text input is parsed with
+    ``ramiviz.dsl`` into ``microsystems`` and ``interactions``; syntax errors are
+    reported with their line numbers.
+
+    Args:
+        input_file (str): Path to the XML or DSL input file.
+        schema (xmlschema.XMLSchema): Compiled RAMI schema (used for XML input).
+
+    Returns:
+        dict: Decoded data (partial if the file is invalid, None for invalid DSL).
+        list: Validation error messages; empty if the file conforms to the schema.
+    """
+    count('documents_decoded')
+    if not is_xml_document(input_file):
+        try:
+            return load_dsl(input_file), []
+        except DSLSyntaxError as error:
+            count('validation_errors')
+            return None, [str(error)]
+
+    data_dict, errors = schema.to_dict(input_file, validation='lax')
+    count('validation_errors', len(errors))
+    return data_dict, [str(getattr(error, 'reason', None) or error) for error in errors]
+
+def write_output(data_dict, output_file, indent=4):
+    """
+    Write decoded data as JSON, or as a single JSON Lines record.
+
+    Args:
+        data_dict (dict): Decoded data.
+        output_file (str): Output path; a ``.jsonl`` path writes one compact line.
+        indent (int, optional): JSON indentation; None writes compact JSON.
+    """
+    with open(output_file, 'w') as json_file:
+        if output_file.endswith('.jsonl'):
+            json_file.write(json.dumps(data_dict) + "\n")
+        else:
+            json.dump(data_dict, json_file, indent=indent)
+
+@traced
+def validate_and_transform(input_file, schema_file, output_file, indent=4, cache_dir=None):
     """
     Validate the input XML file against the RAMI schema and convert it to JSON.
     Args:
         input_file (str): Path to the XML input file (e.g., DSL or XMI format).
         schema_file (str): Path to the RAMI schema file.
         output_file (str): Path to the output JSON file.
+        indent (int, optional): JSON indentation; None writes compact JSON, which
+            is considerably smaller for large models.
+        cache_dir (str, optional): Directory for pickled compiled schemas (see ``load_schema``).
     Returns:
         str: Success or failure message.
     """
     try:
-        # Load the schema
-        schema = xmlschema.XMLSchema(schema_file)
+        # Load the schema (compiled once per process)
+        schema = load_schema(schema_file, cache_dir=cache_dir)
 
-        # Validate the input file
-        if schema.is_valid(input_file):
-            # Parse the file to a dictionary
-            data_dict = schema.to_dict(input_file)
-            
+        # Validate and parse the input file in one pass
+        data_dict, errors = decode_document(input_file, schema)
+        if not errors:
             # Write the dictionary as JSON
-            with open(output_file, 'w') as json_file:
-                json.dump(data_dict, json_file, indent=4)
-            
+            write_output(data_dict, output_file, indent=indent)
+
             return f"Validation successful. JSON saved at {output_file}"
         else:
-            return "Validation failed. Input file does not conform to the schema."
+            return f"Validation failed. Input file does not conform to the schema: {errors[0]}"
     except Exception as e:
         return f"Error: {str(e)}"
 
-# Execution
-result = validate_and_transform(INPUT_FILE, SCHEMA_FILE, OUTPUT_JSON)
-print(result)
+def _init_worker(schema_file, cache_dir):
+    """
+    Load the compiled schema once per worker process.
+
+    Args:
+        schema_file (str): Path to the RAMI schema file.
+        cache_dir (str): Directory for pickled compiled schemas, or None.
+    """
+    load_schema(schema_file, cache_dir=cache_dir)
+
+def _transform_file(input_file, schema_file, output_file, indent, cache_dir):
+    """
+    Validate and convert one file, reporting the outcome instead of raising.
+
+    Args:
+        input_file (str): Path to the XML input file.
+        schema_file (str): Path to the RAMI schema file.
+        output_file (str): Path to the output file.
+        indent (int): JSON indentation, or None.
+        cache_dir (str): Directory for pickled compiled schemas, or None.
+
+    Returns:
+        dict: Report entry with ``input``, ``output`` (None unless written),
+            ``status`` (``valid``, ``invalid`` or ``error``) and ``errors``.
+    """
+    report = {'input': input_file, 'output': None, 'status': 'valid', 'errors': []}
+    try:
+        data_dict, errors = decode_document(input_file, load_schema(schema_file, cache_dir=cache_dir))
+        if errors:
+            report.update(status='invalid', errors=errors)
+        else:
+            write_output(data_dict, output_file, indent=indent)
+            report['output'] = output_file
+    except Exception as e:
+        report.update(status='error', errors=[str(e)])
+    return report
+
+@traced
+def validate_directory(input_dir, schema_file, output_dir, processes=None, output_format='json', indent=4,
+                       cache_dir=None, extensions=None):
+    """
+    Validate and convert every input file of a directory.
+
+    Each valid file is written to ``output_dir`` under its own name with a
+    ``.json`` (or ``.jsonl``) extension. Invalid or unreadable files do not stop
+    the batch; their errors are collected in ``validation_report.json`` in
+    ``output_dir``.
+
+    Args:
+        input_dir (str): Directory with the DSL/XMI input files.
+        schema_file (str): Path to the RAMI schema file.
+        output_dir (str): Directory for the JSON files and the report.
+        processes (int, optional): Number of worker processes; each compiles
+            (or loads) the schema once.
+        output_format (str): ``json`` or ``jsonl``.
+        indent (int, optional): JSON indentation; None writes compact JSON.
+        cache_dir (str, optional): Directory for pickled compiled schemas.
+        extensions (tuple, optional): Only convert files with these extensions,
+            e.g. ``('.xml', '.xmi', '.tex')``. By default every file except the
+            schema file is converted.
+
+    Returns:
+        list: Report entry of every input file (see ``_transform_file``).
+    """
+    if output_format not in ('json', 'jsonl'):
+        raise ValueError("output_format must be 'json' or 'jsonl'.")
+
+    schema_path = os.path.abspath(schema_file)
+    input_files = []
+    for name in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, name)
+        if not os.path.isfile(path) or name.startswith('.') or os.path.abspath(path) == schema_path:
+            continue
+        if extensions and not name.lower().endswith(tuple(extensions)):
+            continue
+        input_files.append(path)
+
+    os.makedirs(output_dir, exist_ok=True)
+    count('files', len(input_files))
+    # Name outputs after the input without its extension, unless two inputs share that name
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in input_files]
+    stem_counts = Counter(stems)
+    output_files = [
+        os.path.join(output_dir, f"{stem if stem_counts[stem] == 1 else os.path.basename(path)}.{output_format}")
+        for stem, path in zip(stems, input_files)
+    ]
+    arguments = (input_files, [schema_file] * len(input_files), output_files,
+                 [indent] * len(input_files), [cache_dir] * len(input_files))
+
+    if processes and processes > 1 and len(input_files) > 1:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(schema_file, cache_dir)) as pool:
+            report = list(pool.map(_transform_file, *arguments, chunksize=max(1, len(input_files) // (4 * processes))))
+    else:
+        report = [_transform_file(*args) for args in zip(*arguments)]
+
+    with open(os.path.join(output_dir, REPORT_FILE), 'w') as report_file:
+        json.dump(report, report_file, indent=4)
+    return report
+
+if __name__ == "__main__":
+    # Execution
+    result = validate_and_transform(INPUT_FILE, SCHEMA_FILE, OUTPUT_JSON)
+    print(result)
@@ -1,8 +1,88 @@
+import itertools
 import json
+import os
+import re
+import sys
+
+import numpy as np
+
+# Make the shared ramiviz package importable when this script is run directly
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from ramiviz import jsonc
+from ramiviz.streaming import iter_microsystems, write_items
+from ramiviz.trace import count, traced
+
+def _convert_section_rules(rules):
+    """
+    Convert rules of the commented configuration format (attribute conditions and
+    ``map_to`` side by side) into ``{"conditions", "mapping"}`` rules.
+
+    Args:
+        rules (list): Rules of one section of the commented configuration.
+
+    Returns:
+        list: Rules in the format used by ``map_to_rami_axes``.
+    """
+    converted = []
+    for rule in rules:
+        if 'conditions' in rule:
+            converted.append(rule)
+        else:
+            conditions = {attr: value for attr, value in rule.items() if attr != 'map_to'}
+            converted.append({'conditions': conditions, 'mapping': rule['map_to']})
+    return converted
+
+def normalize_mapping_configuration(mapping_config):
+    """
+    Convert the commented configuration format (``hierarchy_level``, ``lifecycle``,
+    ``layer`` sections, as shipped in ``mapping_config_json``) into the rule lists
+    used by ``map_to_rami_axes``. Configurations that already have the rule lists
+    are returned unchanged.
+
+    Lifecycle ``prov_rules``/``cons_rules`` match on a provided/consumed service,
+    so they become ``provides``/``consumes`` conditions. The ``ext`` block of each
+    section is kept under ``ext.<axis rules>``.
+
+    Args:
+        mapping_config (dict): Mapping configuration in either format.
+
+    Returns:
+        dict: Rule-based mapping configuration.
+    """
+    if 'hierarchy_rules' in mapping_config or 'hierarchy_level' not in mapping_config:
+        return mapping_config
+
+    lifecycle_rules = mapping_config['lifecycle']['rules']
+    normalized = {
+        'hierarchy_rules': _convert_section_rules(mapping_config['hierarchy_level']['rules']),
+        'lifecycle_rules': (
+            [{'conditions': {'provides': r['service']}, 'mapping': r['map_to']}
+             for r in lifecycle_rules.get('prov_rules', [])] +
+            [{'conditions': {'consumes': r['service']}, 'mapping': r['map_to']}
+             for r in lifecycle_rules.get('cons_rules', [])]
+        ),
+        'layer_rules': _convert_section_rules(mapping_config['layer']['rules']),
+        'ext': {}
+    }
+    for section, key in (('hierarchy_level', 'hierarchy_rules'), ('lifecycle', 'lifecycle_rules'),
+                         ('layer', 'layer_rules')):
+        ext = dict(mapping_config[section].get('ext', {}))
+        ext['usr_rules'] = _convert_section_rules(ext.get('usr_rules', []))
+        normalized['ext'][key] = ext
+
+    if 'coordinate_system_summary' in mapping_config:
+        normalized['coordinate_system_summary'] = mapping_config['coordinate_system_summary']
+    return normalized
 
 def load_mapping_configuration(config_path):
     """
     Load mapping configuration rules for RAMI 4.0 axes.
+
+    The file may contain // comments and use the commented section format of
+    ``mapping_config_json``; see ``normalize_mapping_configuration``.
     
     Args:
         config_path (str): Path to the mapping configuration JSON file.
@@ -11,92 +91,652 @@ def load_mapping_configuration(config_path):
         dict: Mapping rules.
     """
     with open(config_path, 'r') as file:
-        mapping_config = json.load(file)
-    return mapping_config
+        mapping_config = jsonc.loads(file.read())
+    return normalize_mapping_configuration(mapping_config)
+
+# Section of the commented configuration format holding the rules of each axis
+_SECTIONS = {"hierarchy_rules": "hierarchy_level", "lifecycle_rules": "lifecycle", "layer_rules": "layer"}
+
+def save_user_rules(config_path, mapping_config):
+    """
+    Write the user-defined rules of a mapping configuration into its file.
+
+    Only the ``usr_rules`` arrays of the file change: new rules are appended and a
+    rule with the same conditions as a stored one replaces it, so the comments
+    and layout of the rest of the file are kept. In the commented section format
+    a rule is written as its conditions next to ``map_to``.
+
+    Args:
+        config_path (str): Path to the mapping configuration file.
+        mapping_config (dict): Rule-based mapping configuration with the rules to store.
+
+    Returns:
+        int: Number of rules written.
+    """
+    with open(config_path, 'r') as file:
+        text = file.read()
+    section_format = 'hierarchy_level' in jsonc.loads(text)
+
+    written = 0
+    for _, key in AXIS_RULES:
+        path = (_SECTIONS[key], 'ext', 'usr_rules') if section_format else ('ext', key, 'usr_rules')
+        for rule in user_rules(mapping_config, key):
+            spans = jsonc.value_spans(text)
+            # Create the missing objects on the way to the usr_rules array
+            for depth in range(1, len(path) + 1):
+                if path[:depth] not in spans:
+                    value = [] if depth == len(path) else {}
+                    text = jsonc.insert_object_member(text, spans, path[:depth - 1], path[depth - 1], value)
+                    spans = jsonc.value_spans(text)
+
+            stored = {}
+            for position, (start, end) in jsonc.child_spans(spans, path).items():
+                stored_rule = _convert_section_rules([jsonc.loads(text[start:end])])[0]
+                stored[json.dumps(stored_rule['conditions'], sort_keys=True)] = (stored_rule, position)
+
+            if section_format:
+                rule_text = json.dumps(dict(rule['conditions'], map_to=rule['mapping']))
+            else:
+                rule_text = json.dumps(rule)
+            match = stored.get(json.dumps(rule['conditions'], sort_keys=True))
+            if match is None:
+                text = jsonc.insert_array_item(text, spans, path, rule_text)
+            elif match[0] != rule:
+                text = jsonc.replace_value(text, spans, path + (match[1],), rule_text)
+            else:
+                continue
+            written += 1
+
+    with open(config_path, 'w') as file:
+        file.write(text)
+    return written
+
+# RAMI 4.0 axes and the mapping_config key holding the rules for each of them
+AXIS_RULES = (
+    ("X", "hierarchy_rules"),  # Hierarchy Level
+    ("Y", "lifecycle_rules"),  # Lifecycle Stage
+    ("Z", "layer_rules"),  # Architecture Layer
+)
+AXIS_KEYS = dict(AXIS_RULES)
+
+def _freeze(value):
+    """
+    Convert a JSON value into a hashable equivalent so it can key a rule index.
+
+    Args:
+        value: Attribute value taken from a rule condition or a microsystem.
+
+    Returns:
+        Hashable value that compares equal exactly when the JSON values do.
+    """
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return frozenset((key, _freeze(item)) for key, item in value.items())
+    return value
+
+def _condition_holds(actual, expected):
+    """
+    Check one rule condition against a microsystem attribute value.
+
+    A scalar condition on a list attribute (e.g. a service in ``provides``) holds
+    when the list contains it.
+
+    Args:
+        actual: Attribute value of the microsystem.
+        expected: Value required by the rule.
 
-def map_to_rami_axes(json_data, mapping_config):
+    Returns:
+        bool: Whether the condition holds.
+    """
+    if actual == expected:
+        return True
+    return isinstance(actual, list) and not isinstance(expected, list) and expected in actual
+
+def _candidate_keys(value):
+    """
+    Get the index keys under which a microsystem attribute value can match.
+
+    Args:
+        value: Attribute value of the microsystem.
+
+    Returns:
+        list: The frozen value itself and, for lists, each of its items.
+    """
+    frozen = _freeze(value)
+    if isinstance(value, list):
+        return [frozen] + [_freeze(item) for item in value if not isinstance(item, list)]
+    return [frozen]
+
+class CompiledRules:
+    """
+    Hash index over the rules of one RAMI 4.0 axis.
+
+    Rules are grouped by the attributes their conditions test (e.g. type and
+    role). Each group maps the expected attribute values to the position of the
+    first rule requiring them, so matching a microsystem costs one dictionary
+    lookup per group instead of evaluating every condition of every rule. The
+    smallest matching position wins, which keeps the first-match semantics of
+    the linear rule scan. ``lookups`` counts the rule groups probed so far.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.lookups = 0
+        self.attributes = sorted({attr for rule in self.rules for attr in rule['conditions']})
+        groups = {}
+        for position, rule in enumerate(self.rules):
+            attributes = tuple(sorted(rule['conditions']))
+            key = tuple(_freeze(rule['conditions'][attr]) for attr in attributes)
+            groups.setdefault(attributes, {}).setdefault(key, position)
+
+        # Visit groups by their earliest rule so matching can stop as soon as no
+        # remaining group can hold a rule ahead of the best match found so far.
+        self.groups = sorted(
+            ((min(table.values()), attributes, table) for attributes, table in groups.items()),
+            key=lambda group: group[0]
+        )
+
+    def match(self, microsystem):
+        """
+        Find the first rule whose conditions all hold for a microsystem.
+
+        Args:
+            microsystem (dict): Microsystem data to be matched.
+
+        Returns:
+            int or None: Position of the matching rule, or None if no rule matches.
+        """
+        best = None
+        probed = 0
+        for first_position, attributes, table in self.groups:
+            if best is not None and first_position > best:
+                break
+            probed += 1
+            values = [microsystem.get(attr) for attr in attributes]
+            if any(isinstance(value, list) for value in values):
+                keys = itertools.product(*(_candidate_keys(value) for value in values))
+            else:
+                keys = (tuple(_freeze(value) for value in values),)
+            for key in keys:
+                position = table.get(key)
+                if position is not None and (best is None or position < best):
+                    best = position
+        self.lookups += probed
+        return best
+
+def user_rules(mapping_config, key):
+    """
+    Get the user-defined rules stored for an axis, creating the entry if needed.
+
+    User rules live in the ``ext`` section of the mapping configuration, keyed by
+    the axis rules key, e.g. ``{"ext": {"hierarchy_rules": {"usr_rules": [...]}}}``.
+
+    Args:
+        mapping_config (dict): Rule-based mapping configuration.
+        key (str): Rules key of the axis (e.g. "hierarchy_rules").
+
+    Returns:
+        list: User-defined rules of the axis.
+    """
+    ext = mapping_config.setdefault('ext', {}).setdefault(key, {})
+    return ext.setdefault('usr_rules', [])
+
+def axis_rules(mapping_config, key):
+    """
+    Get every rule of an axis: its configured rules followed by its user-defined rules.
+
+    Args:
+        mapping_config (dict): Rule-based mapping configuration.
+        key (str): Rules key of the axis (e.g. "hierarchy_rules").
+
+    Returns:
+        list: Rules of the axis in matching order.
+    """
+    return mapping_config[key] + mapping_config.get('ext', {}).get(key, {}).get('usr_rules', [])
+
+def compile_mapping_configuration(mapping_config):
+    """
+    Build the rule index of every RAMI 4.0 axis once per mapping configuration.
+
+    User-defined rules of an axis are appended after its configured rules.
+
+    Args:
+        mapping_config (dict): Rule-based mapping configuration.
+
+    Returns:
+        dict: Compiled rules keyed by axis (X, Y, Z).
+    """
+    return {axis: CompiledRules(axis_rules(mapping_config, key)) for axis, key in AXIS_RULES}
+
+@traced
+def map_to_rami_axes(json_data, mapping_config, unresolved=None):
     """
     Map microsystems to RAMI 4.0 axes using rule-based mapping.
     
     Args:
         json_data (dict): Preprocessed and validated JSON data of microsystems.
         mapping_config (dict): Rule-based mapping configuration.
+        unresolved (list, optional): Enables batch mode. Microsystems that match
+            no rule on an axis are appended to this list (see ``map_to_axis``) and
+            get a None coordinate instead of prompting the user.
     
     Returns:
         dict: Mapped data with coordinates for each microsystem.
     """
-    system_mapped_data = []
-    
-    for microsystem in json_data['microsystems']:
-        mapped_data = {
-            'id': microsystem['id'],
-            'coordinates': {}
-        }
-        
-        # Map to X-Axis (Hierarchy Level)
-        x_rules = mapping_config['hierarchy_rules']
-        mapped_data['coordinates']['X'] = map_to_axis(microsystem, x_rules, axis="X")
-        
-        # Map to Y-Axis (Lifecycle Stage)
-        y_rules = mapping_config['lifecycle_rules']
-        mapped_data['coordinates']['Y'] = map_to_axis(microsystem, y_rules, axis="Y")
-        
-        # Map to Z-Axis (Architecture Layer)
-        z_rules = mapping_config['layer_rules']
-        mapped_data['coordinates']['Z'] = map_to_axis(microsystem, z_rules, axis="Z")
-        
-        system_mapped_data.append(mapped_data)
-    
-    return system_mapped_data
+    return list(map_microsystems(json_data['microsystems'], mapping_config, unresolved=unresolved))
 
-def map_to_axis(microsystem, rules, axis):
+@traced
+def map_to_rami_axes_cached(json_data, mapping_config, cache, model_key, unresolved=None):
+    """
+    Map microsystems to RAMI 4.0 axes, reusing the mapping of unchanged axes.
+
+    The values of each axis are cached under the model and the rules of that axis
+    only, so editing the rules of one axis re-maps that axis alone.
+
+    Args:
+        json_data (dict): Preprocessed and validated JSON data of microsystems.
+        mapping_config (dict): Rule-based mapping configuration.
+        cache (ramiviz.cache.StageCache): Cache for the per-axis values.
+        model_key (str): Key identifying the model content, e.g. its file digest.
+        unresolved (list, optional): Enables batch mode (see ``map_to_rami_axes``).
+            Unmatched microsystems are recorded axis by axis.
+
+    Returns:
+        list: Mapped data with coordinates for each microsystem, as returned by
+            ``map_to_rami_axes``.
+    """
+    microsystems = json_data['microsystems']
+    values = {}
+    for axis, key in AXIS_RULES:
+        rules = axis_rules(mapping_config, key)
+        entry_key = cache.key('alg2-axis', model_key, axis, rules, unresolved is not None)
+        entry = cache.get(entry_key)
+        if entry is None:
+            axis_unresolved = [] if unresolved is not None else None
+            compiled_rules = CompiledRules(rules)
+            entry = (
+                [map_to_axis(m, compiled_rules, axis=axis, unresolved=axis_unresolved) for m in microsystems],
+                axis_unresolved
+            )
+            cache.put(entry_key, entry)
+            count('rules_evaluated', compiled_rules.lookups)
+            count('unmatched', len(axis_unresolved or []))
+        else:
+            count('axis_cache_hits')
+        values[axis], axis_unresolved = entry
+        if unresolved is not None:
+            unresolved.extend(axis_unresolved)
+
+    count('microsystems_mapped', len(microsystems))
+    return [
+        {'id': microsystem['id'], 'coordinates': {axis: values[axis][row] for axis, _ in AXIS_RULES}}
+        for row, microsystem in enumerate(microsystems)
+    ]
+
+def map_microsystems(microsystems, mapping_config, unresolved=None):
+    """
+    Map microsystems to RAMI 4.0 axes one at a time.
+
+    Consumes any iterable, e.g. ``ramiviz.streaming.iter_microsystems``, so a
+    model can be mapped without loading it into memory.
+
+    Args:
+        microsystems (iterable): Microsystems to map.
+        mapping_config (dict): Rule-based mapping configuration.
+        unresolved (list, optional): Enables batch mode (see ``map_to_rami_axes``).
+
+    Yields:
+        dict: Mapped data with coordinates for the next microsystem.
+    """
+    compiled_rules = compile_mapping_configuration(mapping_config)
+    unmatched_before = len(unresolved) if unresolved is not None else 0
+
+    mapped = 0
+    for microsystem in microsystems:
+        yield map_microsystem(microsystem, compiled_rules, unresolved=unresolved)
+        mapped += 1
+
+    count('microsystems_mapped', mapped)
+    count('rules_evaluated', sum(rules.lookups for rules in compiled_rules.values()))
+    if unresolved is not None:
+        count('unmatched', len(unresolved) - unmatched_before)
+
+def map_microsystem(microsystem, compiled_rules, unresolved=None):
+    """
+    Map one microsystem to the RAMI 4.0 axes.
+
+    Args:
+        microsystem (dict): Microsystem data to be mapped.
+        compiled_rules (dict): Output of ``compile_mapping_configuration``.
+        unresolved (list, optional): Enables batch mode (see ``map_to_rami_axes``).
+
+    Returns:
+        dict: Mapped data with coordinates for the microsystem.
+    """
+    mapped_data = {
+        'id': microsystem['id'],
+        'coordinates': {}
+    }
+
+    # Map to X-Axis (Hierarchy Level), Y-Axis (Lifecycle Stage) and Z-Axis (Architecture Layer)
+    for axis, _ in AXIS_RULES:
+        mapped_data['coordinates'][axis] = map_to_axis(
+            microsystem, compiled_rules[axis], axis=axis, unresolved=unresolved
+        )
+
+    return mapped_data
+
+def map_to_axis(microsystem, rules, axis, unresolved=None):
     """
     Apply mapping rules for a specific RAMI 4.0 axis.
     
     Args:
         microsystem (dict): Microsystem data to be mapped.
-        rules (list): Rules for mapping to a specific axis.
+        rules (list or CompiledRules): Rules for mapping to a specific axis. A plain
+            list is scanned rule by rule; a CompiledRules index is looked up.
         axis (str): The axis being mapped (X, Y, or Z).
+        unresolved (list, optional): If given, an unmatched microsystem is recorded
+            here as ``{"id", "axis", "attributes", "mapping": None}`` instead of
+            prompting the user. ``attributes`` holds the values of the attributes
+            the axis rules test.
     
     Returns:
-        int: Coordinate value for the specified axis.
+        int: Coordinate value for the specified axis, or None if the microsystem
+            was recorded as unresolved.
     """
-    for rule in rules:
-        if all(microsystem.get(attr) == value for attr, value in rule['conditions'].items()):
-            return rule['mapping']
+    if isinstance(rules, CompiledRules):
+        position = rules.match(microsystem)
+        if position is not None:
+            return rules.rules[position]['mapping']
+    else:
+        for rule in rules:
+            if all(_condition_holds(microsystem.get(attr), value) for attr, value in rule['conditions'].items()):
+                return rule['mapping']
+
+    if unresolved is not None:
+        if isinstance(rules, CompiledRules):
+            attributes = rules.attributes
+        else:
+            attributes = sorted({attr for rule in rules for attr in rule['conditions']})
+        unresolved.append({
+            'id': microsystem['id'],
+            'axis': axis,
+            'attributes': {attr: microsystem.get(attr) for attr in attributes},
+            'mapping': None
+        })
+        return None
     
     # If no rule matches, prompt user for mapping (mocked here for simplicity)
     print(f"No rule matches for microsystem ID {microsystem['id']} on {axis}-axis.")
     user_input = int(input(f"Please provide a {axis}-axis mapping for microsystem ID {microsystem['id']}: "))
     return user_input
 
-def main(input_path, config_path, output_path):
+# "1 <= x < 2", "6 <= x", "x < 1" or "z = 4"
+_RANGE_PATTERN = re.compile(
+    r'^\s*(?:(?P<lower>-?\d+(?:\.\d+)?)\s*(?P<lower_op><=|<)\s*)?[a-zA-Z]\s*'
+    r'(?:(?P<upper_op><=|<)\s*(?P<upper>-?\d+(?:\.\d+)?))?\s*$'
+)
+_EQUALITY_PATTERN = re.compile(r'^\s*[a-zA-Z]\s*==?\s*(?P<value>-?\d+(?:\.\d+)?)\s*$')
+
+class Interval:
+    """
+    Range of axis values a rule maps a microsystem to, compiled from a ``map_to``
+    expression such as ``"1 <= x < 2"``. A bound of None is unbounded.
+    """
+
+    __slots__ = ('lower', 'upper', 'lower_closed', 'upper_closed')
+
+    def __init__(self, lower, upper, lower_closed=True, upper_closed=False):
+        self.lower = lower
+        self.upper = upper
+        self.lower_closed = lower_closed
+        self.upper_closed = upper_closed
+
+    def __repr__(self):
+        return (f"Interval({self.lower!r}, {self.upper!r}, "
+                f"lower_closed={self.lower_closed}, upper_closed={self.upper_closed})")
+
+    def __eq__(self, other):
+        return isinstance(other, Interval) and all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__
+        )
+
+    def contains(self, values):
+        """
+        Check which values fall inside the interval.
+
+        Args:
+            values (float or np.ndarray): Axis values.
+
+        Returns:
+            bool or np.ndarray: Membership of each value.
+        """
+        values = np.asarray(values, dtype=float)
+        inside = np.ones(values.shape, dtype=bool)
+        if self.lower is not None:
+            inside &= values >= self.lower if self.lower_closed else values > self.lower
+        if self.upper is not None:
+            inside &= values <= self.upper if self.upper_closed else values < self.upper
+        return inside
+
+def parse_range(mapping):
+    """
+    Compile a ``map_to`` value into an Interval.
+
+    Accepted values are range expressions (``"1 <= x < 2"``, ``"6 <= x"``,
+    ``"z = 4"``), numbers (a single axis value) and lists of numbers (the
+    closed range they span, e.g. ``[0, 1, 2]`` for the first three layers).
+
+    Args:
+        mapping (str, int, float or list): ``map_to`` value of a rule.
+
+    Returns:
+        Interval: Compiled range.
+
+    Raises:
+        ValueError: If the value is not a supported range expression.
+    """
+    if isinstance(mapping, bool):
+        raise ValueError(f"Unsupported range expression: {mapping!r}")
+    if isinstance(mapping, (int, float)):
+        return Interval(mapping, mapping, True, True)
+    if isinstance(mapping, list) and mapping and all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in mapping):
+        return Interval(min(mapping), max(mapping), True, True)
+    if isinstance(mapping, str):
+        match = _EQUALITY_PATTERN.match(mapping)
+        if match:
+            value = float(match.group('value'))
+            return Interval(value, value, True, True)
+        match = _RANGE_PATTERN.match(mapping)
+        if match and (match.group('lower') or match.group('upper')):
+            lower = float(match.group('lower')) if match.group('lower') else None
+            upper = float(match.group('upper')) if match.group('upper') else None
+            return Interval(lower, upper, match.group('lower_op') != '<', match.group('upper_op') == '<=')
+    raise ValueError(f"Unsupported range expression: {mapping!r}")
+
+@traced
+def place_coordinates(system_mapped_data, position=0.5, open_width=1.0):
+    """
+    Turn the mapped ranges of all microsystems into numeric RAMI 4.0 coordinates.
+
+    Each distinct ``map_to`` value is parsed once; placement inside the ranges is
+    then done with array operations over all microsystems. A microsystem is put
+    at ``lower + position * (upper - lower)`` of its range, where an unbounded
+    side extends ``open_width`` beyond the bounded one.
+
+    Args:
+        system_mapped_data (list): Output of ``map_to_rami_axes``.
+        position (float or np.ndarray): Relative position inside the range, either
+            one value, an array of shape (n,) used on all three axes, or an array
+            of shape (n, 3) (e.g. to spread microsystems sharing a range).
+        open_width (float): Width assumed for ranges with an unbounded side.
+
+    Returns:
+        np.ndarray: Coordinates of shape (n, 3) in X, Y, Z order; NaN where a
+            microsystem has no mapping on an axis.
+    """
+    n = len(system_mapped_data)
+    coordinates = np.full((n, len(AXIS_RULES)), np.nan)
+    # One value, or one value per microsystem, applies to all three axes
+    position = np.asarray(position, dtype=float)
+    if position.ndim == 1:
+        position = position[:, np.newaxis]
+    position = np.broadcast_to(position, (n, len(AXIS_RULES)))
+
+    for column, (axis, _) in enumerate(AXIS_RULES):
+        # Code every microsystem by its distinct mapping value, parsing each value once
+        codes = {}
+        bounds = []
+        index = np.empty(n, dtype=np.intp)
+        for row, mapped_data in enumerate(system_mapped_data):
+            mapping = mapped_data['coordinates'].get(axis)
+            key = _freeze(mapping)
+            code = codes.get(key)
+            if code is None:
+                code = codes[key] = len(bounds)
+                if mapping is None:
+                    bounds.append((np.nan, np.nan))
+                else:
+                    interval = parse_range(mapping)
+                    lower, upper = interval.lower, interval.upper
+                    if lower is None:
+                        lower = upper - open_width
+                    if upper is None:
+                        upper = lower + open_width
+                    bounds.append((lower, upper))
+            index[row] = code
+
+        if not bounds:
+            continue
+        bounds = np.asarray(bounds, dtype=float)
+        lower = bounds[index, 0]
+        upper = bounds[index, 1]
+        coordinates[:, column] = lower + position[:, column] * (upper - lower)
+
+    return coordinates
+
+def placed_microsystems(microsystems, coordinates):
+    """
+    Attach numeric coordinates to copies of the microsystems.
+
+    Args:
+        microsystems (iterable): Microsystems of the model.
+        coordinates (np.ndarray): Output of ``place_coordinates`` in the same order.
+
+    Returns:
+        list: Copies of the microsystems with ``coordinates`` as X, Y, Z values
+            (None where a microsystem has no mapping on an axis).
+    """
+    placed = []
+    for microsystem, values in zip(microsystems, coordinates.tolist()):
+        microsystem = dict(microsystem)
+        microsystem['coordinates'] = {
+            axis: (None if value != value else value) for (axis, _), value in zip(AXIS_RULES, values)
+        }
+        placed.append(microsystem)
+    return placed
+
+def resolve_unmatched(mapping_config, unresolved, prompt=True):
+    """
+    Merge answers for unresolved microsystems back into the user-defined rules.
+
+    Each answered entry becomes a user rule of its axis, so the next mapping run
+    matches the microsystem through the rule index. An entry is answered by its
+    ``mapping`` value; entries without one are prompted for when ``prompt`` is set.
+    An entry may carry its own ``conditions`` to produce a broader rule than the
+    default one on the microsystem ID.
+
+    Args:
+        mapping_config (dict): Rule-based mapping configuration, updated in place.
+        unresolved (list): Entries of an unresolved report (see ``map_to_axis``).
+        prompt (bool): Whether to ask the user for entries without a mapping.
+
+    Returns:
+        list: Entries that are still unresolved.
+    """
+    remaining = []
+    for entry in unresolved:
+        mapping = entry.get('mapping')
+        if mapping is None and prompt:
+            mapping = int(input(f"Please provide a {entry['axis']}-axis mapping for microsystem ID {entry['id']}: "))
+        if mapping is None:
+            remaining.append(entry)
+            continue
+
+        rule = {'conditions': entry.get('conditions') or {'id': entry['id']}, 'mapping': mapping}
+        rules = user_rules(mapping_config, AXIS_KEYS[entry['axis']])
+        # Replace an earlier answer for the same conditions rather than shadowing it
+        positions = [k for k, r in enumerate(rules) if r['conditions'] == rule['conditions']]
+        if positions:
+            rules[positions[0]] = rule
+        else:
+            rules.append(rule)
+
+    return remaining
+
+@traced
+def resolve_main(unresolved_path, config_path, prompt=True):
+    """
+    Resolution pass: merge an unresolved report into the mapping configuration.
+
+    Args:
+        unresolved_path (str): Path to the unresolved report written by ``main``.
+        config_path (str): Path to the mapping configuration JSON file; the new
+            user-defined rules are added to it (see ``save_user_rules``).
+        prompt (bool): Whether to ask the user for entries without a mapping.
+    """
+    with open(unresolved_path, 'r') as file:
+        report = json.load(file)
+
+    mapping_config = load_mapping_configuration(config_path)
+    remaining = resolve_unmatched(mapping_config, report['unresolved'], prompt=prompt)
+
+    save_user_rules(config_path, mapping_config)
+
+    # Keep what is still open so the report can be completed later
+    with open(unresolved_path, 'w') as file:
+        json.dump({'unresolved': remaining}, file, indent=4)
+
+    print(f"Resolved {len(report['unresolved']) - len(remaining)} entries into {config_path}; "
+          f"{len(remaining)} remain in {unresolved_path}.")
+
+@traced
+def main(input_path, config_path, output_path, unresolved_path=None):
     """
     Main function to load data, map microsystems, and save the output.
+
+    Microsystems are streamed from the input to the output one at a time, so
+    memory does not grow with the model size.
     
     Args:
-        input_path (str): Path to the input JSON data file.
+        input_path (str): Path to the input JSON (or JSON Lines) data file.
         config_path (str): Path to the mapping configuration JSON file.
-        output_path (str): Path to save the mapped data.
+        output_path (str): Path to save the mapped data; a ``.jsonl`` path writes
+            one mapped microsystem per line.
+        unresolved_path (str, optional): Runs in batch mode: instead of prompting,
+            microsystems that match no rule are written to this JSON report,
+            to be answered later with ``resolve_main``.
     """
-    # Load input data
-    with open(input_path, 'r') as file:
-        json_data = json.load(file)
-    
     # Load mapping configuration
     mapping_config = load_mapping_configuration(config_path)
     
-    # Map microsystems to RAMI 4.0 axes
-    system_mapped_data = map_to_rami_axes(json_data, mapping_config)
-    
-    # Save output data
-    with open(output_path, 'w') as file:
-        json.dump(system_mapped_data, file, indent=4)
+    # Map microsystems to RAMI 4.0 axes while streaming them to the output
+    unresolved = [] if unresolved_path else None
+    microsystems = iter_microsystems(input_path)
+    write_items(output_path, map_microsystems(microsystems, mapping_config, unresolved=unresolved), indent=4)
     
     print(f"Mapped data has been saved to {output_path}.")
 
+    if unresolved_path:
+        with open(unresolved_path, 'w') as file:
+            json.dump({'unresolved': unresolved}, file, indent=4)
+        print(f"{len(unresolved)} unresolved mappings have been saved to {unresolved_path}.")
+
 if __name__ == "__main__":
     input_path = "input.json"  # Replace with actual input file path
     config_path = "mapping_config.json"  # Replace with actual config file path
     output_path = "mapped_output.json"  # Replace with desired output file path
-    main(input_path, config_path, output_path)
+    unresolved_path = None  # Set to e.g. "unresolved.json" to run in batch mode without prompts
+    main(input_path, config_path, output_path, unresolved_path)
@@ -1,71 +1,356 @@
 import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
+# Make the shared ramiviz package importable when this script is run directly
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
 
-def filter_dynamic_workflow(system_mapped_data, workflow_data):
+from ramiviz.columnar import save_model_file
+from ramiviz.streaming import iter_microsystems
+from ramiviz.trace import count, traced
+
+
+def microsystem_services(microsystem):
+    """
+    Get the services a microsystem provides or consumes.
+
+    Args:
+        microsystem (dict): Microsystem with ``provides`` and ``consumes`` lists
+            (or single service names).
+
+    Returns:
+        list: Provided services followed by consumed services.
+    """
+    services = []
+    for key in ('provides', 'consumes'):
+        value = microsystem.get(key, [])
+        services.extend([value] if isinstance(value, str) else value)
+    return services
+
+
+class SystemIndex:
+    """
+    Lookup structures over the microsystems of one system model.
+
+    Maps every service to the positions of the microsystems providing or consuming
+    it, so workflow steps are filtered with set unions instead of scanning all
+    microsystems. Build it once per system model and reuse it across workflows.
+
+    Args:
+        system_mapped_data (dict): The mapped data of microsystems from previous steps.
+        keep_microsystems (bool): Keep the microsystems themselves. Without them
+            only IDs and services are held, and the selected microsystems are
+            read again from the model file (see ``filter_workflow_stream``).
+    """
+
+    def __init__(self, system_mapped_data, keep_microsystems=True):
+        self.microsystems = [] if keep_microsystems else None
+        self.ids = []
+        self.service_index = {}
+        for position, microsystem in enumerate(system_mapped_data['microsystems']):
+            self.ids.append(microsystem['id'])
+            if keep_microsystems:
+                self.microsystems.append(microsystem)
+            for service in microsystem_services(microsystem):
+                self.service_index.setdefault(service, set()).add(position)
+
+    @classmethod
+    def from_microsystems(cls, microsystems, keep_microsystems=True):
+        """
+        Build the index from an iterable of microsystems, e.g. a model file stream.
+
+        Args:
+            microsystems (iterable): Microsystems of the system model.
+            keep_microsystems (bool): Keep the microsystems themselves.
+
+        Returns:
+            SystemIndex: The index.
+        """
+        return cls({'microsystems': microsystems}, keep_microsystems=keep_microsystems)
+
+    def positions_for_services(self, services):
+        """
+        Get the microsystems providing or consuming any of the given services.
+
+        Args:
+            services (list): Service names.
+
+        Returns:
+            set: Positions of the matching microsystems in the system model.
+        """
+        positions = set()
+        for service in services:
+            positions.update(self.service_index.get(service, ()))
+        return positions
+
+
+@traced
+def filter_dynamic_workflow(system_mapped_data, workflow_data, index=None):
     """
     Filters system mapped data based on a selected workflow and lifecycle phase.
 
     Args:
         system_mapped_data (dict): The mapped data of microsystems from previous steps.
         workflow_data (dict): Data of the selected workflow, including steps, services, and interactions.
+        index (SystemIndex, optional): Prebuilt index of ``system_mapped_data``. An
+            index built without ``keep_microsystems`` reads the selected
+            microsystems from ``system_mapped_data``.
 
     Returns:
         dict: Filtered data with microsystems and interactions specific to the selected workflow.
+
+    Raises:
+        ValueError: If ``index`` was built from a model with a different number of microsystems.
+    """
+    if index is None:
+        index = SystemIndex(system_mapped_data)
+
+    microsystems = index.microsystems
+    if microsystems is None:
+        microsystems = system_mapped_data['microsystems']
+        if len(microsystems) != len(index.ids):
+            raise ValueError(f"The index holds {len(index.ids)} microsystems, "
+                             f"the system model {len(microsystems)}")
+
+    positions, interactions = select_workflow(index, workflow_data)
+    return _usecase_data([microsystems[p] for p in positions], interactions)
+
+
+def select_workflow(index, workflow_data):
     """
-    # Initialize structure for storing relevant microsystems and interactions
-    usecase_mapped_data = {"microsystems": [], "interactions": []}
+    Select the microsystems and interactions of a workflow from a system index.
+
+    Args:
+        index (SystemIndex): Index of the system model.
+        workflow_data (dict): Data of the selected workflow, including steps, services, and interactions.
+
+    Returns:
+        list: Positions of the selected microsystems in the system model, in the
+            order they are first selected.
+        list: Interactions between microsystems of the same step.
+    """
+    selected = []
+    selected_positions = set()
+    selected_interactions = []
 
     # Process each workflow step
     for step in workflow_data['steps']:
-        step_id = step['step_id']
         services = step['services']
         interactions = step['interactions']
 
-        # Filter microsystems based on services
-        filtered_microsystems = [
-            m for m in system_mapped_data['microsystems']
-            if any(service in m['provides'] for service in services) or
-               any(service in m['consumes'] for service in services)
-        ]
-        usecase_mapped_data['microsystems'].extend(filtered_microsystems)
+        # Filter microsystems based on services, keeping the system model order
+        step_positions = index.positions_for_services(services)
+        selected.extend(sorted(step_positions - selected_positions))
+        selected_positions |= step_positions
 
         # Filter interactions between these microsystems
+        step_ids = {index.ids[p] for p in step_positions}
         for interaction in interactions:
-            if interaction['source_id'] in [m['id'] for m in filtered_microsystems] and \
-               interaction['target_id'] in [m['id'] for m in filtered_microsystems]:
-                usecase_mapped_data['interactions'].append(interaction)
+            if interaction['source_id'] in step_ids and interaction['target_id'] in step_ids:
+                selected_interactions.append(interaction)
 
-    # Remove duplicates
-    usecase_mapped_data['microsystems'] = list({m['id']: m for m in usecase_mapped_data['microsystems']}.values())
-    usecase_mapped_data['interactions'] = list({f"{i['source_id']}-{i['target_id']}": i
-                                                for i in usecase_mapped_data['interactions']}.values())
+    count('workflow_steps', len(workflow_data['steps']))
+    count('microsystems_selected', len(selected))
+    count('interactions_selected', len(selected_interactions))
+    return selected, selected_interactions
 
-    return usecase_mapped_data
 
+def _usecase_data(microsystems, interactions):
+    """
+    Build the use-case mapped data, removing duplicate microsystems and interactions.
 
-def main(system_data_path, workflow_data_path, output_path):
+    Args:
+        microsystems (list): Selected microsystems.
+        interactions (list): Selected interactions.
+
+    Returns:
+        dict: Filtered data with microsystems and interactions.
     """
-    Main function to filter data dynamically based on workflows.
+    return {
+        "microsystems": list({m['id']: m for m in microsystems}.values()),
+        "interactions": list({f"{i['source_id']}-{i['target_id']}": i for i in interactions}.values()),
+    }
+
+
+@traced
+def filter_workflow_stream(system_data_path, workflow_data, index=None):
+    """
+    Filter a workflow against a system model file without loading the model.
+
+    The model is streamed twice: once to index the IDs and services of its
+    microsystems (skipped when ``index`` is given) and once to pick up the
+    selected microsystems. Memory is bounded by the index and the result, not
+    by the model size.
 
     Args:
-        system_data_path (str): Path to the system mapped data file (JSON format).
+        system_data_path (str): Path to the system mapped data file (JSON or JSON Lines).
+        workflow_data (dict): Data of the selected workflow.
+        index (SystemIndex, optional): Index of the same model file, e.g. built
+            with ``keep_microsystems=False`` and reused across workflows.
+
+    Returns:
+        dict: Filtered data with microsystems and interactions specific to the selected workflow.
+    """
+    if index is None:
+        index = SystemIndex.from_microsystems(iter_microsystems(system_data_path), keep_microsystems=False)
+
+    positions, interactions = select_workflow(index, workflow_data)
+    wanted = set(positions)
+    found = {}
+    for position, microsystem in enumerate(iter_microsystems(system_data_path)):
+        if position in wanted:
+            found[position] = microsystem
+    return _usecase_data([found[p] for p in positions], interactions)
+
+
+# System model and index of a worker process, set once by _init_worker
+_worker_system_data = None
+_worker_index = None
+
+
+def _init_worker(system_mapped_data):
+    """
+    Build the system index once per worker process.
+
+    Args:
+        system_mapped_data (dict): The mapped data of microsystems from previous steps.
+    """
+    global _worker_system_data, _worker_index
+    _worker_system_data = system_mapped_data
+    _worker_index = SystemIndex(system_mapped_data)
+
+
+def _filter_in_worker(workflow_data):
+    """
+    Filter one workflow against the system model of the worker process.
+
+    Args:
+        workflow_data (dict): Data of the workflow.
+
+    Returns:
+        dict: Filtered data for the workflow.
+    """
+    return filter_dynamic_workflow(_worker_system_data, workflow_data, index=_worker_index)
+
+
+def _filter_file(system_mapped_data, index, workflow_data_path, output_path):
+    """
+    Load, filter and save one workflow file.
+
+    Args:
+        system_mapped_data (dict): The mapped data of microsystems from previous steps.
+        index (SystemIndex): Index of ``system_mapped_data``.
         workflow_data_path (str): Path to the workflow data file (JSON format).
         output_path (str): Path to save the filtered data.
+
+    Returns:
+        str: Path of the saved filtered data.
+    """
+    with open(workflow_data_path, 'r') as workflow_file:
+        workflow_data = json.load(workflow_file)
+
+    return save_model_file(filter_dynamic_workflow(system_mapped_data, workflow_data, index=index), output_path)
+
+
+def _filter_file_in_worker(workflow_data_path, output_path):
+    """
+    Load, filter and save one workflow file in a worker process.
+
+    Args:
+        workflow_data_path (str): Path to the workflow data file (JSON format).
+        output_path (str): Path to save the filtered data.
+
+    Returns:
+        str: Path of the saved filtered data.
     """
-    # Load system mapped data
+    return _filter_file(_worker_system_data, _worker_index, workflow_data_path, output_path)
+
+
+@traced
+def filter_workflows(system_mapped_data, workflows, index=None, processes=None):
+    """
+    Filter several workflows against one system model.
+
+    The system index is built once and shared by all workflows. With
+    ``processes`` greater than 1 the workflows are spread over a process pool
+    in which every worker builds the index once.
+
+    Args:
+        system_mapped_data (dict): The mapped data of microsystems from previous steps.
+        workflows (list): Workflow data of each workflow.
+        index (SystemIndex, optional): Prebuilt index of ``system_mapped_data``,
+            used when filtering in this process.
+        processes (int, optional): Number of worker processes.
+
+    Returns:
+        list: Filtered data of each workflow, in the order of ``workflows``.
+    """
+    if processes and processes > 1 and len(workflows) > 1:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(system_mapped_data,)) as pool:
+            return list(pool.map(_filter_in_worker, workflows))
+
+    if index is None:
+        index = SystemIndex(system_mapped_data)
+    return [filter_dynamic_workflow(system_mapped_data, workflow_data, index=index)
+            for workflow_data in workflows]
+
+
+@traced
+def main_batch(system_data_path, workflow_data_paths, output_paths, processes=None):
+    """
+    Filter several workflow files against one system model loaded once.
+
+    Args:
+        system_data_path (str): Path to the system mapped data file (JSON format).
+        workflow_data_paths (list): Paths to the workflow data files (JSON format).
+        output_paths (list): Paths to save the filtered data of each workflow.
+        processes (int, optional): Number of worker processes. Workers load,
+            filter and save their workflow files themselves.
+    """
+    if len(workflow_data_paths) != len(output_paths):
+        raise ValueError("Expected one output path per workflow data file.")
+
     with open(system_data_path, 'r') as system_file:
         system_mapped_data = json.load(system_file)
 
+    if processes and processes > 1 and len(workflow_data_paths) > 1:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(system_mapped_data,)) as pool:
+            saved = list(pool.map(_filter_file_in_worker, workflow_data_paths, output_paths))
+    else:
+        index = SystemIndex(system_mapped_data)
+        saved = [_filter_file(system_mapped_data, index, workflow_data_path, output_path)
+                 for workflow_data_path, output_path in zip(workflow_data_paths, output_paths)]
+
+    print(f"Filtered data of {len(saved)} workflows saved to {', '.join(saved)}")
+
+
+@traced
+def main(system_data_path, workflow_data_path, output_path):
+    """
+    Main function to filter data dynamically based on workflows.
+
+    The system model is streamed (see ``filter_workflow_stream``) rather than loaded.
+
+    Args:
+        system_data_path (str): Path to the system mapped data file (JSON or JSON Lines).
+        workflow_data_path (str): Path to the workflow data file (JSON format).
+        output_path (str): Path to save the filtered data; a ``.rami`` path writes
+            the columnar format read by the later stages without JSON parsing.
+    """
     # Load workflow data
     with open(workflow_data_path, 'r') as workflow_file:
         workflow_data = json.load(workflow_file)
 
-    # Perform dynamic workflow filtering
-    filtered_data = filter_dynamic_workflow(system_mapped_data, workflow_data)
+    # Perform dynamic workflow filtering over the streamed system model
+    filtered_data = filter_workflow_stream(system_data_path, workflow_data)
 
     # Save the filtered data
-    with open(output_path, 'w') as output_file:
-        json.dump(filtered_data, output_file, indent=4)
+    save_model_file(filtered_data, output_path)
 
     print(f"Filtered data saved to {output_path}")
 
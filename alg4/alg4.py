@@ -1,32 +1,218 @@
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+from itertools import chain, repeat
+from operator import itemgetter
 import numpy as np
-import json
-from sklearn.cluster import AgglomerativeClustering
-import matplotlib.pyplot as plt
+from scipy import sparse as sp
+from scipy.cluster import hierarchy
+from scipy.linalg import qr, svd
+from sklearn.manifold import spectral_embedding
 
-def create_interaction_matrix(system_data, usecase_data):
+# Make the shared ramiviz package importable when this script is run directly
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from ramiviz.columnar import load_model_json, save_model_file
+from ramiviz.render import create_figure, finish_figure
+from ramiviz.trace import count, traced
+
+# Larger models use a sparse (CSR) interaction matrix and the graph clustering backend
+DENSE_MAX_MICROSYSTEMS = 2000
+
+# Tick labels are only drawn for matrices up to this many microsystems
+MAX_LABELED_MICROSYSTEMS = 100
+
+# Cluster counts tried when n_clusters is "auto"
+AUTO_CLUSTER_RANGE = (2, 50)
+
+# Number of interaction matrices whose cluster trees are kept in memory
+CLUSTER_TREE_CACHE_SIZE = 4
+
+# Cluster trees of recently clustered matrices, keyed by a digest of the matrix
+_TREE_CACHE = OrderedDict()
+
+def _endpoint_positions(microsystem_ids, endpoints):
+    """
+    Look up the matrix index of many endpoint IDs at once.
+
+    Integer IDs are matched with a binary search over the sorted microsystem
+    IDs. Other and mixed IDs are matched in one dictionary pass, so an integer
+    never matches its string form.
+
+    Args:
+        microsystem_ids (list): Microsystem IDs in the order of the matrix rows/columns.
+        endpoints (list): Endpoint IDs to look up.
+
+    Returns:
+        np.ndarray: Index of each endpoint, -1 where it is not a known microsystem.
+    """
+    if not endpoints or not microsystem_ids:
+        return np.full(len(endpoints), -1, dtype=np.int64)
+
+    ids = None
+    if set(map(type, microsystem_ids)) == {int} and set(map(type, endpoints)) == {int}:
+        try:
+            ids = np.fromiter(microsystem_ids, dtype=np.int64, count=len(microsystem_ids))
+            values = np.fromiter(endpoints, dtype=np.int64, count=len(endpoints))
+        except OverflowError:
+            ids = None  # IDs beyond 64 bits are matched in the dictionary pass
+
+    if ids is not None:
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        found = np.searchsorted(sorted_ids, values).clip(max=len(ids) - 1)
+        return np.where(sorted_ids[found] == values, order[found], -1)
+
+    positions = {microsystem_id: position for position, microsystem_id in enumerate(microsystem_ids)}
+    return np.fromiter(map(positions.get, endpoints, repeat(-1)), dtype=np.int64, count=len(endpoints))
+
+def index_interactions(microsystem_ids, interactions):
+    """
+    Map the endpoints of all interactions to matrix indices in bulk.
+
+    IDs are looked up as they are, so integer, string and mixed IDs all match.
+
+    Args:
+        microsystem_ids (list): Microsystem IDs in the order of the matrix rows/columns.
+        interactions (list): Interactions with ``source_id`` and ``target_id``.
+
+    Returns:
+        np.ndarray: Row index of the source of each known interaction.
+        np.ndarray: Column index of the target of each known interaction.
+        np.ndarray: Boolean mask over ``interactions``, False where an endpoint ID
+            is not a known microsystem.
+    """
+    endpoints = list(map(itemgetter('source_id'), interactions))
+    endpoints += map(itemgetter('target_id'), interactions)
+    # Sources first, then targets; -1 marks endpoints that are not known microsystems
+    source_idx, target_idx = _endpoint_positions(microsystem_ids, endpoints).reshape(2, len(interactions))
+    known = (source_idx >= 0) & (target_idx >= 0)
+    return source_idx[known], target_idx[known], known
+
+def _services_of(interaction):
+    """Services carried by an interaction, from its ``services`` list or single ``service``."""
+    services = interaction.get('services')
+    if services is None:
+        services = [interaction['service']] if 'service' in interaction else []
+    return services
+
+def interaction_weights(interactions, service_weights=None):
+    """
+    Compute the strength of each interaction from the services it carries.
+
+    Args:
+        interactions (list): Interactions with a ``services`` list (or a single ``service``).
+        service_weights (dict, optional): Weight per service name; services not
+            listed weigh 1. Without it, the strength is the number of services.
+
+    Returns:
+        np.ndarray: Weight of each interaction; interactions without services weigh 1.
+    """
+    services = [_services_of(interaction) for interaction in interactions]
+    lengths = np.fromiter(map(len, services), dtype=np.int64, count=len(services))
+
+    if service_weights:
+        # Weigh all services in one flat pass, then sum the weights per interaction
+        flat = np.fromiter(map(service_weights.get, chain.from_iterable(services), repeat(1.0)),
+                           dtype=float, count=int(lengths.sum()))
+        owners = np.repeat(np.arange(len(services)), lengths)
+        weights = np.bincount(owners, weights=flat, minlength=len(services))
+    else:
+        weights = lengths.astype(float)
+    weights[lengths == 0] = 1.0
+    return weights
+
+@traced
+def create_interaction_matrix(system_data, usecase_data, sparse=None):
     """
     Create an interaction matrix for the system-of-microsystems.
     
     Args:
         system_data (dict): System mapped data containing microsystems and interactions.
         usecase_data (dict): Usecase mapped data filtered for the workflow.
+        sparse (bool, optional): Build a scipy.sparse CSR matrix, whose memory grows
+            with the number of interactions instead of the square of the number of
+            microsystems. By default it is used above DENSE_MAX_MICROSYSTEMS.
     
     Returns:
-        np.ndarray: Interaction matrix.
+        np.ndarray or scipy.sparse.csr_matrix: Interaction matrix.
         list: List of microsystem IDs in the order of the matrix rows/columns.
     """
-    microsystems = {m['id']: idx for idx, m in enumerate(system_data['microsystems'])}
-    n = len(microsystems)
-    interaction_matrix = np.zeros((n, n))
+    microsystem_ids = list({m['id']: None for m in system_data['microsystems']})
+    n = len(microsystem_ids)
+    if sparse is None:
+        sparse = n > DENSE_MAX_MICROSYSTEMS
+
+    source_idx, target_idx, known = index_interactions(microsystem_ids, usecase_data['interactions'])
+    count('interactions_dropped', len(known) - int(np.count_nonzero(known)))
+    # Assuming bidirectional interaction
+    rows = np.concatenate([source_idx, target_idx])
+    cols = np.concatenate([target_idx, source_idx])
 
-    for interaction in usecase_data['interactions']:
-        source_idx = microsystems.get(interaction['source_id'])
-        target_idx = microsystems.get(interaction['target_id'])
-        if source_idx is not None and target_idx is not None:
-            interaction_matrix[source_idx, target_idx] = 1
-            interaction_matrix[target_idx, source_idx] = 1  # Assuming bidirectional interaction
+    if sparse:
+        interaction_matrix = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+        interaction_matrix.data[:] = 1  # Repeated interactions are summed; keep the matrix binary
+    else:
+        interaction_matrix = np.zeros((n, n))
+        interaction_matrix[rows, cols] = 1
     
-    return interaction_matrix, list(microsystems.keys())
+    return interaction_matrix, microsystem_ids
+
+@traced
+def create_weighted_interaction_matrix(system_data, usecase_data, service_weights=None, sparse=None):
+    """
+    Create a weighted, directed interaction matrix for the system-of-microsystems.
+
+    Entry ``[i, j]`` sums the weights (see ``interaction_weights``) of all
+    interactions from microsystem ``i`` to microsystem ``j``. Use
+    ``symmetrize_interaction_matrix`` for the undirected interaction strength.
+
+    Args:
+        system_data (dict): System mapped data containing microsystems and interactions.
+        usecase_data (dict): Usecase mapped data filtered for the workflow.
+        service_weights (dict, optional): Weight per service name.
+        sparse (bool, optional): Build a scipy.sparse CSR matrix. By default it is
+            used above DENSE_MAX_MICROSYSTEMS.
+
+    Returns:
+        np.ndarray or scipy.sparse.csr_matrix: Directed interaction matrix.
+        list: List of microsystem IDs in the order of the matrix rows/columns.
+    """
+    microsystem_ids = list({m['id']: None for m in system_data['microsystems']})
+    n = len(microsystem_ids)
+    if sparse is None:
+        sparse = n > DENSE_MAX_MICROSYSTEMS
+
+    interactions = usecase_data['interactions']
+    source_idx, target_idx, known = index_interactions(microsystem_ids, interactions)
+    count('interactions_dropped', len(known) - int(np.count_nonzero(known)))
+    weights = interaction_weights(interactions, service_weights)[known]
+
+    if sparse:
+        # Duplicate (source, target) entries are summed on construction
+        interaction_matrix = sp.csr_matrix((weights, (source_idx, target_idx)), shape=(n, n))
+    else:
+        # Duplicate (source, target) entries are summed by the flat bincount
+        interaction_matrix = np.bincount(source_idx * n + target_idx, weights=weights,
+                                         minlength=n * n).reshape(n, n)
+
+    return interaction_matrix, microsystem_ids
+
+def symmetrize_interaction_matrix(interaction_matrix):
+    """
+    Derive the undirected interaction strength from a directed interaction matrix.
+
+    Args:
+        interaction_matrix (np.ndarray or scipy.sparse matrix): Directed interaction matrix.
+
+    Returns:
+        np.ndarray or scipy.sparse.csr_matrix: Matrix with ``[i, j] + [j, i]`` in both entries.
+    """
+    symmetric = interaction_matrix + interaction_matrix.T
+    return symmetric.tocsr() if sp.issparse(symmetric) else symmetric
 
 def assign_phases(system_data, phases):
     """
@@ -43,23 +229,318 @@ def assign_phases(system_data, phases):
         microsystem['phases'] = [phase for phase in phases if phase in microsystem.get('involvement', [])]
     return system_data
 
-def cluster_interactions(interaction_matrix, n_clusters):
+def _cluster_qr(vectors):
+    """
+    Assign labels from a spectral embedding by column-pivoted QR, as the
+    ``cluster_qr`` label assignment of scikit-learn's ``SpectralClustering``.
+
+    Args:
+        vectors (np.ndarray): Embedding of shape (n, k).
+
+    Returns:
+        np.ndarray: Cluster labels for each row.
+    """
+    k = vectors.shape[1]
+    _, _, pivots = qr(vectors.T, pivoting=True)
+    ut, _, v = svd(vectors[pivots[:k], :].T)
+    return np.abs(vectors @ (ut @ v.conj())).argmax(axis=1)
+
+class ClusterTree:
+    """
+    Clustering of one interaction matrix that can be cut at any number of clusters.
+
+    A dense matrix is clustered hierarchically: the average linkage tree over
+    the distances ``1 - strength`` is computed once, and each cut at ``k``
+    clusters only undoes the last ``k - 1`` merges. A sparse matrix is clustered
+    spectrally on the interaction graph using the first ``k`` columns of one
+    embedding. Embedding sizes are rounded up to powers of two, so a sweep over
+    ``k`` from 2 to 50 computes six embeddings instead of 49. Which embedding a
+    ``k`` uses depends on ``k`` alone, and its labels are kept, so a ``k`` is
+    clustered once and gets the same labels whichever other ``k`` were asked for
+    before.
+
+    Cuts are scored by the modularity of the labels on the symmetrized
+    interaction graph, which needs one pass over the interactions per cut.
+
+    Args:
+        interaction_matrix (np.ndarray or scipy.sparse matrix): Interaction matrix.
+    """
+
+    def __init__(self, interaction_matrix):
+        self.sparse = sp.issparse(interaction_matrix)
+        self.n = interaction_matrix.shape[0]
+        self.linkage = None
+        self._spectral_labels = {}
+        self._embedding = (0, None)
+
+        graph = sp.coo_matrix(interaction_matrix, dtype=float)
+        graph = (graph + graph.T).tocoo()
+        self._rows, self._cols, self._weights = graph.row, graph.col, graph.data
+        self._degrees = np.bincount(graph.row, weights=graph.data, minlength=self.n)
+
+        if self.sparse:
+            # Self-loops keep microsystems without interactions at a non-zero degree
+            self._affinity = sp.csr_matrix(interaction_matrix, dtype=float) + sp.identity(self.n, format='csr')
+        elif self.n > 1:
+            # Scale weighted interaction strengths to [0, 1] before converting to distances
+            max_strength = interaction_matrix.max()
+            if max_strength > 1:
+                interaction_matrix = interaction_matrix / max_strength
+            distances = 1 - interaction_matrix[np.triu_indices(self.n, k=1)]
+            self.linkage = hierarchy.linkage(distances, method='average')
+
+            # Every tree node covers a contiguous range of the leaf order; store where it starts
+            self._leaves = hierarchy.leaves_list(self.linkage)
+            self._sizes = np.concatenate([np.ones(self.n, dtype=np.int64), self.linkage[:, 3].astype(np.int64)])
+            starts = [0] * (2 * self.n - 1)
+            sizes = self._sizes.tolist()
+            for merge in range(self.n - 2, -1, -1):
+                left, right = self.linkage[merge, :2].astype(np.int64).tolist()
+                starts[left] = starts[self.n + merge]
+                starts[right] = starts[left] + sizes[left]
+            self._starts = np.asarray(starts, dtype=np.int64)
+
+    def _cut(self, n_clusters):
+        """
+        Cut the linkage tree by undoing its last ``n_clusters - 1`` merges.
+
+        Args:
+            n_clusters (int): Number of clusters to form.
+
+        Returns:
+            np.ndarray: Cluster labels for each microsystem, numbered in leaf order.
+        """
+        n = self.n
+        if n_clusters == 1:
+            roots = np.array([2 * n - 2])
+        else:
+            roots = self.linkage[n - n_clusters:, :2].astype(np.int64).ravel()
+            roots = roots[roots < 2 * n - n_clusters]
+        roots = roots[np.argsort(self._starts[roots])]
+        labels = np.empty(n, dtype=np.int64)
+        labels[self._leaves] = np.repeat(np.arange(len(roots)), self._sizes[roots])
+        return labels
+
+    def _spectral_embedding(self, n_clusters):
+        """
+        Get the spectral embedding used for a number of clusters.
+
+        Its size is ``n_clusters`` rounded up to a power of two (at most the
+        number of microsystems). Only the last embedding is kept; sweeps ask
+        for ascending numbers of clusters, so each size is computed once.
+
+        Args:
+            n_clusters (int): Number of clusters to form.
+
+        Returns:
+            np.ndarray: Embedding of shape (n, size).
+        """
+        n_components = min(1 << (n_clusters - 1).bit_length(), self.n)
+        if self._embedding[0] != n_components:
+            count('spectral_embeddings')
+            self._embedding = (n_components, spectral_embedding(self._affinity, n_components=n_components,
+                                                                random_state=0, drop_first=False))
+        return self._embedding[1]
+
+    def _check_cluster_count(self, n_clusters):
+        if not 1 <= n_clusters <= self.n:
+            raise ValueError(f"Cannot form {n_clusters} clusters from {self.n} microsystems")
+
+    def labels(self, n_clusters):
+        """
+        Cut the clustering at a number of clusters.
+
+        Args:
+            n_clusters (int): Number of clusters to form.
+
+        Returns:
+            np.ndarray: Cluster labels for each microsystem.
+
+        Raises:
+            ValueError: If ``n_clusters`` is not between 1 and the number of microsystems.
+        """
+        return self.sweep([n_clusters])[n_clusters]
+
+    def sweep(self, cluster_counts):
+        """
+        Cut the clustering at several numbers of clusters at once.
+
+        Args:
+            cluster_counts (iterable): Numbers of clusters to form.
+
+        Returns:
+            dict: Cluster labels for each microsystem, keyed by the number of clusters.
+
+        Raises:
+            ValueError: If a number of clusters is not between 1 and the number of microsystems.
+        """
+        cluster_counts = sorted(set(cluster_counts))
+        for n_clusters in cluster_counts:
+            self._check_cluster_count(n_clusters)
+        if not cluster_counts:
+            return {}
+
+        if self.sparse:
+            for k in cluster_counts:
+                if k not in self._spectral_labels:
+                    self._spectral_labels[k] = _cluster_qr(self._spectral_embedding(k)[:, :k])
+            return {k: self._spectral_labels[k].copy() for k in cluster_counts}
+
+        if self.linkage is None:
+            return {k: np.zeros(self.n, dtype=np.int64) for k in cluster_counts}
+        return {k: self._cut(k) for k in cluster_counts}
+
+    def cut_distance(self, distance_threshold):
+        """
+        Cut the linkage tree of a dense matrix at a distance.
+
+        Args:
+            distance_threshold (float): Largest average distance (``1 - strength``,
+                with strengths scaled to [0, 1]) at which clusters are still merged.
+
+        Returns:
+            np.ndarray: Cluster labels for each microsystem.
+
+        Raises:
+            ValueError: If the matrix is sparse, as it is not clustered hierarchically.
+        """
+        if self.sparse:
+            raise ValueError("Distance cuts need a dense interaction matrix; sparse matrices are clustered spectrally")
+        if self.linkage is None:
+            return np.zeros(self.n, dtype=np.int64)
+        clusters = hierarchy.fcluster(self.linkage, distance_threshold, criterion='distance')
+        return np.unique(clusters, return_inverse=True)[1]
+
+    def modularity(self, labels):
+        """
+        Compute the modularity of a clustering on the symmetrized interaction graph.
+
+        Args:
+            labels (np.ndarray): Cluster labels for each microsystem.
+
+        Returns:
+            float: Modularity between -0.5 and 1; 0 for a graph without interactions.
+        """
+        labels = np.asarray(labels)
+        total = self._weights.sum()
+        if total == 0:
+            return 0.0
+        inside = self._weights[labels[self._rows] == labels[self._cols]].sum()
+        cluster_degrees = np.bincount(labels, weights=self._degrees)
+        return float(inside / total - ((cluster_degrees / total) ** 2).sum())
+
+    def select(self, min_clusters=AUTO_CLUSTER_RANGE[0], max_clusters=AUTO_CLUSTER_RANGE[1]):
+        """
+        Select the number of clusters with the highest modularity.
+
+        Args:
+            min_clusters (int): Smallest number of clusters to try.
+            max_clusters (int): Largest number of clusters to try; capped at the
+                number of microsystems.
+
+        Returns:
+            int: Selected number of clusters (the smallest one on ties).
+            np.ndarray: Cluster labels for each microsystem.
+            dict: Modularity of every number of clusters tried.
+        """
+        max_clusters = min(max_clusters, self.n)
+        min_clusters = min(max(min_clusters, 1), max_clusters)
+        cuts = self.sweep(range(min_clusters, max_clusters + 1))
+        scores = {k: self.modularity(labels) for k, labels in cuts.items()}
+        best = max(scores, key=lambda k: (scores[k], -k))
+        return best, cuts[best], scores
+
+def _matrix_digest(interaction_matrix):
+    """
+    Hash the content of an interaction matrix.
+
+    Args:
+        interaction_matrix (np.ndarray or scipy.sparse matrix): Interaction matrix.
+
+    Returns:
+        str: Hex digest of the shape, storage format and values.
+    """
+    digest = hashlib.sha256(str(interaction_matrix.shape).encode())
+    if sp.issparse(interaction_matrix):
+        matrix = sp.csr_matrix(interaction_matrix, dtype=float, copy=True)
+        matrix.sum_duplicates()
+        digest.update(b'sparse')
+        for array in (matrix.indptr, matrix.indices, matrix.data):
+            digest.update(np.ascontiguousarray(array).tobytes())
+    else:
+        digest.update(b'dense')
+        digest.update(np.ascontiguousarray(interaction_matrix, dtype=float).tobytes())
+    return digest.hexdigest()
+
+def cluster_tree(interaction_matrix):
+    """
+    Get the cluster tree of an interaction matrix, reusing the one built for
+    an equal matrix if it is still cached.
+
+    Args:
+        interaction_matrix (np.ndarray or scipy.sparse matrix): Interaction matrix.
+
+    Returns:
+        ClusterTree: Cluster tree of the matrix.
+    """
+    key = _matrix_digest(interaction_matrix)
+    tree = _TREE_CACHE.get(key)
+    if tree is None:
+        tree = _TREE_CACHE[key] = ClusterTree(interaction_matrix)
+        while len(_TREE_CACHE) > CLUSTER_TREE_CACHE_SIZE:
+            _TREE_CACHE.popitem(last=False)
+    else:
+        _TREE_CACHE.move_to_end(key)
+        count('cluster_tree_cache_hits')
+    return tree
+
+@traced
+def cluster_interactions(interaction_matrix, n_clusters, distance_threshold=None):
     """
     Perform clustering on the interaction matrix.
 
+    The clustering of a matrix is computed once and cached (see ``cluster_tree``),
+    so clustering the same matrix again at another number of clusters only cuts
+    it. A sparse interaction matrix is clustered as a graph without ever
+    building a dense distance matrix.
+
     Args:
-        interaction_matrix (np.ndarray): Interaction matrix.
+        interaction_matrix (np.ndarray or scipy.sparse matrix): Interaction matrix.
+        n_clusters (int or str): Number of clusters to form, or ``"auto"`` to
+            select the number in ``AUTO_CLUSTER_RANGE`` with the highest modularity.
+        distance_threshold (float, optional): Cut a dense matrix's linkage tree at
+            this distance instead of at ``n_clusters`` (see ``ClusterTree.cut_distance``).
+
+    Returns:
+        np.ndarray: Cluster labels for each microsystem.
+    """
+    tree = cluster_tree(interaction_matrix)
+    if distance_threshold is not None:
+        return tree.cut_distance(distance_threshold)
+    if n_clusters == 'auto':
+        return tree.select()[1]
+    return tree.labels(n_clusters)
+
+def cluster_interaction_graph(interaction_matrix, n_clusters):
+    """
+    Cluster a sparse interaction matrix with spectral clustering on the
+    interaction graph, using O(interactions) memory.
+
+    Every microsystem gets a self-loop so that microsystems without interactions
+    keep a non-zero degree; they end up in the cluster of their nearest
+    neighbours in the spectral embedding.
+
+    Args:
+        interaction_matrix (scipy.sparse matrix): Symmetric interaction matrix.
         n_clusters (int): Number of clusters to form.
-    
+
     Returns:
         np.ndarray: Cluster labels for each microsystem.
     """
-    clustering_model = AgglomerativeClustering(n_clusters=n_clusters, affinity='precomputed', linkage='average')
-    distance_matrix = 1 - interaction_matrix  # Convert to distance matrix
-    labels = clustering_model.fit_predict(distance_matrix)
-    return labels
+    return cluster_tree(sp.csr_matrix(interaction_matrix)).labels(n_clusters)
 
-def visualize_interaction_matrix(interaction_matrix, labels, microsystem_ids):
+@traced
+def visualize_interaction_matrix(interaction_matrix, labels, microsystem_ids, figure_path=None):
     """
     Visualize the interaction matrix with clusters.
 
@@ -67,48 +548,73 @@ def visualize_interaction_matrix(interaction_matrix, labels, microsystem_ids):
         interaction_matrix (np.ndarray): Interaction matrix.
         labels (np.ndarray): Cluster labels for each microsystem.
         microsystem_ids (list): List of microsystem IDs.
+        figure_path (str, optional): Write the figure to this file (PNG, SVG, ...)
+            without a display instead of showing it.
+
+    Returns:
+        matplotlib.figure.Figure: The figure.
     """
     sorted_indices = np.argsort(labels)
     sorted_matrix = interaction_matrix[sorted_indices, :][:, sorted_indices]
     sorted_ids = [microsystem_ids[i] for i in sorted_indices]
 
-    plt.figure(figsize=(10, 8))
-    plt.imshow(sorted_matrix, cmap='Blues', interpolation='none')
-    plt.colorbar(label='Interaction Strength')
-    plt.xticks(range(len(sorted_ids)), sorted_ids, rotation=90)
-    plt.yticks(range(len(sorted_ids)), sorted_ids)
-    plt.title("Interaction Matrix with Clustering")
-    plt.show()
+    fig = create_figure(figsize=(10, 8), headless=figure_path is not None)
+    ax = fig.add_subplot(111)
+    if sp.issparse(sorted_matrix):
+        # Plot the non-zero entries only; a dense image of a large model does not fit in memory
+        ax.spy(sorted_matrix, markersize=max(0.1, 400 / max(len(sorted_ids), 1)), color='tab:blue')
+    else:
+        image = ax.imshow(sorted_matrix, cmap='Blues', interpolation='none')
+        fig.colorbar(image, ax=ax, label='Interaction Strength')
+    if len(sorted_ids) <= MAX_LABELED_MICROSYSTEMS:
+        ax.set_xticks(range(len(sorted_ids)), sorted_ids, rotation=90)
+        ax.set_yticks(range(len(sorted_ids)), sorted_ids)
+    ax.set_title("Interaction Matrix with Clustering")
+    return finish_figure(fig, figure_path)
 
-def main(system_data_path, usecase_data_path, phases, n_clusters, output_path):
+@traced
+def main(system_data_path, usecase_data_path, phases, n_clusters, output_path, weighted=False, service_weights=None,
+         figure_path=None):
     """
     Main function to execute the algorithm.
 
     Args:
-        system_data_path (str): Path to system mapped data JSON.
-        usecase_data_path (str): Path to usecase mapped data JSON.
+        system_data_path (str): Path to system mapped data JSON or a columnar ``.rami`` model.
+        usecase_data_path (str): Path to usecase mapped data JSON or a columnar ``.rami`` model.
         phases (list): List of engineering phases.
-        n_clusters (int): Number of clusters to form.
-        output_path (str): Path to save the updated system data.
+        n_clusters (int or str): Number of clusters to form, or ``"auto"`` to select it
+            by modularity.
+        output_path (str): Path to save the updated system data; a ``.rami`` path
+            writes the columnar format (coordinates, stakeholders, clusters).
+        weighted (bool): Cluster on the symmetrized weighted interaction strength
+            instead of binary adjacency. Off by default, as binary adjacency is
+            what this algorithm has always clustered.
+        service_weights (dict, optional): Weight per service name for the weighted matrix.
+        figure_path (str, optional): Write the interaction matrix figure to this
+            file instead of showing it.
     """
-    with open(system_data_path, 'r') as system_file:
-        system_data = json.load(system_file)
-    
-    with open(usecase_data_path, 'r') as usecase_file:
-        usecase_data = json.load(usecase_file)
+    system_data = load_model_json(system_data_path)
+    usecase_data = load_model_json(usecase_data_path)
     
-    interaction_matrix, microsystem_ids = create_interaction_matrix(system_data, usecase_data)
+    if weighted:
+        directed_matrix, microsystem_ids = create_weighted_interaction_matrix(
+            system_data, usecase_data, service_weights=service_weights
+        )
+        interaction_matrix = symmetrize_interaction_matrix(directed_matrix)
+    else:
+        interaction_matrix, microsystem_ids = create_interaction_matrix(system_data, usecase_data)
     system_data = assign_phases(system_data, phases)
     labels = cluster_interactions(interaction_matrix, n_clusters)
+    if n_clusters == 'auto':
+        print(f"Selected {len(np.unique(labels))} clusters")
 
-    visualize_interaction_matrix(interaction_matrix, labels, microsystem_ids)
+    visualize_interaction_matrix(interaction_matrix, labels, microsystem_ids, figure_path=figure_path)
 
     # Add cluster labels to microsystems
     for microsystem, label in zip(system_data['microsystems'], labels):
         microsystem['cluster'] = int(label)
     
-    with open(output_path, 'w') as output_file:
-        json.dump(system_data, output_file, indent=4)
+    save_model_file(system_data, output_path)
     
     print(f"Updated system data saved to {output_path}")
 
@@ -117,7 +623,8 @@ if __name__ == "__main__":
     system_data_path = "system_mapped_data.json"  # Replace with actual path
     usecase_data_path = "usecase_mapped_data.json"  # Replace with actual path
     phases = ["Design", "Development", "Production", "Maintenance"]  # Example phases
-    n_clusters = 3  # Number of clusters to form
+    n_clusters = 3  # Number of clusters to form, or "auto"
     output_path = "updated_system_data.json"  # Replace with desired output path
+    figure_path = None  # Set to e.g. "interaction_matrix.png" to render without a display
     
-    main(system_data_path, usecase_data_path, phases, n_clusters, output_path)
+    main(system_data_path, usecase_data_path, phases, n_clusters, output_path, figure_path=figure_path)
@@ -1,8 +1,25 @@
+import os
+import sys
 import json
-import matplotlib.pyplot as plt
+from matplotlib.colors import LightSource, to_rgba_array
 from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import numpy as np
 
+# Make the shared ramiviz package importable when this script is run directly
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from ramiviz.columnar import ColumnarModel, load_model_file
+from ramiviz.geometry import ellipsoid_mesh, mesh_resolution
+from ramiviz.model_index import ModelIndex
+from ramiviz.render import create_figure, finish_figure
+from ramiviz.trace import count, traced
+
+# With more microsystems in view, one glyph is drawn per occupied RAMI 4.0 cell
+AGGREGATE_MIN_MICROSYSTEMS = 500
+
 def load_visual_config(config_path):
     """
     Load the visualization configuration for RAMI 4.0 cube.
@@ -26,23 +43,185 @@ def draw_ellipsoid(ax, center, radii, color):
         radii (tuple): Radii of the ellipsoid (a, b, c).
         color (str): Color of the ellipsoid.
     """
-    u = np.linspace(0, 2 * np.pi, 100)
-    v = np.linspace(0, np.pi, 100)
-    x = radii[0] * np.outer(np.cos(u), np.sin(v)) + center[0]
-    y = radii[1] * np.outer(np.sin(u), np.sin(v)) + center[1]
-    z = radii[2] * np.outer(np.ones_like(u), np.cos(v)) + center[2]
-    ax.plot_surface(x, y, z, color=color, alpha=0.6)
+    draw_ellipsoids(ax, [center], radii, [color], resolution=40)
+
+def draw_ellipsoids(ax, centers, radii, colors, resolution=None):
+    """
+    Draw all microsystem ellipsoids as a single merged mesh.
+
+    Args:
+        ax (mpl_toolkits.mplot3d.Axes3D): 3D Axes instance.
+        centers (array-like): Centers of the ellipsoids, shape (n, 3).
+        radii (array-like): Radii (a, b, c), shared or one row per ellipsoid.
+        colors (list): Color of each ellipsoid.
+        resolution (int, optional): Grid resolution of every ellipsoid. By default
+            it decreases with the number of ellipsoids (see ``mesh_resolution``).
+
+    Returns:
+        Poly3DCollection: The mesh added to the axes, or None if there is nothing to draw.
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+    if not len(centers):
+        return None
+    if resolution is None:
+        resolution = mesh_resolution(len(centers))
+    count('ellipsoids_drawn', len(centers))
+
+    vertices, faces = ellipsoid_mesh(centers, radii, resolution)
+    polygons = vertices[faces]
+    faces_per_ellipsoid = len(faces) // len(centers)
+    face_colors = np.repeat(to_rgba_array(colors, alpha=0.6), faces_per_ellipsoid, axis=0)
+
+    # Shade faces by their orientation, as plot_surface does
+    normals = np.cross(polygons[:, 1] - polygons[:, 0], polygons[:, 2] - polygons[:, 0])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shade = LightSource(azdeg=225, altdeg=19.4712).shade_normals(normals, fraction=1.0)
+    shade = np.nan_to_num(shade, nan=1.0)  # Degenerate triangles at the poles
+    face_colors[:, :3] *= (0.3 + 0.7 * shade)[:, np.newaxis]
+
+    mesh = Poly3DCollection(polygons, facecolors=face_colors, linewidths=0)
+    ax.add_collection3d(mesh)
+    return mesh
+
+def aggregate_cells(centers, colors):
+    """
+    Bin microsystems into the integer cells of the RAMI 4.0 cube
+    (hierarchy level x lifecycle stage x architecture layer).
 
-def visualize_3d_rami_cube(system_data, usecase_data, visual_config):
+    Args:
+        centers (np.ndarray): Microsystem coordinates of shape (n, 3).
+        colors (list): Color of each microsystem, as a name or an RGB(A) sequence.
+
+    Returns:
+        dict: ``cells`` (k, 3) integer cell coordinates, ``cell_of`` (n,) cell index
+            of every microsystem, ``counts`` (k,) microsystems per cell, ``centers``
+            (k, 3) mean position of the microsystems in each cell and ``colors``
+            (k, 4) the most frequent color in each cell as RGBA.
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+    if not len(centers):
+        return {
+            'cells': np.zeros((0, 3), dtype=np.int64),
+            'cell_of': np.zeros(0, dtype=np.intp),
+            'counts': np.zeros(0, dtype=np.intp),
+            'centers': np.zeros((0, 3)),
+            'colors': np.zeros((0, 4)),
+        }
+
+    cells, cell_of, counts = np.unique(
+        np.floor(centers).astype(np.int64), axis=0, return_inverse=True, return_counts=True
+    )
+    cell_of = cell_of.ravel()
+
+    cell_centers = np.zeros((len(cells), 3))
+    np.add.at(cell_centers, cell_of, centers)
+    cell_centers /= counts[:, np.newaxis]
+
+    # Compare colors as RGBA, so names, hex strings and RGB tuples of one color agree
+    palette, color_of = np.unique(to_rgba_array(colors), axis=0, return_inverse=True)
+    color_counts = np.bincount(cell_of * len(palette) + color_of.ravel(), minlength=len(cells) * len(palette))
+    dominant = color_counts.reshape(len(cells), len(palette)).argmax(axis=1)
+
+    return {
+        'cells': cells,
+        'cell_of': cell_of,
+        'counts': counts,
+        'centers': cell_centers,
+        'colors': palette[dominant],
+    }
+
+def draw_cell_glyphs(ax, centers, radii, colors, expand_cells=None, max_glyph_scale=3.0, resolution=None):
+    """
+    Draw one ellipsoid per occupied RAMI 4.0 cell, scaled with the cube root of
+    its microsystem count and labeled with the count. Selected cells are
+    expanded into their individual microsystems.
+
+    Args:
+        ax (mpl_toolkits.mplot3d.Axes3D): 3D Axes instance.
+        centers (np.ndarray): Microsystem coordinates of shape (n, 3).
+        radii (tuple): Radii (a, b, c) of a single microsystem.
+        colors (list): Color of each microsystem.
+        expand_cells (list, optional): Cells (x, y, z) whose microsystems are drawn individually.
+        max_glyph_scale (float): Largest scale factor of a cell glyph.
+        resolution (int, optional): Grid resolution of the ellipsoids.
+
+    Returns:
+        dict: Cell aggregation (see ``aggregate_cells``) of the microsystems with
+            finite coordinates; the others have no cell and are not drawn.
+    """
+    placed = np.flatnonzero(np.isfinite(centers).all(axis=1))
+    centers = centers[placed]
+    colors = [colors[i] for i in placed]
+    aggregation = aggregate_cells(centers, colors)
+    cells = aggregation['cells']
+
+    expanded = np.zeros(len(cells), dtype=bool)
+    if expand_cells:
+        selected = {tuple(int(v) for v in cell) for cell in expand_cells}
+        expanded = np.array([tuple(cell) in selected for cell in cells.tolist()], dtype=bool)
+
+    individual = np.flatnonzero(expanded[aggregation['cell_of']])
+    draw_ellipsoids(ax, centers[individual], radii, [colors[i] for i in individual], resolution=resolution)
+
+    glyphs = np.flatnonzero(~expanded)
+    counts = aggregation['counts'][glyphs]
+    scale = np.minimum(np.cbrt(counts), max_glyph_scale)[:, np.newaxis]
+    glyph_radii = scale * np.asarray(radii, dtype=float)
+    glyph_centers = aggregation['centers'][glyphs]
+    draw_ellipsoids(ax, glyph_centers, glyph_radii, aggregation['colors'][glyphs], resolution=resolution)
+
+    for center, radius, cell_count in zip(glyph_centers, glyph_radii, counts):
+        ax.text(center[0], center[1], center[2] + radius[2], str(cell_count), ha='center', va='bottom', fontsize=8)
+
+    return aggregation
+
+def draw_edges(ax, coordinates, sources, targets):
+    """
+    Draw edges between positions as one dashed line with NaN-separated segments.
+
+    Args:
+        ax (mpl_toolkits.mplot3d.Axes3D): 3D Axes instance.
+        coordinates (np.ndarray): Microsystem coordinates of shape (n, 3).
+        sources (np.ndarray): Position of the source of each edge.
+        targets (np.ndarray): Position of the target of each edge.
+
+    Returns:
+        list: Lines added to the axes (empty if there are no edges).
+    """
+    if len(sources) == 0:
+        return []
+    count('edges_drawn', len(sources))
+    segments = np.full((len(sources), 3, 3), np.nan)
+    segments[:, 0] = coordinates[sources]
+    segments[:, 1] = coordinates[targets]
+    x, y, z = segments.reshape(-1, 3).T
+    return ax.plot(x, y, z, color='black', linestyle='--', alpha=0.8)
+
+@traced
+def visualize_3d_rami_cube(system_data, usecase_data, visual_config, figure_path=None, aggregate=None,
+                           expand_cells=None, index=None):
     """
     Visualize the 3D RAMI 4.0 cube for microsystems.
     
     Args:
         system_data (dict): Data for system mapped microsystems.
-        usecase_data (dict): Data for use-case mapped microsystems.
+        usecase_data (dict or ColumnarModel): Data for use-case mapped microsystems,
+            as JSON data or a (memory-mapped) columnar model.
         visual_config (dict): Visualization configuration.
+        figure_path (str, optional): Write the figure to this file (PNG, SVG, ...)
+            without a display instead of showing it.
+        aggregate (bool, optional): Draw one glyph per occupied RAMI 4.0 cell
+            (see ``draw_cell_glyphs``). By default this happens when more than
+            AGGREGATE_MIN_MICROSYSTEMS microsystems lie within the axis limits,
+            so zooming in (narrowing the limits) brings back individual ellipsoids.
+        expand_cells (list, optional): Cells (x, y, z) drawn as individual
+            microsystems in aggregated mode.
+        index (ModelIndex, optional): Prebuilt index of the use-case microsystems.
+
+    Returns:
+        matplotlib.figure.Figure: The figure.
     """
-    fig = plt.figure(figsize=(10, 10))
+    fig = create_figure(figsize=(10, 10), headless=figure_path is not None)
     ax = fig.add_subplot(111, projection='3d')
 
     # Plot RAMI 4.0 cube boundaries
@@ -54,50 +233,62 @@ def visualize_3d_rami_cube(system_data, usecase_data, visual_config):
     ax.set_zlabel("Architecture Layers (Z-Axis)")
     ax.set_title("3D Visualization of Microsystems in RAMI 4.0 Cube")
 
-    # Visualize microsystems
-    for microsystem in usecase_data['microsystems']:
-        center = (
-            microsystem['coordinates']['X'],
-            microsystem['coordinates']['Y'],
-            microsystem['coordinates']['Z']
-        )
-        radii = visual_config['ellipsoid_radii']
-        color = visual_config['stakeholder_colors'].get(microsystem['stakeholder'], 'blue')
-        draw_ellipsoid(ax, center, radii, color)
+    if isinstance(usecase_data, ColumnarModel):
+        if index is None:
+            index = usecase_data.model_index()
+        stakeholders = usecase_data.stakeholders.tolist()
+        sources, targets = usecase_data.sources, usecase_data.targets
+    else:
+        if index is None:
+            index = ModelIndex(usecase_data['microsystems'])
+        stakeholders = [m['stakeholder'] for m in usecase_data['microsystems']]
+        sources, targets = index.edge_positions(usecase_data['interactions'])
+
+    # Visualize microsystems as one mesh
+    centers = index.coordinates
+    colors = [visual_config['stakeholder_colors'].get(s, 'blue') for s in stakeholders]
+
+    if aggregate is None:
+        limits = np.array([visual_config['x_limits'], visual_config['y_limits'], visual_config['z_limits']], dtype=float)
+        in_view = np.all((centers >= limits[:, 0]) & (centers <= limits[:, 1]), axis=1)
+        aggregate = np.count_nonzero(in_view) > AGGREGATE_MIN_MICROSYSTEMS
+
+    if aggregate:
+        draw_cell_glyphs(ax, centers, visual_config['ellipsoid_radii'], colors, expand_cells=expand_cells,
+                         max_glyph_scale=visual_config.get('max_glyph_scale', 3.0),
+                         resolution=visual_config.get('mesh_resolution'))
+    else:
+        draw_ellipsoids(ax, centers, visual_config['ellipsoid_radii'], colors,
+                        resolution=visual_config.get('mesh_resolution'))
 
     # Visualize interactions
-    for interaction in usecase_data['interactions']:
-        source = next(m for m in usecase_data['microsystems'] if m['id'] == interaction['source_id'])
-        target = next(m for m in usecase_data['microsystems'] if m['id'] == interaction['target_id'])
-        ax.plot(
-            [source['coordinates']['X'], target['coordinates']['X']],
-            [source['coordinates']['Y'], target['coordinates']['Y']],
-            [source['coordinates']['Z'], target['coordinates']['Z']],
-            color='black', linestyle='--', alpha=0.8
-        )
+    draw_edges(ax, centers, sources, targets)
 
-    plt.show()
+    return finish_figure(fig, figure_path)
 
-def main(system_data_path, usecase_data_path, config_path):
+@traced
+def main(system_data_path, usecase_data_path, config_path, figure_path=None):
     """
     Main function to execute the 3D visualization.
 
     Args:
         system_data_path (str): Path to the system mapped data file (JSON).
-        usecase_data_path (str): Path to the use-case mapped data file (JSON).
+        usecase_data_path (str): Path to the use-case mapped data, a JSON file or a
+            columnar ``.rami`` directory.
         config_path (str): Path to the visualization configuration file (JSON).
+        figure_path (str, optional): Write the figure to this file instead of showing it.
     """
     with open(system_data_path, 'r') as system_file:
         system_data = json.load(system_file)
     
-    with open(usecase_data_path, 'r') as usecase_file:
-        usecase_data = json.load(usecase_file)
+    usecase_data = load_model_file(usecase_data_path)
     
     visual_config = load_visual_config(config_path)
-    visualize_3d_rami_cube(system_data, usecase_data, visual_config)
+    visualize_3d_rami_cube(system_data, usecase_data, visual_config, figure_path=figure_path)
 
 if __name__ == "__main__":
     system_data_path = "system_mapped_data.json"  # Replace with actual path
     usecase_data_path = "usecase_mapped_data.json"  # Replace with actual path
     config_path = "visual_config.json"  # Replace with actual path
-    main(system_data_path, usecase_data_path, config_path)
+    figure_path = None  # Set to e.g. "rami_cube.png" to render without a display
+    main(system_data_path, usecase_data_path, config_path, figure_path)
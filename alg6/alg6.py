@@ -1,56 +1,423 @@
+import os
+import sys
 import json
-import matplotlib.pyplot as plt
+import bisect
 import numpy as np
 
+# Make the shared ramiviz package importable when this script is run directly
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from ramiviz.columnar import load_model_json
+from ramiviz.render import create_figure, finish_figure
+from ramiviz.trace import count, traced
+
+# Value metrics of every microsystem and their axis labels
+METRICS = ("profit", "cost", "environmental_impact")
+METRIC_LABELS = {"profit": "Profit", "cost": "Engineering Cost", "environmental_impact": "Environmental Impact"}
+
+# With more microsystems, the projection is drawn as a binned image (raster mode)
+RASTER_MIN_MICROSYSTEMS = 2000
+
+# Grid cells of the binned image along the hierarchy and lifecycle axes
+RASTER_BINS = (240, 160)
+
+# Microsystems with the highest profit annotated in raster mode
+RASTER_TOP_K = 20
+
+# Sign turning each value metric into an objective to minimize: profit is maximized
+OBJECTIVE_SIGNS = {"profit": -1.0, "cost": 1.0, "environmental_impact": 1.0}
+
+# Weight of each normalized value metric in the weighted score
+DEFAULT_WEIGHTS = {"profit": 1.0, "cost": 1.0, "environmental_impact": 1.0}
+
+# Weights of the objective sums whose minima prefilter pareto_front
+PARETO_PIVOT_WEIGHTS = ((1, 1, 1), (4, 1, 1), (1, 4, 1), (1, 1, 4))
+
+# Marker size of the ring around microsystems on the Pareto front
+PARETO_MARKER_SIZE = 120
+
+class ValueMetrics:
+    """
+    Value metrics of many microsystems as columns (see METRICS).
+
+    The rows are sorted by microsystem ID once, so joining the metrics onto a
+    list of microsystems is one ``np.searchsorted`` call instead of a dict
+    lookup per microsystem.
+
+    Args:
+        ids (list): Microsystem IDs.
+        values (np.ndarray): Metrics of shape (n, 3), columns in METRICS order.
+
+    Raises:
+        ValueError: If a microsystem ID appears more than once.
+    """
+
+    def __init__(self, ids, values):
+        ids = np.array([str(i) for i in ids], dtype=str)
+        values = np.asarray(values, dtype=float).reshape(len(ids), len(METRICS))
+        order = np.argsort(ids, kind='stable')
+        self.ids = ids[order]
+        self.values = values[order]
+        duplicated = self.ids[1:][self.ids[1:] == self.ids[:-1]]
+        if len(duplicated):
+            raise ValueError(f"Duplicate microsystem ID in the value metrics: {duplicated[0]}")
+
+    @classmethod
+    def from_json(cls, metrics_data):
+        """
+        Build the table from value metrics JSON.
+
+        Two layouts are accepted: metrics keyed by microsystem ID
+        (``{"MS1": {"profit": ..., ...}}``) and metrics per stakeholder
+        (``{"stakeholders": [{"microsystems": [{"microsystem_id": ...,
+        "value_metrics": {...}}]}]}``, see ``value-metrics-json``). Missing
+        metrics are 0; in the stakeholder layout, the last entry of a
+        microsystem wins.
+
+        Args:
+            metrics_data (dict): Value metrics in either layout.
+
+        Returns:
+            ValueMetrics: The table.
+        """
+        if isinstance(metrics_data.get("stakeholders"), list):
+            metrics_data = {m["microsystem_id"]: m.get("value_metrics", {})
+                            for stakeholder in metrics_data["stakeholders"]
+                            for m in stakeholder.get("microsystems", [])}
+        values = np.array([[metrics.get(metric, 0) for metric in METRICS] for metrics in metrics_data.values()],
+                          dtype=float)
+        return cls(list(metrics_data), values)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def column(self, metric):
+        """
+        Return the values of one metric, in ID order.
+
+        Args:
+            metric (str): One of METRICS.
+
+        Returns:
+            np.ndarray: Values of shape (n,).
+        """
+        return self.values[:, METRICS.index(metric)]
+
+    def join(self, ids):
+        """
+        Look up the metrics of many microsystems at once.
+
+        Args:
+            ids (list): Microsystem IDs, in any order and with repetitions.
+
+        Returns:
+            np.ndarray: Metrics of shape (len(ids), 3) in the order of ``ids``;
+                rows of microsystems without metrics are 0.
+        """
+        ids = np.array([str(i) for i in ids], dtype=str)
+        joined = np.zeros((len(ids), len(METRICS)))
+        if len(self.ids) == 0 or len(ids) == 0:
+            return joined
+        positions = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+        found = self.ids[positions] == ids
+        joined[found] = self.values[positions[found]]
+        return joined
+
+def pareto_front(objectives):
+    """
+    Find the rows no other row dominates, with every objective minimized.
+
+    A row dominates another if it is no worse in every objective and better in
+    at least one; identical rows do not dominate each other. Rows dominated by
+    a few known front rows (minima of weighted sums) are dropped with
+    vectorized checks first. The rest are sorted once, then swept while
+    keeping the staircase of the best (second, third) objective pairs seen so
+    far, so a front of n rows takes O(n log n) comparisons instead of pairwise
+    checks.
+
+    Args:
+        objectives (np.ndarray): Objectives of shape (n, k) with k <= 3.
+
+    Returns:
+        np.ndarray: Boolean mask of the rows on the Pareto front.
+
+    Raises:
+        ValueError: If there are more than three objectives or NaN values.
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    if objectives.ndim != 2 or objectives.shape[1] > 3:
+        raise ValueError("pareto_front expects an (n, k) array with at most three objectives")
+    if np.isnan(objectives).any():
+        raise ValueError("pareto_front does not accept NaN objectives")
+    on_front = np.zeros(len(objectives), dtype=bool)
+    if len(objectives) == 0:
+        return on_front
+
+    padded = np.zeros((len(objectives), 3))
+    padded[:, :objectives.shape[1]] = objectives
+    low = padded.min(axis=0)
+    span = padded.max(axis=0) - low
+    span[span == 0] = 1
+    normalized = (padded - low) / span
+
+    # The minimum of a positive weighted sum is never dominated, so drop the rows it dominates
+    candidates = np.arange(len(padded))
+    for weights in PARETO_PIVOT_WEIGHTS:
+        pivot = padded[candidates[np.argmin(normalized[candidates] @ np.array(weights, dtype=float))]]
+        rest = padded[candidates]
+        candidates = candidates[~((rest >= pivot).all(axis=1) & (rest > pivot).any(axis=1))]
+
+    # Lexicographic order: earlier rows are never worse in the first objective
+    candidates = candidates[np.lexsort(padded[candidates].T[::-1])]
+    second, third = [], []  # Staircase: second ascending, third descending
+    previous, previous_on_front = None, False
+    for position, row in zip(candidates.tolist(), padded[candidates].tolist()):
+        if row == previous:
+            on_front[position] = previous_on_front  # Identical rows share the result
+            continue
+        previous, (_, b, c) = row, row
+        end = bisect.bisect_right(second, b)
+        previous_on_front = not (end and third[end - 1] <= c)
+        if not previous_on_front:
+            continue  # Dominated by an earlier row
+        on_front[position] = True
+        # Drop the staircase steps the new row dominates in (second, third)
+        start = bisect.bisect_left(second, b)
+        while end < len(second) and third[end] >= c:
+            end += 1
+        second[start:end] = [b]
+        third[start:end] = [c]
+    return on_front
+
+def value_objectives(values):
+    """
+    Turn value metrics into objectives to minimize (see OBJECTIVE_SIGNS).
+
+    Args:
+        values (np.ndarray): Metrics of shape (n, 3), columns in METRICS order.
+
+    Returns:
+        np.ndarray: Objectives of shape (n, 3).
+    """
+    return np.asarray(values, dtype=float) * np.array([OBJECTIVE_SIGNS[metric] for metric in METRICS])
+
+def weighted_scores(values, weights=None):
+    """
+    Score microsystems by the weighted sum of their normalized value metrics.
+
+    Each metric is scaled to [0, 1] over the given microsystems; profit adds to
+    the score, cost and environmental impact subtract from it. With positive
+    weights, the best scoring microsystem is always on the Pareto front.
+
+    Args:
+        values (np.ndarray): Metrics of shape (n, 3), columns in METRICS order.
+        weights (dict, optional): Weight per metric, overriding DEFAULT_WEIGHTS.
+
+    Returns:
+        np.ndarray: Score of each microsystem, higher is better.
+
+    Raises:
+        ValueError: If ``weights`` names an unknown metric.
+    """
+    unknown = set(weights or {}) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown value metrics in weights: {sorted(unknown)}")
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+
+    values = np.asarray(values, dtype=float).reshape(-1, len(METRICS))
+    if len(values) == 0:
+        return np.zeros(0)
+    low = values.min(axis=0)
+    span = values.max(axis=0) - low
+    span[span == 0] = 1
+    signed_weights = np.array([-OBJECTIVE_SIGNS[metric] * weights[metric] for metric in METRICS])
+    return ((values - low) / span) @ signed_weights
+
+@traced
+def rank_value_metrics(metrics, weights=None, k=None):
+    """
+    Rank microsystems by weighted score and mark the Pareto-optimal ones.
+
+    Args:
+        metrics (ValueMetrics): Value metrics of the candidate microsystems.
+        weights (dict, optional): Weight per metric (see ``weighted_scores``).
+        k (int, optional): Return only the ``k`` best microsystems.
+
+    Returns:
+        list: One dict per microsystem with its ``id``, ``score``,
+            ``pareto_optimal`` flag and metrics, best score first.
+    """
+    scores = weighted_scores(metrics.values, weights)
+    on_front = pareto_front(value_objectives(metrics.values))
+    order = top_microsystems(scores, len(scores) if k is None else k)
+    return [dict(id=str(metrics.ids[position]), score=float(scores[position]),
+                 pareto_optimal=bool(on_front[position]),
+                 **dict(zip(METRICS, metrics.values[position].tolist())))
+            for position in order]
+
 def load_data(system_path, metrics_path):
     """
     Load system and value metrics data from JSON files.
 
     Args:
-        system_path (str): Path to the system data JSON file.
+        system_path (str): Path to the system data JSON file or columnar ``.rami`` model.
         metrics_path (str): Path to the value metrics JSON file.
 
     Returns:
         tuple: System data and value metrics as dictionaries.
     """
-    with open(system_path, 'r') as system_file:
-        system_data = json.load(system_file)
+    system_data = load_model_json(system_path)
     with open(metrics_path, 'r') as metrics_file:
         metrics_data = json.load(metrics_file)
     return system_data, metrics_data
 
+@traced
 def map_to_2d(system_data, metrics_data):
     """
     Map microsystems to a 2D plane and apply value metrics.
 
+    The metrics are joined onto all microsystems at once (see ``ValueMetrics``).
+
     Args:
         system_data (dict): Data containing microsystem attributes.
-        metrics_data (dict): Value metrics for cost, profit, and environmental impact.
+        metrics_data (dict or ValueMetrics): Value metrics for cost, profit, and
+            environmental impact, in either layout of ``ValueMetrics.from_json``.
 
     Returns:
         list: Mapped microsystems with 2D coordinates and metrics.
     """
+    if not isinstance(metrics_data, ValueMetrics):
+        metrics_data = ValueMetrics.from_json(metrics_data)
+    microsystems = system_data['microsystems']
+    values = metrics_data.join([microsystem['id'] for microsystem in microsystems]).tolist()
+
     mapped_data = []
-    for microsystem in system_data['microsystems']:
-        microsystem_id = microsystem['id']
+    for microsystem, (profit, cost, environmental_impact) in zip(microsystems, values):
         coordinates = microsystem['coordinates']
-        metrics = metrics_data.get(microsystem_id, {})
         mapped_data.append({
-            "id": microsystem_id,
+            "id": microsystem['id'],
             "coordinates": (coordinates['X'], coordinates['Y']),
-            "profit": metrics.get("profit", 0),
-            "cost": metrics.get("cost", 0),
-            "environmental_impact": metrics.get("environmental_impact", 0)
+            "profit": profit,
+            "cost": cost,
+            "environmental_impact": environmental_impact
         })
     return mapped_data
 
-def visualize_value_projection(mapped_data, visual_config):
+def projection_arrays(mapped_data):
+    """
+    Convert mapped microsystems into arrays for vectorized binning.
+
+    Args:
+        mapped_data (list): Output of ``map_to_2d``.
+
+    Returns:
+        list: Microsystem IDs.
+        np.ndarray: 2D coordinates of shape (n, 2); NaN where a coordinate is missing.
+        dict: Array of each value metric (see METRICS).
+    """
+    ids = [data['id'] for data in mapped_data]
+    coordinates = np.array([data['coordinates'] for data in mapped_data], dtype=float).reshape(-1, 2)
+    metrics = {metric: np.array([data[metric] for data in mapped_data], dtype=float) for metric in METRICS}
+    return ids, coordinates, metrics
+
+def bin_value_projection(coordinates, metrics, x_limits, y_limits, bins=RASTER_BINS):
+    """
+    Sum the value metrics of the microsystems in every cell of a 2D grid.
+
+    Args:
+        coordinates (np.ndarray): 2D coordinates of shape (n, 2).
+        metrics (dict): Array of each value metric.
+        x_limits (tuple): Hierarchy axis range covered by the grid.
+        y_limits (tuple): Lifecycle axis range covered by the grid.
+        bins (tuple): Number of cells along the x and y axes.
+
+    Returns:
+        dict: ``count`` of microsystems and the summed value of each metric per
+            cell, as arrays of shape (y bins, x bins), and the ``extent`` of the
+            grid. Microsystems outside the limits are not counted.
+    """
+    n_x, n_y = bins
+    (x_min, x_max), (y_min, y_max) = x_limits, y_limits
+    x, y = coordinates[:, 0], coordinates[:, 1]
+    inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+
+    # Points on the upper limits belong to the last cell
+    column = np.minimum(((x[inside] - x_min) / (x_max - x_min) * n_x).astype(np.intp), n_x - 1)
+    row = np.minimum(((y[inside] - y_min) / (y_max - y_min) * n_y).astype(np.intp), n_y - 1)
+    cell = row * n_x + column
+
+    grid = {'count': np.bincount(cell, minlength=n_x * n_y).reshape(n_y, n_x),
+            'extent': (x_min, x_max, y_min, y_max)}
+    for metric, values in metrics.items():
+        grid[metric] = np.bincount(cell, weights=values[inside], minlength=n_x * n_y).reshape(n_y, n_x)
+    return grid
+
+def top_microsystems(values, k):
+    """
+    Find the microsystems with the largest values.
+
+    Args:
+        values (np.ndarray): Value of each microsystem; NaN values are ignored.
+        k (int): Number of microsystems.
+
+    Returns:
+        np.ndarray: Positions of up to ``k`` microsystems, largest value first.
+    """
+    candidates = np.flatnonzero(~np.isnan(values))
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-values[candidates], k - 1)[:k]]
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+@traced
+def visualize_value_projection(mapped_data, visual_config, figure_path=None, raster=None, pareto=None):
     """
     Visualize 2D projections of value addition for microsystems.
 
     Args:
         mapped_data (list): List of mapped microsystems with metrics.
         visual_config (dict): Configuration for visualization.
+        figure_path (str, optional): Write the figure to this file (PNG, SVG, ...)
+            without a display instead of showing it.
+        raster (bool, optional): Draw the summed metrics of a 2D grid as an image
+            and annotate only the ``raster_top_k`` most profitable microsystems
+            (see ``draw_value_raster``). By default this happens above
+            RASTER_MIN_MICROSYSTEMS microsystems.
+        pareto (bool, optional): Ring the microsystems on the Pareto front (see
+            ``draw_pareto_front``). Defaults to the ``pareto_front`` option of
+            ``visual_config``.
+
+    Returns:
+        matplotlib.figure.Figure: The figure.
+    """
+    if raster is None:
+        raster = len(mapped_data) > RASTER_MIN_MICROSYSTEMS
+    count('microsystems_projected', len(mapped_data))
+
+    fig = create_figure(figsize=(10, 6), headless=figure_path is not None)
+    ax = fig.add_subplot(111)
+    if raster:
+        draw_value_raster(fig, ax, mapped_data, visual_config)
+    else:
+        draw_value_scatter(fig, ax, mapped_data)
+    if pareto if pareto is not None else visual_config.get('pareto_front', False):
+        draw_pareto_front(ax, mapped_data)
+    ax.set_title("RAMI 4.0 Value Addition Projection")
+    ax.set_xlabel("Hierarchy Levels")
+    ax.set_ylabel("Lifecycle Stages")
+    ax.grid(True)
+
+    return finish_figure(fig, figure_path)
+
+def draw_value_scatter(fig, ax, mapped_data):
+    """
+    Draw one annotated marker per microsystem (size: profit, color: cost).
+
+    Args:
+        fig (matplotlib.figure.Figure): Figure for the color bar.
+        ax (matplotlib.axes.Axes): Axes to draw on.
+        mapped_data (list): List of mapped microsystems with metrics.
     """
     x, y, profit, cost = [], [], [], []
 
@@ -60,17 +427,12 @@ def visualize_value_projection(mapped_data, visual_config):
         profit.append(data['profit'])
         cost.append(data['cost'])
 
-    plt.figure(figsize=(10, 6))
-    plt.scatter(x, y, s=profit, c=cost, cmap='viridis', alpha=0.7, edgecolors="w")
-    plt.colorbar(label="Engineering Cost")
-    plt.title("RAMI 4.0 Value Addition Projection")
-    plt.xlabel("Hierarchy Levels")
-    plt.ylabel("Lifecycle Stages")
-    plt.grid(True)
+    points = ax.scatter(x, y, s=profit, c=cost, cmap='viridis', alpha=0.7, edgecolors="w")
+    fig.colorbar(points, ax=ax, label="Engineering Cost")
 
     # Add annotations for each microsystem
     for i, data in enumerate(mapped_data):
-        plt.annotate(
+        ax.annotate(
             f"ID: {data['id']}",
             (x[i], y[i]),
             textcoords="offset points",
@@ -78,27 +440,95 @@ def visualize_value_projection(mapped_data, visual_config):
             ha="center"
         )
 
-    plt.show()
+def draw_value_raster(fig, ax, mapped_data, visual_config):
+    """
+    Draw the summed value metric of every grid cell as an image.
+
+    The microsystems are binned once with NumPy; drawing then depends on the
+    grid size only, not on the number of microsystems. Cells without
+    microsystems stay blank.
+
+    ``visual_config`` options: ``x_limits`` and ``y_limits`` (the data range
+    by default), ``raster_bins`` ([x cells, y cells]), ``raster_metric``
+    (``cost`` by default) and ``raster_top_k``.
+
+    Args:
+        fig (matplotlib.figure.Figure): Figure for the color bar.
+        ax (matplotlib.axes.Axes): Axes to draw on.
+        mapped_data (list): List of mapped microsystems with metrics.
+        visual_config (dict): Configuration for visualization.
+
+    Returns:
+        dict: The binned grid (see ``bin_value_projection``).
+    """
+    ids, coordinates, metrics = projection_arrays(mapped_data)
+    finite = np.isfinite(coordinates).all(axis=1)
+    limits = []
+    for axis, key in enumerate(('x_limits', 'y_limits')):
+        if key in visual_config:
+            limits.append(tuple(visual_config[key]))
+        elif finite.any():
+            values = coordinates[finite, axis]
+            limits.append((values.min(), max(values.max(), values.min() + 1)))
+        else:
+            limits.append((0, 1))
+
+    metric = visual_config.get('raster_metric', 'cost')
+    grid = bin_value_projection(coordinates, metrics, limits[0], limits[1],
+                                bins=tuple(visual_config.get('raster_bins', RASTER_BINS)))
+    image = ax.imshow(np.ma.masked_where(grid['count'] == 0, grid[metric]), origin='lower',
+                      extent=grid['extent'], aspect='auto', cmap='viridis', interpolation='nearest')
+    fig.colorbar(image, ax=ax, label=f"{METRIC_LABELS.get(metric, metric)} (sum per cell)")
+
+    # Annotate the most profitable microsystems only
+    profit = np.where(finite, metrics['profit'], np.nan)
+    for position in top_microsystems(profit, visual_config.get('raster_top_k', RASTER_TOP_K)):
+        ax.annotate(f"ID: {ids[position]}", tuple(coordinates[position]), textcoords="offset points",
+                    xytext=(5, 5), ha="center", fontsize=8)
+    return grid
+
+def draw_pareto_front(ax, mapped_data):
+    """
+    Ring the microsystems no other microsystem beats in profit, cost and
+    environmental impact at once.
+
+    Args:
+        ax (matplotlib.axes.Axes): Axes to draw on.
+        mapped_data (list): List of mapped microsystems with metrics.
+
+    Returns:
+        np.ndarray: Boolean mask of the microsystems on the Pareto front.
+    """
+    _, coordinates, metrics = projection_arrays(mapped_data)
+    on_front = pareto_front(value_objectives(np.column_stack([metrics[metric] for metric in METRICS])))
+    shown = on_front & np.isfinite(coordinates).all(axis=1)
+    ax.scatter(coordinates[shown, 0], coordinates[shown, 1], s=PARETO_MARKER_SIZE, facecolors='none',
+               edgecolors='red', linewidths=1.5, label=f"Pareto front ({int(on_front.sum())})")
+    ax.legend(loc='upper right')
+    return on_front
 
-def main(system_data_path, metrics_data_path, visual_config_path):
+@traced
+def main(system_data_path, metrics_data_path, visual_config_path, figure_path=None):
     """
     Main function to execute the value addition projection.
 
     Args:
-        system_data_path (str): Path to the system data JSON file.
+        system_data_path (str): Path to the system data JSON file or columnar ``.rami`` model.
         metrics_data_path (str): Path to the value metrics JSON file.
         visual_config_path (str): Path to the visualization configuration JSON file.
+        figure_path (str, optional): Write the figure to this file instead of showing it.
     """
     with open(visual_config_path, 'r') as config_file:
         visual_config = json.load(config_file)
 
     system_data, metrics_data = load_data(system_data_path, metrics_data_path)
     mapped_data = map_to_2d(system_data, metrics_data)
-    visualize_value_projection(mapped_data, visual_config)
+    visualize_value_projection(mapped_data, visual_config, figure_path=figure_path)
 
 if __name__ == "__main__":
     # Example file paths
     system_data_path = "system_mapped_data.json"  # Replace with the actual path
     metrics_data_path = "value_metrics.json"      # Replace with the actual path
     visual_config_path = "visual_config.json"     # Replace with the actual path
-    main(system_data_path, metrics_data_path, visual_config_path)
+    figure_path = None  # Set to e.g. "value_projection.png" to render without a display
+    main(system_data_path, metrics_data_path, visual_config_path, figure_path)
@@ -1,21 +1,33 @@
+import os
+import sys
 import json
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
+# Make the shared ramiviz package importable when this script is run directly
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from ramiviz.columnar import load_model_json
+from ramiviz.model_index import ModelIndex
+from ramiviz.render import create_figure, finish_figure
+from ramiviz.trace import count, traced
+
 def load_data(usecase_data_path, value_metrics_path, system_components_path):
     """
     Load data from JSON files.
 
     Args:
-        usecase_data_path (str): Path to the use case mapped data JSON file.
+        usecase_data_path (str): Path to the use case mapped data JSON file or
+            columnar ``.rami`` model.
         value_metrics_path (str): Path to the value metrics JSON file.
         system_components_path (str): Path to the system components data JSON file.
 
     Returns:
         tuple: Data from the respective JSON files.
     """
-    with open(usecase_data_path, 'r') as usecase_file:
-        usecase_data = json.load(usecase_file)
+    usecase_data = load_model_json(usecase_data_path)
     with open(value_metrics_path, 'r') as metrics_file:
         value_metrics = json.load(metrics_file)
     with open(system_components_path, 'r') as components_file:
@@ -23,7 +35,8 @@ def load_data(usecase_data_path, value_metrics_path, system_components_path):
     
     return usecase_data, value_metrics, system_components
 
-def create_integration_map(usecase_data, value_metrics, system_components, phases, lifecycle_stages):
+@traced
+def create_integration_map(usecase_data, value_metrics, system_components, phases, lifecycle_stages, index=None):
     """
     Create an integration map aligning engineering process phases with product lifecycle stages.
 
@@ -33,79 +46,91 @@ def create_integration_map(usecase_data, value_metrics, system_components, phase
         system_components (dict): Data related to system components and stakeholders.
         phases (list): List of engineering process phases.
         lifecycle_stages (list): List of product lifecycle stages.
+        index (ModelIndex, optional): Prebuilt index of the system components.
 
     Returns:
         pd.DataFrame: Integration map matrix.
     """
-    stakeholders = {comp['stakeholder'] for comp in system_components['components']}
-    integration_map = pd.DataFrame(0, index=stakeholders, columns=phases + lifecycle_stages)
-
-    for interaction in usecase_data['interactions']:
-        source = interaction['source_id']
-        target = interaction['target_id']
-        source_stakeholder = next(comp['stakeholder'] for comp in system_components['components'] if comp['id'] == source)
-        target_stakeholder = next(comp['stakeholder'] for comp in system_components['components'] if comp['id'] == target)
-        
-        for phase in phases:
-            integration_map.loc[source_stakeholder, phase] += 1
-            integration_map.loc[target_stakeholder, phase] += 1
-        
-        for stage in lifecycle_stages:
-            integration_map.loc[source_stakeholder, stage] += 1
-            integration_map.loc[target_stakeholder, stage] += 1
-    
-    return integration_map
+    if index is None:
+        index = ModelIndex.from_components(system_components)
+
+    stakeholders = sorted(set(index.stakeholders.values()), key=str)
+    row_of = {stakeholder: k for k, stakeholder in enumerate(stakeholders)}
+    rows = np.array([row_of[index.stakeholders[i]] for i in index.ids], dtype=np.intp)
+
+    # Every interaction adds one to all columns of its source and its target
+    # stakeholder, so the map is the stakeholder incidence count per column.
+    sources, targets = index.edge_positions(usecase_data['interactions'])
+    count('interactions_mapped', len(sources))
+    incidence = (np.bincount(rows[sources], minlength=len(stakeholders))
+                 + np.bincount(rows[targets], minlength=len(stakeholders)))
 
+    columns = phases + lifecycle_stages
+    counts = np.broadcast_to(incidence[:, None], (len(stakeholders), len(columns)))
+    return pd.DataFrame(counts.astype(np.int64), index=stakeholders, columns=columns)
+
+@traced
 def annotate_value_metrics(integration_map, value_metrics):
     """
     Annotate the integration map with value metrics.
 
     Args:
         integration_map (pd.DataFrame): Integration map matrix.
-        value_metrics (dict): Value metrics to annotate.
+        value_metrics (dict): Value metrics to annotate, per stakeholder and column.
 
     Returns:
         pd.DataFrame: Annotated integration map.
     """
-    for stakeholder in integration_map.index:
-        for phase in integration_map.columns:
-            if phase in value_metrics.get(stakeholder, {}):
-                integration_map.loc[stakeholder, phase] += value_metrics[stakeholder][phase]
-    return integration_map
-
-def visualize_integration_map(integration_map):
+    known = {s: value_metrics[s] for s in integration_map.index if s in value_metrics}
+    if not known:
+        return integration_map.copy()
+    metrics = pd.DataFrame.from_dict(known, orient='index')
+    metrics = metrics.reindex(index=integration_map.index, columns=integration_map.columns).fillna(0)
+    return integration_map + metrics
+
+@traced
+def visualize_integration_map(integration_map, figure_path=None):
     """
     Visualize the integration map as a heatmap.
 
     Args:
         integration_map (pd.DataFrame): Annotated integration map.
+        figure_path (str, optional): Write the figure to this file (PNG, SVG, ...)
+            without a display instead of showing it.
+
+    Returns:
+        matplotlib.figure.Figure: The figure.
     """
-    plt.figure(figsize=(12, 8))
-    plt.imshow(integration_map, cmap="YlGnBu", aspect="auto")
-    plt.colorbar(label="Involvement Level / Value Metric")
-    plt.xticks(range(len(integration_map.columns)), integration_map.columns, rotation=90)
-    plt.yticks(range(len(integration_map.index)), integration_map.index)
-    plt.title("Engineering Process Phases and Product Lifecycle Integration Map")
-    plt.xlabel("Phases and Lifecycle Stages")
-    plt.ylabel("Stakeholders")
-    plt.tight_layout()
-    plt.show()
-
-def main(usecase_data_path, value_metrics_path, system_components_path, phases, lifecycle_stages):
+    fig = create_figure(figsize=(12, 8), headless=figure_path is not None)
+    ax = fig.add_subplot(111)
+    image = ax.imshow(integration_map, cmap="YlGnBu", aspect="auto")
+    fig.colorbar(image, ax=ax, label="Involvement Level / Value Metric")
+    ax.set_xticks(range(len(integration_map.columns)), integration_map.columns, rotation=90)
+    ax.set_yticks(range(len(integration_map.index)), integration_map.index)
+    ax.set_title("Engineering Process Phases and Product Lifecycle Integration Map")
+    ax.set_xlabel("Phases and Lifecycle Stages")
+    ax.set_ylabel("Stakeholders")
+    fig.tight_layout()
+    return finish_figure(fig, figure_path)
+
+@traced
+def main(usecase_data_path, value_metrics_path, system_components_path, phases, lifecycle_stages, figure_path=None):
     """
     Main function to execute Algorithm 7.
 
     Args:
-        usecase_data_path (str): Path to the use case mapped data JSON file.
+        usecase_data_path (str): Path to the use case mapped data JSON file or
+            columnar ``.rami`` model.
         value_metrics_path (str): Path to the value metrics JSON file.
         system_components_path (str): Path to the system components JSON file.
         phases (list): List of engineering process phases.
         lifecycle_stages (list): List of product lifecycle stages.
+        figure_path (str, optional): Write the heatmap to this file instead of showing it.
     """
     usecase_data, value_metrics, system_components = load_data(usecase_data_path, value_metrics_path, system_components_path)
     integration_map = create_integration_map(usecase_data, value_metrics, system_components, phases, lifecycle_stages)
     annotated_map = annotate_value_metrics(integration_map, value_metrics)
-    visualize_integration_map(annotated_map)
+    visualize_integration_map(annotated_map, figure_path=figure_path)
 
 if __name__ == "__main__":
     # Example paths and configurations
@@ -116,4 +141,6 @@ if __name__ == "__main__":
     phases = ["Design", "Development", "Production", "Maintenance"]
     lifecycle_stages = ["Concept", "Operation", "Disposal"]
 
-    main(usecase_data_path, value_metrics_path, system_components_path, phases, lifecycle_stages)
+    figure_path = None  # Set to e.g. "integration_map.png" to render without a display
+
+    main(usecase_data_path, value_metrics_path, system_components_path, phases, lifecycle_stages, figure_path)
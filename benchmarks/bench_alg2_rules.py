@@ -0,0 +1,98 @@
+"""
+Benchmark for Algorithm 2: linear rule scan versus the compiled rule index.
+
+Generates a synthetic model and mapping configuration, maps every microsystem on
+the three RAMI 4.0 axes with both paths and reports the timings.
+
+Usage:
+    python benchmarks/bench_alg2_rules.py --microsystems 20000 --rules 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alg2.alg2 import AXIS_RULES, compile_mapping_configuration, map_to_axis
+
+
+def generate_model(n_microsystems, n_rules, seed=0):
+    """
+    Generate synthetic microsystems and a mapping configuration.
+
+    Args:
+        n_microsystems (int): Number of microsystems to generate.
+        n_rules (int): Number of rules per axis.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        tuple: JSON data with microsystems and the mapping configuration.
+    """
+    rng = random.Random(seed)
+    types = [f"Type-{i}" for i in range(max(1, n_rules // 4))]
+    roles = [f"Role-{i}" for i in range(8)]
+
+    microsystems = [
+        {
+            "id": f"MS{i}",
+            "type": rng.choice(types),
+            "role": rng.choice(roles),
+            "description": f"Microsystem {i}"
+        }
+        for i in range(n_microsystems)
+    ]
+
+    mapping_config = {}
+    for _, key in AXIS_RULES:
+        rules = []
+        for i in range(n_rules - 1):
+            conditions = {"type": rng.choice(types)}
+            if i % 2:
+                conditions["role"] = rng.choice(roles)
+            rules.append({"conditions": conditions, "mapping": rng.randrange(7)})
+        # Catch-all rule so that no microsystem falls through to the user prompt
+        rules.append({"conditions": {}, "mapping": 0})
+        mapping_config[key] = rules
+
+    return {"microsystems": microsystems}, mapping_config
+
+
+def run(n_microsystems, n_rules):
+    """
+    Time both mapping paths and check that they agree.
+
+    Args:
+        n_microsystems (int): Number of microsystems to map.
+        n_rules (int): Number of rules per axis.
+    """
+    json_data, mapping_config = generate_model(n_microsystems, n_rules)
+
+    start = time.perf_counter()
+    linear = [
+        [map_to_axis(m, mapping_config[key], axis) for axis, key in AXIS_RULES]
+        for m in json_data["microsystems"]
+    ]
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled_rules = compile_mapping_configuration(mapping_config)
+    compiled = [
+        [map_to_axis(m, compiled_rules[axis], axis) for axis, _ in AXIS_RULES]
+        for m in json_data["microsystems"]
+    ]
+    compiled_time = time.perf_counter() - start
+
+    assert linear == compiled, "Compiled rule index disagrees with the linear scan"
+    print(f"microsystems={n_microsystems} rules/axis={n_rules}")
+    print(f"  linear scan:    {linear_time:.3f} s")
+    print(f"  compiled index: {compiled_time:.3f} s  ({linear_time / compiled_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--microsystems", type=int, default=20000)
+    parser.add_argument("--rules", type=int, default=300)
+    args = parser.parse_args()
+    run(args.microsystems, args.rules)
@@ -0,0 +1,127 @@
+"""
+Benchmark for Algorithm 3: workflow filtering over synthetic system models of
+increasing size.
+
+For each model size the indexed filter (``SystemIndex`` build plus
+``filter_dynamic_workflow``) is timed; up to ``--baseline-max`` microsystems the
+list-scanning filter it replaced is timed as well and its result compared.
+
+Usage:
+    python benchmarks/bench_alg3_filter.py --sizes 1000 5000 10000 50000 --steps 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alg3.alg3 import SystemIndex, filter_dynamic_workflow
+
+
+def generate_model(n_microsystems, n_steps, n_services=2000, seed=0):
+    """
+    Generate a synthetic system model and workflow.
+
+    Args:
+        n_microsystems (int): Number of microsystems.
+        n_steps (int): Number of workflow steps.
+        n_services (int): Number of distinct services.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        tuple: System mapped data and workflow data.
+    """
+    rng = random.Random(seed)
+    services = [f"service_{i}" for i in range(n_services)]
+    microsystems = [
+        {
+            "id": f"MS{i}",
+            "provides": rng.sample(services, 2),
+            "consumes": rng.sample(services, 2)
+        }
+        for i in range(n_microsystems)
+    ]
+    steps = []
+    for step in range(n_steps):
+        interactions = []
+        for _ in range(5):
+            source, target = rng.sample(microsystems, 2)
+            interactions.append({"source_id": source["id"], "target_id": target["id"]})
+        steps.append({
+            "step_id": f"Step{step}",
+            "services": rng.sample(services, 3),
+            "interactions": interactions
+        })
+    return {"microsystems": microsystems}, {"steps": steps}
+
+
+def filter_by_scanning(system_mapped_data, workflow_data):
+    """
+    Reference implementation scanning every microsystem for every step.
+
+    Args:
+        system_mapped_data (dict): System mapped data.
+        workflow_data (dict): Workflow data.
+
+    Returns:
+        dict: Filtered data.
+    """
+    usecase_mapped_data = {"microsystems": [], "interactions": []}
+    for step in workflow_data['steps']:
+        services = step['services']
+        filtered_microsystems = [
+            m for m in system_mapped_data['microsystems']
+            if any(service in m['provides'] for service in services) or
+               any(service in m['consumes'] for service in services)
+        ]
+        usecase_mapped_data['microsystems'].extend(filtered_microsystems)
+        for interaction in step['interactions']:
+            if interaction['source_id'] in [m['id'] for m in filtered_microsystems] and \
+               interaction['target_id'] in [m['id'] for m in filtered_microsystems]:
+                usecase_mapped_data['interactions'].append(interaction)
+    usecase_mapped_data['microsystems'] = list({m['id']: m for m in usecase_mapped_data['microsystems']}.values())
+    usecase_mapped_data['interactions'] = list({f"{i['source_id']}-{i['target_id']}": i
+                                                for i in usecase_mapped_data['interactions']}.values())
+    return usecase_mapped_data
+
+
+def run(sizes, n_steps, baseline_max):
+    """
+    Time the filters for every model size and print the scaling curve.
+
+    Args:
+        sizes (list): Numbers of microsystems.
+        n_steps (int): Number of workflow steps.
+        baseline_max (int): Largest model size the scanning filter is run on.
+    """
+    print(f"{'microsystems':>12} {'index (ms)':>11} {'filter (ms)':>12} {'scan (ms)':>10}")
+    for size in sizes:
+        system_mapped_data, workflow_data = generate_model(size, n_steps)
+
+        start = time.perf_counter()
+        index = SystemIndex(system_mapped_data)
+        index_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = filter_dynamic_workflow(system_mapped_data, workflow_data, index=index)
+        filter_time = time.perf_counter() - start
+
+        scan = "-"
+        if size <= baseline_max:
+            start = time.perf_counter()
+            expected = filter_by_scanning(system_mapped_data, workflow_data)
+            scan = f"{(time.perf_counter() - start) * 1000:.1f}"
+            assert result == expected, "Indexed filter disagrees with the scanning filter"
+
+        print(f"{size:>12} {index_time * 1000:>11.1f} {filter_time * 1000:>12.1f} {scan:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--baseline-max", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.sizes, args.steps, args.baseline_max)
@@ -0,0 +1,92 @@
+"""
+Benchmark for sweeping the number of clusters in alg4.
+
+Compares refitting scikit-learn's ``AgglomerativeClustering`` for every number
+of clusters against building one ``ClusterTree`` and cutting it, on a dense
+interaction matrix with planted clusters, and checks that both give the same
+partitions.
+
+Usage:
+    python benchmarks/bench_alg4_clusters.py --microsystems 2000 --planted 7 --max-clusters 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.cluster import AgglomerativeClustering
+from sklearn.metrics import adjusted_rand_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alg4.alg4 import ClusterTree
+
+
+def planted_matrix(n_microsystems, planted, seed=0):
+    """
+    Build a symmetric interaction matrix whose microsystems mostly interact within their group.
+
+    Args:
+        n_microsystems (int): Number of microsystems.
+        planted (int): Number of groups.
+        seed (int): Random seed.
+
+    Returns:
+        np.ndarray: Interaction matrix with strengths 0-3.
+        np.ndarray: Group of each microsystem.
+    """
+    rng = np.random.default_rng(seed)
+    groups = rng.integers(0, planted, n_microsystems)
+    probability = np.where(groups[:, None] == groups[None, :], 0.05, 0.002)
+    strengths = (rng.random((n_microsystems, n_microsystems)) < probability) * rng.integers(1, 3, probability.shape)
+    return (strengths + strengths.T).astype(float), groups
+
+
+def run(n_microsystems, planted, max_clusters):
+    """
+    Time the refits, the tree sweep and the automatic selection.
+
+    Args:
+        n_microsystems (int): Number of microsystems.
+        planted (int): Number of planted groups.
+        max_clusters (int): Largest number of clusters in the sweep (from 2).
+    """
+    interaction_matrix, groups = planted_matrix(n_microsystems, planted)
+    cluster_counts = range(2, max_clusters + 1)
+    distances = 1 - interaction_matrix / interaction_matrix.max()
+
+    start = time.perf_counter()
+    refits = {
+        k: AgglomerativeClustering(n_clusters=k, metric='precomputed', linkage='average').fit_predict(distances)
+        for k in cluster_counts
+    }
+    refit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tree = ClusterTree(interaction_matrix)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    cuts = tree.sweep(cluster_counts)
+    sweep_time = time.perf_counter() - start
+    assert all(adjusted_rand_score(refits[k], cuts[k]) == 1.0 for k in cluster_counts)
+
+    start = time.perf_counter()
+    selected, labels, _ = tree.select(2, max_clusters)
+    select_time = time.perf_counter() - start
+
+    print(f"microsystems={n_microsystems}, k=2..{max_clusters}")
+    print(f"  refits:               {refit_time:.3f} s")
+    print(f"  tree build:           {build_time:.3f} s")
+    print(f"  tree cuts:            {sweep_time:.4f} s")
+    print(f"  select by modularity: {select_time:.4f} s -> {selected} clusters "
+          f"(ARI {adjusted_rand_score(groups, labels):.2f} against {planted} planted)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--microsystems", type=int, default=2000)
+    parser.add_argument("--planted", type=int, default=7)
+    parser.add_argument("--max-clusters", type=int, default=50)
+    args = parser.parse_args()
+    run(args.microsystems, args.planted, args.max_clusters)
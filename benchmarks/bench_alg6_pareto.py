@@ -0,0 +1,96 @@
+"""
+Benchmark for the alg6 metrics join and Pareto-front engine.
+
+Compares joining value metrics onto microsystems with the columnar
+``ValueMetrics`` table against one dict lookup per microsystem, and the sorted
+sweep of ``pareto_front`` against pairwise dominance checks on a sample.
+
+Usage:
+    python benchmarks/bench_alg6_pareto.py --microsystems 1000000 --sample 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alg6.alg6 import METRICS, ValueMetrics, pareto_front, rank_value_metrics, value_objectives
+
+
+def pairwise_front(objectives):
+    """
+    Find the Pareto front by checking every pair of rows.
+
+    Args:
+        objectives (np.ndarray): Objectives to minimize, of shape (n, k).
+
+    Returns:
+        np.ndarray: Boolean mask of the rows on the Pareto front.
+    """
+    on_front = np.ones(len(objectives), dtype=bool)
+    for row, values in enumerate(objectives):
+        no_worse = (objectives <= values).all(axis=1)
+        better = (objectives < values).any(axis=1)
+        on_front[row] = not (no_worse & better).any()
+    return on_front
+
+
+def run(n_microsystems, sample):
+    """
+    Time the metrics join, the Pareto front and the ranking.
+
+    Args:
+        n_microsystems (int): Number of candidate microsystems.
+        sample (int): Number of microsystems for the pairwise comparison.
+    """
+    rng = np.random.default_rng(0)
+    ids = [f"MS{i}" for i in range(n_microsystems)]
+    values = np.round(rng.gamma(2.0, 50.0, size=(n_microsystems, len(METRICS))), 1)
+    metrics_data = {i: dict(zip(METRICS, row)) for i, row in zip(ids, values.tolist())}
+    lookup_ids = [ids[i] for i in rng.permutation(n_microsystems)]
+
+    start = time.perf_counter()
+    for microsystem_id in lookup_ids:
+        metrics = metrics_data.get(microsystem_id, {})
+        [metrics.get(metric, 0) for metric in METRICS]
+    dict_time = time.perf_counter() - start
+
+    table = ValueMetrics.from_json(metrics_data)
+    start = time.perf_counter()
+    table.join(lookup_ids)
+    join_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    on_front = pareto_front(value_objectives(values))
+    front_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rank_value_metrics(table, k=10)
+    rank_time = time.perf_counter() - start
+
+    objectives = value_objectives(values[:sample])
+    start = time.perf_counter()
+    expected = pairwise_front(objectives)
+    pairwise_time = time.perf_counter() - start
+    start = time.perf_counter()
+    sweep = pareto_front(objectives)
+    sweep_time = time.perf_counter() - start
+    assert (expected == sweep).all()
+
+    print(f"microsystems={n_microsystems} ({int(on_front.sum())} on the Pareto front)")
+    print(f"  dict lookups:        {dict_time:.3f} s")
+    print(f"  columnar join:       {join_time:.3f} s")
+    print(f"  pareto front:        {front_time:.3f} s")
+    print(f"  rank (top 10):       {rank_time:.3f} s")
+    print(f"  sample={sample}: pairwise {pairwise_time:.3f} s, sweep {sweep_time:.4f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--microsystems", type=int, default=1000000)
+    parser.add_argument("--sample", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.microsystems, args.sample)
@@ -0,0 +1,103 @@
+"""
+Benchmark for the RAMI DSL parser (ramiviz.dsl).
+
+Generates a synthetic DSL model of the requested size, parses it with
+``load_dsl`` and reports the throughput, next to ``json.load`` of the same model
+written as JSON for reference.
+
+Usage:
+    python benchmarks/bench_dsl_parser.py --microsystems 20000 --interactions 40000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ramiviz.dsl import load_dsl
+
+
+def generate_dsl(n_microsystems, n_interactions, seed=0):
+    """
+    Generate a synthetic DSL model in the style of SHP-SystemModel.
+
+    Args:
+        n_microsystems (int): Number of microsystem records.
+        n_interactions (int): Number of interaction records.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        str: DSL text.
+    """
+    rng = random.Random(seed)
+    services = [f"Service {i}" for i in range(500)]
+    layers = ["Asset Layer", "Integration Layer", "Communication Layer", "Information Layer",
+              "Functional Layer", "Business Layer"]
+    parts = []
+    for i in range(n_microsystems):
+        parts.append(
+            f"# Microsystem {i}\n"
+            f"microsystem {{\n"
+            f"  id: \"MS{i}\"\n"
+            f"  type: \"Type {i % 40}\"  // category\n"
+            f"  role: \"Role {i % 8}\"\n"
+            f"  asset: \"Asset {i}\"\n"
+            f"  shell: \"Shell {i}\"\n"
+            f"  provides: {json.dumps(rng.sample(services, 2))}\n"
+            f"  consumes: {json.dumps(rng.sample(services, 2))}\n"
+            f"  stakeholder: \"Stakeholder {i % 25}\"\n"
+            f"  layers: {json.dumps(rng.sample(layers, 2))}\n"
+            f"  coordinates: {{X: {rng.randrange(6)}, Y: {rng.randrange(8)}, Z: {rng.randrange(6)}}}\n"
+            f"}}\n"
+        )
+    for _ in range(n_interactions):
+        parts.append(
+            f"interaction {{ source_id: \"MS{rng.randrange(n_microsystems)}\", "
+            f"target_id: \"MS{rng.randrange(n_microsystems)}\", "
+            f"services: {json.dumps(rng.sample(services, 1))}, protocol: \"OPC UA\" }}\n"
+        )
+    return "\n".join(parts)
+
+
+def run(n_microsystems, n_interactions):
+    """
+    Time parsing a synthetic DSL model and loading the equivalent JSON.
+
+    Args:
+        n_microsystems (int): Number of microsystem records.
+        n_interactions (int): Number of interaction records.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        dsl_path = os.path.join(directory, "model.dsl")
+        json_path = os.path.join(directory, "model.json")
+        with open(dsl_path, "w") as file:
+            file.write(generate_dsl(n_microsystems, n_interactions))
+        size = os.path.getsize(dsl_path) / 1e6
+
+        start = time.perf_counter()
+        model = load_dsl(dsl_path)
+        dsl_time = time.perf_counter() - start
+
+        with open(json_path, "w") as file:
+            json.dump(model, file, indent=4)
+        start = time.perf_counter()
+        with open(json_path, "r") as file:
+            json.load(file)
+        json_time = time.perf_counter() - start
+
+    records = len(model["microsystems"]) + len(model["interactions"])
+    print(f"microsystems={n_microsystems} interactions={n_interactions} DSL size={size:.1f} MB")
+    print(f"  DSL parser: {dsl_time:.3f} s  ({size / dsl_time:.1f} MB/s, {records / dsl_time:,.0f} records/s)")
+    print(f"  json.load:  {json_time:.3f} s  (same model as indented JSON, for reference)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--microsystems", type=int, default=20000)
+    parser.add_argument("--interactions", type=int, default=40000)
+    args = parser.parse_args()
+    run(args.microsystems, args.interactions)
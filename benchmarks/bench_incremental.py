@@ -0,0 +1,119 @@
+"""
+Benchmark for incremental model updates (ramiviz.incremental).
+
+Applies deltas of a few changed, added and removed microsystems to a synthetic
+model and compares the update latency of ``IncrementalModel.apply_delta`` (plus
+building the interaction matrix) with recomputing alg2 mapping, alg3 filtering
+and the alg4 interaction matrix over the whole updated model.
+
+Usage:
+    python benchmarks/bench_incremental.py --microsystems 20000 --steps 500 --deltas 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alg2.alg2 import map_to_rami_axes, place_coordinates, placed_microsystems
+from alg3.alg3 import filter_dynamic_workflow
+from alg4.alg4 import create_weighted_interaction_matrix
+from benchmarks.bench_alg2_rules import generate_model as generate_rules
+from benchmarks.bench_alg3_filter import generate_model as generate_workflow
+from ramiviz.incremental import IncrementalModel
+
+
+def generate_delta(rng, microsystems, services, size, next_id):
+    """
+    Generate a delta changing, adding and removing ``size`` microsystems each.
+
+    Args:
+        rng (random.Random): Random generator.
+        microsystems (list): Current microsystems.
+        services (list): Service names to draw from.
+        size (int): Number of microsystems per kind of change.
+        next_id (int): Number of the first added microsystem.
+
+    Returns:
+        dict: The delta.
+    """
+    removed = rng.sample(microsystems, size)
+    removed_ids = {m["id"] for m in removed}
+    changed = [dict(m, provides=rng.sample(services, 2))
+               for m in rng.sample([m for m in microsystems if m["id"] not in removed_ids], size)]
+    added = [dict(rng.choice(microsystems), id=f"MS{next_id + i}", provides=rng.sample(services, 2))
+             for i in range(size)]
+    return {"microsystems": {"added": added, "changed": changed, "removed": sorted(removed_ids)}}
+
+
+def recompute(microsystems, mapping_config, workflow_data):
+    """
+    Run alg2 mapping, alg3 filtering and the alg4 interaction matrix from scratch.
+
+    Args:
+        microsystems (list): Microsystems of the model.
+        mapping_config (dict): Mapping configuration.
+        workflow_data (dict): Workflow data.
+    """
+    mapped = map_to_rami_axes({"microsystems": microsystems}, mapping_config, unresolved=[])
+    system = {"microsystems": placed_microsystems(microsystems, place_coordinates(mapped)), "interactions": []}
+    usecase = filter_dynamic_workflow(system, workflow_data)
+    create_weighted_interaction_matrix(system, usecase, sparse=True)
+
+
+def run(n_microsystems, n_steps, n_deltas, delta_size):
+    """
+    Time incremental updates against full recomputation.
+
+    Args:
+        n_microsystems (int): Number of microsystems.
+        n_steps (int): Number of workflow steps.
+        n_deltas (int): Number of deltas to apply.
+        delta_size (int): Microsystems changed, added and removed per delta.
+    """
+    rng = random.Random(0)
+    model, workflow_data = generate_workflow(n_microsystems, n_steps)
+    rules_model, mapping_config = generate_rules(n_microsystems, 100)
+    microsystems = [dict(m, **r) for m, r in zip(model["microsystems"], rules_model["microsystems"])]
+    services = sorted({s for step in workflow_data["steps"] for s in step["services"]})
+
+    start = time.perf_counter()
+    incremental = IncrementalModel({"microsystems": microsystems}, mapping_config, workflow_data=workflow_data,
+                                   weighted=True, sparse=True)
+    build_time = time.perf_counter() - start
+
+    incremental_time = full_time = 0.0
+    for k in range(n_deltas):
+        delta = generate_delta(rng, microsystems, services, delta_size, n_microsystems + k * delta_size)
+
+        start = time.perf_counter()
+        incremental.apply_delta(delta)
+        incremental.interaction_matrix()
+        incremental_time += time.perf_counter() - start
+
+        removed = set(delta["microsystems"]["removed"])
+        changed = {m["id"]: m for m in delta["microsystems"]["changed"]}
+        microsystems = [changed.get(m["id"], m) for m in microsystems if m["id"] not in removed]
+        microsystems += delta["microsystems"]["added"]
+
+        start = time.perf_counter()
+        recompute(microsystems, mapping_config, workflow_data)
+        full_time += time.perf_counter() - start
+
+    print(f"microsystems={n_microsystems} steps={n_steps} deltas={n_deltas} x {3 * delta_size} microsystems")
+    print(f"  initial build:       {build_time:.3f} s")
+    print(f"  full recompute:      {1000 * full_time / n_deltas:.2f} ms per delta")
+    print(f"  incremental update:  {1000 * incremental_time / n_deltas:.2f} ms per delta "
+          f"({full_time / incremental_time:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--microsystems", type=int, default=20000)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--deltas", type=int, default=20)
+    parser.add_argument("--delta-size", type=int, default=2)
+    args = parser.parse_args()
+    run(args.microsystems, args.steps, args.deltas, args.delta_size)
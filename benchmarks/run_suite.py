@@ -0,0 +1,342 @@
+"""
+End-to-end benchmark suite for Algorithms 1-7 on synthetic models.
+
+For every model size a seeded SHP-like dataset is generated (see
+``ramiviz.synthetic``) and written as JSON and as DSL text, then each stage
+function runs on the output of the stages before it; Algorithm 1 decodes the
+DSL file. A stage is timed as the best of ``--repeat`` runs and
+memory-profiled in one extra run under ``tracemalloc`` (peak of the memory
+allocated while it runs, NumPy arrays included). A stage that fails is
+recorded with its error and the stages that need its output are skipped.
+
+The results are written as JSON. With ``--baseline``, every stage is compared
+with an earlier result file; stages slower or using more memory than the
+baseline by more than ``--tolerance`` are reported as regressions and the suite
+exits with status 1.
+
+Usage:
+    python benchmarks/run_suite.py --sizes 1k 10k 100k --output results.json
+    python benchmarks/run_suite.py --sizes 1k 10k 100k --baseline results.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _REPO_ROOT)
+
+from alg1.alg1 import decode_document
+from alg2.alg2 import map_to_rami_axes, place_coordinates, placed_microsystems
+from alg3.alg3 import filter_dynamic_workflow
+from alg4.alg4 import (ClusterTree, assign_phases, create_interaction_matrix,
+                       create_weighted_interaction_matrix, symmetrize_interaction_matrix,
+                       visualize_interaction_matrix)
+from alg5.alg5 import visualize_3d_rami_cube
+from alg6.alg6 import ValueMetrics, map_to_2d, rank_value_metrics, visualize_value_projection
+from alg7.alg7 import annotate_value_metrics, create_integration_map, visualize_integration_map
+from ramiviz.dsl import write_dsl
+from ramiviz.render import use_headless_backend
+from ramiviz.streaming import load_model, write_model
+from ramiviz.synthetic import generate_dataset, size_of
+
+
+# Every stage takes the suite state, the dataset and the options, runs the
+# function it is named after on the output of earlier stages and stores the result
+
+def stage_decode(state, dataset, options):
+    # DSL input needs no schema
+    state['decoded'], errors = decode_document(options['dsl_path'], None)
+    if errors:
+        raise ValueError(errors[0])
+
+
+def stage_load(state, dataset, options):
+    state['model'] = load_model(options['model_path'])
+
+
+def stage_map(state, dataset, options):
+    state['mapped'] = map_to_rami_axes(state['model'], dataset['mapping_config'], unresolved=[])
+
+
+def stage_place(state, dataset, options):
+    coordinates = place_coordinates(state['mapped'])
+    state['system'] = {"microsystems": placed_microsystems(state['model']['microsystems'], coordinates),
+                       "interactions": state['model']['interactions']}
+
+
+def stage_filter(state, dataset, options):
+    state['usecase'] = filter_dynamic_workflow(state['system'], dataset['workflow'])
+
+
+def stage_matrix(state, dataset, options):
+    state['matrix'], state['matrix_ids'] = create_interaction_matrix(state['system'], state['usecase'])
+
+
+def stage_weighted_matrix(state, dataset, options):
+    weighted, _ = create_weighted_interaction_matrix(state['system'], state['usecase'])
+    state['weighted_matrix'] = symmetrize_interaction_matrix(weighted)
+
+
+def stage_cluster(state, dataset, options):
+    assign_phases(state['system'], dataset['phases'])
+    # Build the tree on every run; cluster_interactions would reuse the cached one after the first
+    state['labels'] = ClusterTree(state['weighted_matrix']).labels(options['n_clusters'])
+
+
+def stage_integration(state, dataset, options):
+    integration_map = create_integration_map(state['usecase'], dataset['stakeholder_metrics'],
+                                             dataset['system_components'], dataset['phases'],
+                                             dataset['lifecycle_stages'])
+    state['integration_map'] = annotate_value_metrics(integration_map, dataset['stakeholder_metrics'])
+
+
+def stage_projection(state, dataset, options):
+    state['projection'] = map_to_2d(state['system'], dataset['value_metrics'])
+
+
+def stage_ranking(state, dataset, options):
+    rank_value_metrics(ValueMetrics.from_json(dataset['value_metrics']), k=10)
+
+
+def render_matrix(state, dataset, options):
+    visualize_interaction_matrix(state['weighted_matrix'], state['labels'], state['matrix_ids'],
+                                 figure_path=os.path.join(options['figure_dir'], "interaction_matrix.png"))
+
+
+def render_cube(state, dataset, options):
+    visualize_3d_rami_cube(state['system'], state['usecase'], dataset['visual_config'],
+                           figure_path=os.path.join(options['figure_dir'], "rami_cube.png"))
+
+
+def render_projection(state, dataset, options):
+    visualize_value_projection(state['projection'], dataset['projection_config'],
+                               figure_path=os.path.join(options['figure_dir'], "value_projection.png"))
+
+
+def render_integration(state, dataset, options):
+    visualize_integration_map(state['integration_map'],
+                              figure_path=os.path.join(options['figure_dir'], "integration_map.png"))
+
+
+# Stages in run order: name (the function measured), function, state entries it
+# needs and whether it renders a figure
+STAGES = (
+    ('decode_document', stage_decode, (), False),
+    ('load_model', stage_load, (), False),
+    ('map_to_rami_axes', stage_map, ('model',), False),
+    ('place_coordinates', stage_place, ('mapped',), False),
+    ('filter_dynamic_workflow', stage_filter, ('system',), False),
+    ('create_interaction_matrix', stage_matrix, ('system', 'usecase'), False),
+    ('create_weighted_interaction_matrix', stage_weighted_matrix, ('system', 'usecase'), False),
+    ('cluster_interactions', stage_cluster, ('weighted_matrix',), False),
+    ('create_integration_map', stage_integration, ('usecase',), False),
+    ('map_to_2d', stage_projection, ('system',), False),
+    ('rank_value_metrics', stage_ranking, (), False),
+    ('visualize_interaction_matrix', render_matrix, ('weighted_matrix', 'labels', 'matrix_ids'), True),
+    ('visualize_3d_rami_cube', render_cube, ('system', 'usecase'), True),
+    ('visualize_value_projection', render_projection, ('projection',), True),
+    ('visualize_integration_map', render_integration, ('integration_map',), True),
+)
+
+
+def measure(function, repeat):
+    """
+    Time a function and trace the peak memory it allocates.
+
+    Args:
+        function (callable): Function without arguments.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        dict: Best ``seconds`` of the timed runs and ``peak_bytes`` of one traced run.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    # Traced separately: tracemalloc slows down allocation-heavy code
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "peak_bytes": peak}
+
+
+def run_size(size, seed, repeat, n_clusters, render, directory):
+    """
+    Generate the dataset of one model size and measure every stage on it.
+
+    Args:
+        size (str or int): Model size (see ``ramiviz.synthetic.SIZES``).
+        seed (int): Seed of the dataset.
+        repeat (int): Timed runs per stage.
+        n_clusters (int): Number of clusters.
+        render (bool): Measure the renderers as well.
+        directory (str): Directory for the model file and the figures.
+
+    Returns:
+        dict: Dataset size and the measurements (or error) of every stage.
+    """
+    start = time.perf_counter()
+    dataset = generate_dataset(size, seed=seed)
+    result = {
+        "microsystems": len(dataset['model']['microsystems']),
+        "interactions": len(dataset['model']['interactions']),
+        "steps": len(dataset['workflow']['steps']),
+        "generate_seconds": time.perf_counter() - start,
+        "stages": {},
+    }
+    options = {'model_path': os.path.join(directory, "model.json"), 'dsl_path': os.path.join(directory, "model.dsl"),
+               'figure_dir': directory, 'n_clusters': n_clusters}
+    write_model(options['model_path'], dataset['model'])
+    write_dsl(options['dsl_path'], dataset['model'])
+
+    state = {}
+    for name, function, needs, renders in STAGES:
+        if renders and not render:
+            continue
+        missing = [key for key in needs if key not in state]
+        if missing:
+            result['stages'][name] = {"skipped": f"needs {', '.join(missing)}"}
+        else:
+            try:
+                result['stages'][name] = measure(lambda: function(state, dataset, options), repeat)
+            except Exception as error:
+                result['stages'][name] = {"error": f"{type(error).__name__}: {error}"}
+        print(f"  {name:<36} {format_measurement(result['stages'][name])}", flush=True)
+    return result
+
+
+def format_measurement(measurement):
+    """
+    Format one stage measurement for the console.
+
+    Args:
+        measurement (dict): Output of ``measure``, or an ``error``/``skipped`` entry.
+
+    Returns:
+        str: The formatted measurement.
+    """
+    if 'seconds' not in measurement:
+        return measurement.get('error') or f"skipped ({measurement['skipped']})"
+    return f"{measurement['seconds']:9.3f} s {measurement['peak_bytes'] / 2 ** 20:10.1f} MiB"
+
+
+def environment():
+    """
+    Describe the code version and machine the suite runs on.
+
+    Returns:
+        dict: Git commit (None outside a repository), Python, NumPy and platform versions.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=_REPO_ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "created": datetime.datetime.now().isoformat(timespec='seconds')}
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    """
+    Compare the stage measurements with a baseline result file.
+
+    Args:
+        results (dict): Results of this run.
+        baseline (dict): Results of an earlier run.
+        tolerance (float): Allowed relative increase, e.g. 0.2 for 20%.
+        min_seconds (float): Stages faster than this in both runs are not
+            compared by time, as their timings are mostly noise.
+
+    Returns:
+        list: Regressions as ``(size, stage, quantity, baseline value, value)``.
+    """
+    regressions = []
+    for size, result in results['sizes'].items():
+        baseline_stages = baseline.get('sizes', {}).get(size, {}).get('stages', {})
+        for stage, measurement in result['stages'].items():
+            previous = baseline_stages.get(stage, {})
+            if 'seconds' not in previous:
+                continue
+            if 'seconds' not in measurement:
+                regressions.append((size, stage, 'status', 'ok', measurement.get('error', 'skipped')))
+                continue
+            if (max(measurement['seconds'], previous['seconds']) >= min_seconds
+                    and measurement['seconds'] > previous['seconds'] * (1 + tolerance)):
+                regressions.append((size, stage, 'seconds', previous['seconds'], measurement['seconds']))
+            if measurement['peak_bytes'] > previous['peak_bytes'] * (1 + tolerance):
+                regressions.append((size, stage, 'peak_bytes', previous['peak_bytes'], measurement['peak_bytes']))
+    return regressions
+
+
+def run(sizes, seed, repeat, n_clusters, render, output_path, baseline_path, tolerance, min_seconds):
+    """
+    Run the suite over all sizes, write the results and compare them with a baseline.
+
+    Args:
+        sizes (list): Model sizes.
+        seed (int): Seed of the datasets.
+        repeat (int): Timed runs per stage.
+        n_clusters (int): Number of clusters.
+        render (bool): Measure the renderers as well.
+        output_path (str): Path of the results JSON, or None.
+        baseline_path (str): Path of earlier results to compare with, or None.
+        tolerance (float): Allowed relative increase against the baseline.
+        min_seconds (float): Shortest stage time compared against the baseline.
+
+    Returns:
+        int: Exit status, 1 if the baseline comparison found regressions.
+    """
+    use_headless_backend()
+    results = dict(environment(), seed=seed, repeat=repeat, n_clusters=n_clusters, sizes={})
+    for size in sizes:
+        print(f"size={size} ({size_of(size)} microsystems)", flush=True)
+        with tempfile.TemporaryDirectory() as directory:
+            results['sizes'][str(size)] = run_size(size, seed, repeat, n_clusters, render, directory)
+
+    if output_path:
+        with open(output_path, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {output_path}")
+
+    if not baseline_path:
+        return 0
+    with open(baseline_path, 'r') as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, tolerance, min_seconds)
+    print(f"Compared with {baseline_path} (commit {baseline.get('commit')}): "
+          f"{len(regressions)} regression(s) above {tolerance:.0%}")
+    for size, stage, quantity, before, after in regressions:
+        print(f"  {size:<6} {stage:<36} {quantity:<10} {before} -> {after}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1k", "10k"],
+                        help="model sizes: 1k, 10k, 100k, 1m or numbers of microsystems")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (the best one counts)")
+    parser.add_argument("--clusters", type=int, default=3)
+    parser.add_argument("--no-render", action="store_true", help="skip the renderers")
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--min-seconds", type=float, default=0.01)
+    args = parser.parse_args()
+    sys.exit(run(args.sizes, args.seed, args.repeat, args.clusters, not args.no_render, args.output,
+                 args.baseline, args.tolerance, args.min_seconds))
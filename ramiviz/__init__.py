@@ -0,0 +1,3 @@
+"""
+Shared helpers for the RAMI 4.0 algorithms (alg1-alg7) and the visualization tool.
+"""
@@ -0,0 +1,180 @@
+"""
+On-disk cache of stage outputs, keyed by content hashes of the stage inputs.
+
+Entries are pickled into one file each. Reading an entry refreshes its
+modification time, and writing one evicts the least recently used entries until
+the cache fits in ``max_bytes`` again, so a cache directory can be shared by many
+runs without growing without bound.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+# Part of every key; bump it when the layout of cached stage outputs changes
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+ENTRY_SUFFIX = ".pickle"
+
+# File digests of this process, keyed by path, size and modification time
+_DIGEST_CACHE = {}
+
+
+def file_digest(path):
+    """
+    Hash the content of a file, or of every file in a directory (``.rami`` models).
+
+    Args:
+        path (str): Path to the file or directory.
+
+    Returns:
+        str: Hex SHA-256 digest of the content.
+    """
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(path)):
+            digest.update(name.encode())
+            digest.update(file_digest(os.path.join(path, name)).encode())
+        return digest.hexdigest()
+
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _DIGEST_CACHE:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+        _DIGEST_CACHE[key] = digest.hexdigest()
+    return _DIGEST_CACHE[key]
+
+
+def value_digest(value):
+    """
+    Hash a JSON-like value (configuration values, rule lists, ...).
+
+    Args:
+        value: Value to hash; dict keys are sorted, other objects use ``str``.
+
+    Returns:
+        str: Hex SHA-256 digest of the canonical JSON encoding.
+    """
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class StageCache:
+    """
+    Size-bounded, least-recently-used cache of stage outputs in a directory.
+
+    Args:
+        directory (str): Cache directory, created if needed.
+        max_bytes (int, optional): Total size of the entries to keep.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, *parts):
+        """
+        Build an entry key from the inputs of a stage.
+
+        Args:
+            *parts: JSON-like values, e.g. the stage name, the key of the stage
+                it builds on, file digests and configuration values.
+
+        Returns:
+            str: The key.
+        """
+        return value_digest([CACHE_VERSION, parts])
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        """
+        Read an entry and mark it as recently used.
+
+        Args:
+            key (str): Entry key.
+
+        Returns:
+            The cached value, or None if there is no (readable) entry.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Truncated or stale entry; drop it and recompute
+            self._remove(path)
+            return None
+        os.utime(path)
+        return value
+
+    def put(self, key, value):
+        """
+        Write an entry, then evict least recently used entries over the size bound.
+
+        Args:
+            key (str): Entry key.
+            value: Picklable value.
+        """
+        # Write to a temporary file first so readers never see a partial entry
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self._entry_path(key))
+        except BaseException:
+            self._remove(temporary_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in ``max_bytes``.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(ENTRY_SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(os.path.join(self.directory, name))
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """
+        Remove every entry of the cache.
+        """
+        for name in os.listdir(self.directory):
+            if name.endswith(ENTRY_SUFFIX):
+                self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,298 @@
+"""
+Columnar binary format for handing models from one stage to the next.
+
+A columnar model is a directory (by convention ending in ``.rami``) holding one
+NumPy ``.npy`` file per column and a ``manifest.json``:
+
+- node table: ``id``, ``coordinates`` (X, Y, Z as one (n, 3) array),
+  ``stakeholder`` and ``cluster`` (-1 where a microsystem has none),
+- edge table: ``source`` and ``target`` positions into the node table.
+
+Columns are memory-mapped on load, so a stage reads only the pages it touches
+and pays no JSON parsing or object allocation. JSON stays the import/export
+format; ``.npz`` archives are not used because they cannot be memory-mapped.
+"""
+import json
+import os
+
+import numpy as np
+
+from ramiviz.model_index import ModelIndex
+
+COLUMNAR_SUFFIX = ".rami"
+
+FORMAT_NAME = "ramiviz-columnar"
+FORMAT_VERSION = 1
+
+NODE_COLUMNS = ("id", "coordinates", "stakeholder", "cluster")
+EDGE_COLUMNS = ("source", "target")
+
+MANIFEST_FILE = "manifest.json"
+
+
+def is_columnar(path):
+    """
+    Check whether a path names a columnar model.
+
+    Args:
+        path (str): Path to a model file or directory.
+
+    Returns:
+        bool: True for a directory with a columnar manifest, or a path ending in
+            ``.rami``.
+    """
+    path = str(path)
+    return path.endswith(COLUMNAR_SUFFIX) or os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+
+class ColumnarModel:
+    """
+    Node and edge tables of one model as NumPy arrays.
+
+    Attributes:
+        ids (np.ndarray): Microsystem IDs (strings).
+        coordinates (np.ndarray): X, Y, Z coordinates of shape (n, 3), NaN if missing.
+        stakeholders (np.ndarray): Stakeholder of each microsystem ('' if missing).
+        clusters (np.ndarray): Cluster label of each microsystem (-1 if missing).
+        sources (np.ndarray): Node position of the source of each interaction.
+        targets (np.ndarray): Node position of the target of each interaction.
+
+    Args:
+        ids (array-like): Microsystem IDs.
+        coordinates (array-like): Coordinates of shape (n, 3).
+        stakeholders (array-like, optional): Stakeholder of each microsystem.
+        clusters (array-like, optional): Cluster label of each microsystem.
+        sources (array-like, optional): Source positions of the interactions.
+        targets (array-like, optional): Target positions of the interactions.
+    """
+
+    def __init__(self, ids, coordinates, stakeholders=None, clusters=None, sources=None, targets=None):
+        self.ids = np.asarray(ids, dtype=str)
+        n = len(self.ids)
+        self.coordinates = np.asarray(coordinates, dtype=float).reshape(n, 3)
+        self.stakeholders = np.asarray(stakeholders if stakeholders is not None else [""] * n, dtype=str)
+        self.clusters = np.asarray(clusters if clusters is not None else np.full(n, -1), dtype=np.int64)
+        self.sources = np.asarray(sources if sources is not None else [], dtype=np.intp)
+        self.targets = np.asarray(targets if targets is not None else [], dtype=np.intp)
+        if len(self.stakeholders) != n or len(self.clusters) != n:
+            raise ValueError("Expected one stakeholder and one cluster per microsystem.")
+        if len(self.sources) != len(self.targets):
+            raise ValueError("Expected one target per interaction source.")
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_json(cls, model):
+        """
+        Build the tables from a JSON model.
+
+        Interactions with an endpoint that is not a microsystem of the model are
+        left out, as alg4 ignores them.
+
+        Args:
+            model (dict or list): Model with ``microsystems`` (and optionally
+                ``interactions``), or a bare list of microsystems as written by alg2.
+
+        Returns:
+            ColumnarModel: The columnar model.
+        """
+        if isinstance(model, list):
+            model = {'microsystems': model}
+        microsystems = model['microsystems']
+        index = ModelIndex(microsystems)
+        interactions = [i for i in model.get('interactions', []) if i['source_id'] in index and i['target_id'] in index]
+        sources, targets = index.edge_positions(interactions)
+        stakeholders = ["" if s is None else str(s) for s in (index.stakeholders[i] for i in index.ids)]
+        clusters = [m.get('cluster', -1) for m in microsystems]
+        return cls([str(i) for i in index.ids], index.coordinates, stakeholders, clusters, sources, targets)
+
+    def to_json(self):
+        """
+        Export the tables as a JSON model.
+
+        Only the columns are exported; other microsystem attributes are not part
+        of the columnar format.
+
+        Returns:
+            dict: Model with ``microsystems`` and ``interactions``.
+        """
+        microsystems = []
+        for k, microsystem_id in enumerate(self.ids.tolist()):
+            microsystem = {
+                'id': microsystem_id,
+                'coordinates': {axis: (None if np.isnan(value) else value)
+                                for axis, value in zip("XYZ", self.coordinates[k].tolist())},
+            }
+            if self.stakeholders[k]:
+                microsystem['stakeholder'] = str(self.stakeholders[k])
+            if self.clusters[k] >= 0:
+                microsystem['cluster'] = int(self.clusters[k])
+            microsystems.append(microsystem)
+        ids = self.ids.tolist()
+        interactions = [{'source_id': ids[s], 'target_id': ids[t]}
+                        for s, t in zip(self.sources.tolist(), self.targets.tolist())]
+        return {'microsystems': microsystems, 'interactions': interactions}
+
+    def model_index(self):
+        """
+        Build a ``ModelIndex`` over the node table for id lookups.
+
+        Returns:
+            ModelIndex: Index sharing this model's coordinate array.
+        """
+        return ModelIndex.from_columns(self.ids.tolist(), self.coordinates, self.stakeholders.tolist())
+
+
+def save_columnar(model, path):
+    """
+    Write a columnar model to a directory.
+
+    Args:
+        model (ColumnarModel): The model.
+        path (str): Output directory, created if needed (conventionally ``*.rami``).
+
+    Returns:
+        str: The output directory.
+    """
+    os.makedirs(path, exist_ok=True)
+    columns = {
+        'id': model.ids,
+        'coordinates': model.coordinates,
+        'stakeholder': model.stakeholders,
+        'cluster': model.clusters,
+        'source': model.sources,
+        'target': model.targets,
+    }
+    for name, values in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(values))
+
+    manifest = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'nodes': len(model),
+        'edges': len(model.sources),
+        'node_columns': list(NODE_COLUMNS),
+        'edge_columns': list(EDGE_COLUMNS),
+    }
+    with open(os.path.join(path, MANIFEST_FILE), 'w') as file:
+        json.dump(manifest, file, indent=4)
+    return path
+
+
+def load_columnar(path, mmap_mode='r'):
+    """
+    Read a columnar model, memory-mapping its columns.
+
+    Args:
+        path (str): Columnar model directory.
+        mmap_mode (str, optional): ``np.load`` memory-map mode; None reads the
+            columns into memory.
+
+    Returns:
+        ColumnarModel: The model.
+
+    Raises:
+        ValueError: If the directory is not a columnar model of a supported version.
+    """
+    with open(os.path.join(path, MANIFEST_FILE), 'r') as file:
+        manifest = json.load(file)
+    if manifest.get('format') != FORMAT_NAME or manifest.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} model of version {FORMAT_VERSION}.")
+
+    columns = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+        for name in NODE_COLUMNS + EDGE_COLUMNS
+    }
+    model = ColumnarModel.__new__(ColumnarModel)
+    model.ids = columns['id']
+    model.coordinates = columns['coordinates']
+    model.stakeholders = columns['stakeholder']
+    model.clusters = columns['cluster']
+    model.sources = columns['source']
+    model.targets = columns['target']
+    return model
+
+
+def load_model_file(path):
+    """
+    Load a stage handoff file, columnar or JSON.
+
+    Args:
+        path (str): Columnar model directory or JSON file.
+
+    Returns:
+        ColumnarModel or dict: Memory-mapped columnar model, or the JSON document.
+    """
+    if is_columnar(path):
+        return load_columnar(path)
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def load_model_json(path):
+    """
+    Load a stage handoff file, columnar or JSON, as a JSON model.
+
+    For stages that work on the JSON layout; a columnar model is converted with
+    ``ColumnarModel.to_json`` and so only has its columns.
+
+    Args:
+        path (str): Columnar model directory or JSON file.
+
+    Returns:
+        dict or list: The JSON model.
+    """
+    if is_columnar(path):
+        return load_columnar(path).to_json()
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def save_model_file(model, path, indent=4):
+    """
+    Save a stage handoff file, columnar or JSON depending on the path.
+
+    Args:
+        model (dict): JSON model with ``microsystems`` and ``interactions``.
+        path (str): Output path; a ``.rami`` path is written in the columnar format.
+        indent (int, optional): JSON indentation.
+
+    Returns:
+        str: The output path.
+    """
+    if is_columnar(path):
+        return save_columnar(ColumnarModel.from_json(model), path)
+    with open(path, 'w') as file:
+        json.dump(model, file, indent=indent)
+    return path
+
+
+def json_to_columnar(json_path, columnar_path):
+    """
+    Import a JSON model into the columnar format.
+
+    Args:
+        json_path (str): JSON model file.
+        columnar_path (str): Output directory.
+
+    Returns:
+        ColumnarModel: The imported model.
+    """
+    with open(json_path, 'r') as file:
+        model = ColumnarModel.from_json(json.load(file))
+    save_columnar(model, columnar_path)
+    return model
+
+
+def columnar_to_json(columnar_path, json_path, indent=4):
+    """
+    Export a columnar model as JSON.
+
+    Args:
+        columnar_path (str): Columnar model directory.
+        json_path (str): Output JSON file.
+        indent (int, optional): JSON indentation; None writes compact JSON.
+    """
+    with open(json_path, 'w') as file:
+        json.dump(load_columnar(columnar_path).to_json(), file, indent=indent)
@@ -0,0 +1,464 @@
+"""
+Parser for the brace-based RAMI DSL text format.
+
+The DSL describes a system model as a sequence of records::
+
+    # Microsystems of Stakeholder-1
+    microsystem {
+      id: "PDM"                       // commas between fields are optional
+      provides: ["Design Specifications", "Bill of Materials"]
+      coordinates: {X: 1, Y: 2, Z: 3}
+    }
+
+    Interaction { source_id: "PDM", target_id: "SCPM", services: ["Order Data"] }
+
+Record types are case-insensitive; ``microsystem`` records go to the
+``microsystems`` array and ``interaction`` records to ``interactions``, giving the
+same dict model as the JSON input of alg2. Values are quoted strings, numbers,
+``true``/``false``/``null``, ``[...]`` lists and ``{...}`` objects. ``#`` and
+``//`` start comments. Files wrapped in LaTeX (as in ``SHP-SystemModel``) are
+read from their ``verbatim`` blocks; blocks holding JSON are skipped.
+
+Records are parsed line by line and yielded as soon as they are complete, so a
+model is converted without holding its text in memory. Syntax errors raise
+``DSLSyntaxError`` with the line and column of the offending token.
+``write_dsl`` writes a dict model back as DSL text.
+"""
+import json
+import re
+
+from ramiviz.streaming import is_json_lines
+
+# Record type (lower case) to the model array it belongs to
+RECORD_ARRAYS = {
+    'microsystem': 'microsystems',
+    'interaction': 'interactions',
+}
+
+# Model array to the record type ``write_dsl`` writes for its items
+RECORD_TYPES = {'microsystems': 'Microsystem', 'interactions': 'Interaction'}
+
+_LITERALS = {'true': True, 'false': False, 'null': None}
+
+# Whitespace and comments match without a group and are skipped
+_TOKEN_PATTERN = re.compile(r'''
+      [ \t\r\n\f]+
+    | (?:\#|//)[^\n]*
+    | (?P<string>"(?:[^"\\\n]|\\.)*")
+    | (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)(?![\w.])
+    | (?P<name>[A-Za-z_][\w\-]*)
+    | (?P<punct>[{}\[\]:,])
+    | (?P<error>.)
+''', re.VERBOSE)
+
+# Fast paths for the common lines holding one field, or a whole record, whose
+# values are strings, lists of strings or numbers; they are decoded without
+# going through single tokens
+_STRING = r'"(?:[^"\\\n]|\\.)*"'
+_SIMPLE_FIELD = rf'''
+    (?P<key>[A-Za-z_][\w\-]*)[ \t]*:[ \t]*
+    (?P<value>{_STRING}
+      | \[[ \t]*(?:{_STRING}(?:[ \t]*,[ \t]*{_STRING})*)?[ \t]*\]
+      | -?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?![\w.]))
+'''
+_LINE_END = r'[ \t]*(?:(?:\#|//)[^\n]*)?\r?\n?\Z'
+_FIELD_LINE_PATTERN = re.compile(rf'[ \t]*{_SIMPLE_FIELD}[ \t]*,?{_LINE_END}', re.VERBOSE)
+_FIELD_PATTERN = re.compile(rf'{_SIMPLE_FIELD}[ \t]*,?[ \t]*', re.VERBOSE)
+_RECORD_LINE_PATTERN = re.compile(rf'''
+    [ \t]*(?P<record>[A-Za-z_]\w*)[ \t]*\{{[ \t]*
+    (?P<fields>(?:{_SIMPLE_FIELD}[ \t]*,?[ \t]*)*)
+    \}}{_LINE_END}
+''', re.VERBOSE)
+
+# Field names written without quotes
+_NAME_PATTERN = re.compile(r'[A-Za-z_][\w\-]*\Z')
+
+
+class DSLSyntaxError(ValueError):
+    """
+    Syntax error in a DSL model.
+
+    Attributes:
+        line (int): Line number of the offending token (1-based).
+        column (int): Column of the offending token (1-based).
+        path (str): File the model was read from, if known.
+
+    Args:
+        message (str): Description of the error.
+        line (int): Line number.
+        column (int): Column.
+        path (str, optional): File name.
+    """
+
+    def __init__(self, message, line, column, path=None):
+        self.line = line
+        self.column = column
+        self.path = path
+        location = f"{path}:{line}:{column}" if path else f"line {line}, column {column}"
+        super().__init__(f"{location}: {message}")
+
+
+def _model_lines(lines):
+    """
+    Select the DSL lines of a plain or LaTeX-wrapped model.
+
+    Args:
+        lines (iterable): Lines of the file.
+
+    Yields:
+        tuple: Line number and text of every line that belongs to the DSL.
+    """
+    latex = None
+    in_block = False
+    json_block = False
+    for line_number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if latex is None and stripped:
+            latex = stripped.startswith('\\')
+        if not latex:
+            yield line_number, line
+            continue
+
+        if stripped.startswith('\\begin{verbatim}'):
+            in_block, json_block = True, None
+        elif stripped.startswith('\\end{verbatim}'):
+            in_block = False
+        elif in_block:
+            if json_block is None and stripped and not stripped.startswith(('#', '//')):
+                json_block = stripped[0] in '[{'
+            if not json_block:
+                yield line_number, line
+
+
+def _tokens(numbered_lines, path):
+    """
+    Split DSL lines into tokens.
+
+    Args:
+        numbered_lines (iterable): Line number and text pairs.
+        path (str): File name for error messages, or None.
+
+    Yields:
+        tuple: Token kind (``string``, ``number``, ``name``, ``punct``, ``field``,
+            ``record`` or ``end``), text, line and column. A ``field`` token stands
+            for a whole ``key: value`` line and holds the key and decoded value; a
+            ``record`` token stands for a one-line record and holds its type and
+            fields.
+    """
+    line_number = 0
+    for line_number, line in numbered_lines:
+        record = _RECORD_LINE_PATTERN.match(line)
+        if record:
+            fields = {}
+            for field in _FIELD_PATTERN.finditer(line, record.start('fields'), record.end('fields')):
+                if field.group('key') in fields:
+                    raise DSLSyntaxError(f"Duplicate field {field.group('key')!r}", line_number,
+                                         field.start() + 1, path)
+                try:
+                    fields[field.group('key')] = _decode_simple(field.group('value'))
+                except ValueError:
+                    raise DSLSyntaxError("Invalid escape in string", line_number,
+                                         field.start('value') + 1, path) from None
+            yield 'record', (record.group('record'), fields), line_number, record.start('record') + 1
+            continue
+        field = _FIELD_LINE_PATTERN.match(line)
+        if field:
+            try:
+                value = _decode_simple(field.group('value'))
+            except ValueError:
+                raise DSLSyntaxError("Invalid escape in string", line_number, field.start('value') + 1, path) from None
+            yield 'field', (field.group('key'), value), line_number, field.start('key') + 1
+            continue
+        for match in _TOKEN_PATTERN.finditer(line):
+            kind = match.lastgroup
+            if kind is None:
+                continue
+            if kind == 'error':
+                text = match.group(kind)
+                message = "Unterminated string" if text == '"' else f"Unexpected character {text!r}"
+                raise DSLSyntaxError(message, line_number, match.start() + 1, path)
+            yield kind, match.group(kind), line_number, match.start() + 1
+    yield 'end', '', line_number + 1, 1
+
+
+def _decode_simple(text):
+    """
+    Decode a value matched by the fast field-line pattern.
+
+    Args:
+        text (str): A quoted string, a list of quoted strings or a number.
+
+    Returns:
+        object: The decoded value.
+    """
+    if text[0] == '"' and '\\' not in text:
+        return text[1:-1]
+    if text[0] in '"[':
+        return json.loads(text)
+    return float(text) if '.' in text else int(text)
+
+
+class _Parser:
+    """
+    Recursive-descent parser over a token stream.
+
+    Args:
+        tokens (iterator): Tokens from ``_tokens``.
+        path (str): File name for error messages, or None.
+    """
+
+    def __init__(self, tokens, path):
+        self.tokens = tokens
+        self.path = path
+        self.advance()
+
+    def advance(self):
+        self.kind, self.text, self.line, self.column = next(self.tokens)
+
+    def error(self, message):
+        raise DSLSyntaxError(message, self.line, self.column, self.path)
+
+    def describe(self):
+        if self.kind == 'end':
+            return "end of file"
+        if self.kind == 'field':
+            return f"field {self.text[0]!r}"
+        if self.kind == 'record':
+            return f"record {self.text[0]!r}"
+        return repr(self.text)
+
+    def string(self, text):
+        if '\\' not in text:
+            return text[1:-1]
+        try:
+            return json.loads(text)
+        except ValueError:
+            self.error("Invalid escape in string")
+
+    def at(self, punct):
+        return self.kind == 'punct' and self.text == punct
+
+    def expect(self, punct):
+        if not self.at(punct):
+            self.error(f"Expected '{punct}', found {self.describe()}")
+        self.advance()
+
+    def records(self):
+        while self.kind != 'end':
+            if self.kind == 'record':
+                name, record = self.text
+                array = RECORD_ARRAYS.get(name.lower())
+                if array is None:
+                    self.error(f"Unknown record type {name!r}")
+                self.advance()
+                yield array, record
+                continue
+            if self.kind != 'name':
+                self.error(f"Expected a record such as 'microsystem {{', found {self.describe()}")
+            array = RECORD_ARRAYS.get(self.text.lower())
+            if array is None:
+                self.error(f"Unknown record type {self.text!r}")
+            self.advance()
+            yield array, self.fields()
+
+    def fields(self):
+        self.expect('{')
+        record = {}
+        while not self.at('}'):
+            if self.kind == 'field':
+                key, value = self.text
+                if key in record:
+                    self.error(f"Duplicate field {key!r}")
+                record[key] = value
+                self.advance()
+                continue
+            if self.kind == 'name':
+                key = self.text
+            elif self.kind == 'string':
+                key = self.string(self.text)
+            else:
+                self.error(f"Expected a field name or '}}', found {self.describe()}")
+            if key in record:
+                self.error(f"Duplicate field {key!r}")
+            self.advance()
+            self.expect(':')
+            record[key] = self.value()
+            if self.at(','):
+                self.advance()
+        self.advance()
+        return record
+
+    def value(self):
+        kind, text = self.kind, self.text
+        if kind == 'string':
+            value = self.string(text)
+            self.advance()
+            return value
+        if kind == 'number':
+            self.advance()
+            return float(text) if any(c in text for c in '.eE') else int(text)
+        if kind == 'name' and text in _LITERALS:
+            self.advance()
+            return _LITERALS[text]
+        if self.at('['):
+            self.advance()
+            items = []
+            while not self.at(']'):
+                if self.kind == 'end':
+                    self.error("Unterminated list, expected ']'")
+                items.append(self.value())
+                if self.at(','):
+                    self.advance()
+            self.advance()
+            return items
+        if self.at('{'):
+            return self.fields()
+        if kind == 'name':
+            self.error(f"Unexpected name {text!r}; string values must be quoted")
+        self.error(f"Expected a value, found {self.describe()}")
+
+
+def iter_dsl_records(lines, path=None):
+    """
+    Parse DSL lines into model records, one record at a time.
+
+    Args:
+        lines (iterable): Lines of the model (e.g. an open file).
+        path (str, optional): File name used in error messages.
+
+    Yields:
+        tuple: Model array (``microsystems`` or ``interactions``) and record dict.
+
+    Raises:
+        DSLSyntaxError: If the model is not valid DSL.
+    """
+    yield from _Parser(_tokens(_model_lines(lines), path), path).records()
+
+
+def iter_dsl_file(path):
+    """
+    Parse a DSL file into model records, one record at a time.
+
+    Args:
+        path (str): Path to the DSL file.
+
+    Yields:
+        tuple: Model array and record dict.
+
+    Raises:
+        DSLSyntaxError: If the file is not valid DSL.
+    """
+    with open(path, 'r') as file:
+        yield from iter_dsl_records(file, path)
+
+
+def parse_dsl(text):
+    """
+    Parse a DSL model into the pipeline's dict model.
+
+    Args:
+        text (str): DSL text.
+
+    Returns:
+        dict: ``microsystems`` and ``interactions`` lists.
+
+    Raises:
+        DSLSyntaxError: If the text is not valid DSL.
+    """
+    return _collect(iter_dsl_records(text.splitlines()))
+
+
+def load_dsl(path):
+    """
+    Load a DSL file into the pipeline's dict model.
+
+    Args:
+        path (str): Path to the DSL file.
+
+    Returns:
+        dict: ``microsystems`` and ``interactions`` lists.
+
+    Raises:
+        DSLSyntaxError: If the file is not valid DSL.
+    """
+    return _collect(iter_dsl_file(path))
+
+
+def _collect(records):
+    model = {array: [] for array in RECORD_ARRAYS.values()}
+    for array, record in records:
+        model[array].append(record)
+    return model
+
+
+def dsl_to_json(input_file, output_file, indent=4):
+    """
+    Convert a DSL file to a JSON model file.
+
+    A JSON Lines output (``.jsonl``) is written record by record with each line
+    tagged by its array (see ``ramiviz.streaming``), without holding the model.
+
+    Args:
+        input_file (str): Path to the DSL file.
+        output_file (str): Path to the JSON or JSON Lines output.
+        indent (int, optional): JSON indentation; None writes compact JSON.
+
+    Returns:
+        dict: Number of records per model array.
+
+    Raises:
+        DSLSyntaxError: If the input is not valid DSL. A partially written JSON
+            Lines output is left in place.
+    """
+    if is_json_lines(output_file):
+        counts = {array: 0 for array in RECORD_ARRAYS.values()}
+        with open(output_file, 'w') as file:
+            for array, record in iter_dsl_file(input_file):
+                file.write(json.dumps({array: record}) + "\n")
+                counts[array] += 1
+        return counts
+
+    model = load_dsl(input_file)
+    with open(output_file, 'w') as file:
+        json.dump(model, file, indent=indent)
+    return {array: len(records) for array, records in model.items()}
+
+
+def _format_record(record_type, record):
+    fields = []
+    for key, value in record.items():
+        name = key if _NAME_PATTERN.match(key) else json.dumps(key)
+        fields.append(f"    {name}: {json.dumps(value)}")
+    return record_type + " {\n" + "".join(field + ",\n" for field in fields) + "}\n"
+
+
+def write_dsl(path, arrays):
+    """
+    Write a model as DSL text, one record at a time.
+
+    Each microsystem and interaction becomes a record with one field per line,
+    as in ``alg1/DSL``; ``load_dsl`` reads the file back into the same model.
+
+    Args:
+        path (str): Output path.
+        arrays (dict): Model array (``microsystems`` or ``interactions``) to
+            iterable of records.
+
+    Returns:
+        dict: Number of records written per array.
+
+    Raises:
+        ValueError: If an array is not one of the model arrays.
+    """
+    counts = {}
+    separator = ""
+    with open(path, 'w') as file:
+        for name, records in arrays.items():
+            if name not in RECORD_TYPES:
+                raise ValueError(f"Unknown model array {name!r}; expected one of {', '.join(RECORD_TYPES)}")
+            counts[name] = 0
+            for counts[name], record in enumerate(records, 1):
+                # Records are separated by a blank line
+                file.write(separator + _format_record(RECORD_TYPES[name], record))
+                separator = "\n"
+    return counts
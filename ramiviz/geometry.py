@@ -0,0 +1,103 @@
+"""
+Mesh geometry for drawing microsystems as ellipsoids.
+
+All ellipsoids of a figure are produced as one triangle mesh: a unit-sphere
+template is computed once per grid resolution and scaled and translated to
+every microsystem with a single broadcast operation.
+"""
+import functools
+
+import numpy as np
+
+# Number of triangles a batched ellipsoid mesh aims to stay below
+DEFAULT_TRIANGLE_BUDGET = 200_000
+
+
+@functools.lru_cache(maxsize=16)
+def unit_sphere_mesh(resolution):
+    """
+    Triangulate the unit sphere on a longitude/latitude grid.
+
+    Args:
+        resolution (int): Number of grid points around the equator; the number of
+            latitude rings is about half of it.
+
+    Returns:
+        np.ndarray: Vertices of shape (V, 3).
+        np.ndarray: Triangle faces of shape (F, 3) indexing the vertices.
+    """
+    n_u = max(int(resolution), 3)
+    n_v = max(n_u // 2 + 1, 3)
+    u = np.linspace(0, 2 * np.pi, n_u, endpoint=False)
+    v = np.linspace(0, np.pi, n_v)
+
+    vertices = np.column_stack([
+        np.outer(np.sin(v), np.cos(u)).ravel(),
+        np.outer(np.sin(v), np.sin(u)).ravel(),
+        np.repeat(np.cos(v), n_u),
+    ])
+
+    ring = np.arange(n_v - 1)[:, np.newaxis] * n_u
+    j = np.arange(n_u)[np.newaxis, :]
+    a = (ring + j).ravel()
+    b = (ring + (j + 1) % n_u).ravel()
+    c = a + n_u
+    d = b + n_u
+    faces = np.concatenate([np.column_stack([a, c, b]), np.column_stack([b, c, d])])
+
+    vertices.setflags(write=False)
+    faces.setflags(write=False)
+    return vertices, faces
+
+
+def mesh_resolution(count, triangle_budget=DEFAULT_TRIANGLE_BUDGET, minimum=6, maximum=40):
+    """
+    Choose the grid resolution for a number of ellipsoids (level of detail).
+
+    Args:
+        count (int): Number of ellipsoids to draw.
+        triangle_budget (int): Total number of triangles to aim for.
+        minimum (int): Coarsest resolution.
+        maximum (int): Finest resolution.
+
+    Returns:
+        int: Grid resolution for ``unit_sphere_mesh``.
+    """
+    # A sphere at resolution r has about r * r triangles
+    resolution = int(np.sqrt(triangle_budget / max(count, 1)))
+    return int(np.clip(resolution, minimum, maximum))
+
+
+def ellipsoid_mesh(centers, radii, resolution=None, angles=None):
+    """
+    Build one triangle mesh holding an ellipsoid per center.
+
+    Args:
+        centers (array-like): Ellipsoid centers of shape (n, 3).
+        radii (array-like): Semi-axes (a, b, c), shared by all ellipsoids or of shape (n, 3).
+        resolution (int, optional): Grid resolution; chosen with ``mesh_resolution``
+            when not given.
+        angles (array-like, optional): Tilt of each ellipsoid around the x-axis in
+            degrees, shared or of shape (n,).
+
+    Returns:
+        np.ndarray: Vertices of shape (n * V, 3); ellipsoid ``i`` owns rows ``i * V`` to ``(i + 1) * V``.
+        np.ndarray: Triangle faces of shape (n * F, 3); ellipsoid ``i`` owns rows ``i * F`` to ``(i + 1) * F``.
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), centers.shape)
+    if resolution is None:
+        resolution = mesh_resolution(len(centers))
+
+    template_vertices, template_faces = unit_sphere_mesh(resolution)
+    vertices = template_vertices[np.newaxis] * radii[:, np.newaxis]
+    if angles is not None:
+        angle = np.radians(np.broadcast_to(np.asarray(angles, dtype=float), centers.shape[:1]))[:, np.newaxis]
+        y, z = vertices[..., 1], vertices[..., 2]
+        vertices = np.stack([vertices[..., 0],
+                             y * np.cos(angle) - z * np.sin(angle),
+                             y * np.sin(angle) + z * np.cos(angle)], axis=-1)
+    vertices = vertices + centers[:, np.newaxis]
+    offsets = np.arange(len(centers))[:, np.newaxis, np.newaxis] * len(template_vertices)
+    faces = template_faces[np.newaxis] + offsets
+    return vertices.reshape(-1, 3), faces.reshape(-1, 3)
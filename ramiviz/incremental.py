@@ -0,0 +1,518 @@
+"""
+Incremental updates of a system model for Algorithms 2-4.
+
+``IncrementalModel`` holds the mapped coordinates (alg2), the workflow filter
+(alg3) and the interaction matrix (alg4) of a model, and applies deltas of
+added, changed and removed microsystems and interactions in time proportional
+to the change:
+
+    {
+        "microsystems": {"added": [...], "changed": [...], "removed": ["MS7"]},
+        "interactions": {"added": [...], "removed": [{"source_id": "MS1", "target_id": "MS2"}]}
+    }
+
+A changed microsystem replaces the record with the same ID; removing an
+interaction removes every interaction from its source to its target. After any
+sequence of deltas the results equal a full run of the algorithms over the
+updated model, in which changed microsystems keep their position and added ones
+are appended.
+
+With a workflow, the use-case interactions are the workflow's own interactions
+between the microsystems of each step, as in alg3, so model interactions only
+reach the interaction matrix when no workflow is given.
+
+Cluster labels have no exact incremental update. Added and affected
+microsystems join the cluster of their most strongly connected neighbours, and
+the model is clustered again from scratch once ``recluster_fraction`` of its
+microsystems were labelled that way.
+"""
+import json
+import os
+import sys
+
+import numpy as np
+from scipy import sparse as sp
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from alg2.alg2 import compile_mapping_configuration, map_microsystem, place_coordinates, placed_microsystems
+from alg3.alg3 import microsystem_services
+from alg4.alg4 import (DENSE_MAX_MICROSYSTEMS, cluster_interactions, interaction_weights,
+                       symmetrize_interaction_matrix)
+
+
+def load_delta(delta_path):
+    """
+    Load a model delta from a JSON file.
+
+    Args:
+        delta_path (str): Path to the delta (see the module docstring).
+
+    Returns:
+        dict: The delta.
+    """
+    with open(delta_path, 'r') as file:
+        return json.load(file)
+
+
+def _pair(interaction):
+    return interaction['source_id'], interaction['target_id']
+
+
+class IncrementalModel:
+    """
+    Results of Algorithms 2-4 over a model that changes by small deltas.
+
+    Args:
+        model (dict): System model with ``microsystems`` and ``interactions``.
+        mapping_config (dict): Rule-based mapping configuration (alg2).
+        workflow_data (dict, optional): Workflow to filter the use case with
+            (alg3); without it the use case is the whole system model.
+        placement (float): Relative position inside the mapped ranges.
+        phases (list, optional): Engineering phases to assign (alg4).
+        weighted (bool): Use the weighted, directed interaction matrix instead
+            of binary adjacency.
+        service_weights (dict, optional): Weight per service name.
+        sparse (bool, optional): Return sparse matrices; by default above
+            DENSE_MAX_MICROSYSTEMS.
+        n_clusters (int, optional): Number of clusters; no labels without it.
+        recluster_fraction (float): Fraction of incrementally labelled
+            microsystems after which the model is clustered again.
+    """
+
+    def __init__(self, model, mapping_config, workflow_data=None, placement=0.5, phases=None, weighted=False,
+                 service_weights=None, sparse=None, n_clusters=None, recluster_fraction=0.2):
+        self.compiled_rules = compile_mapping_configuration(mapping_config)
+        self.workflow_data = workflow_data
+        self.placement = placement
+        self.phases = phases
+        self.weighted = weighted
+        self.service_weights = service_weights
+        self.sparse = sparse
+        self.n_clusters = n_clusters
+        self.recluster_fraction = recluster_fraction
+
+        # Microsystems in system order, with their alg2 results
+        self._microsystems = {}
+        self._mapped = {}
+        self._placed = {}
+        self._unresolved = {}
+
+        # Matrix row of every live microsystem; rows of removed ones stay dead
+        self._slots = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._slot_count = 0
+
+        # Model interactions in insertion order, and their keys per (source, target)
+        self._interactions = {}
+        self._interaction_weights = {}
+        self._pair_interactions = {}
+        self._next_interaction = 0
+
+        # Workflow steps: steps per service, members and interactions per step
+        self._steps = workflow_data['steps'] if workflow_data else []
+        self._service_steps = {}
+        self._step_members = [set() for _ in self._steps]
+        self._step_endpoints = []
+        self._step_weights = []
+        self._memberships = {}
+        self._pair_occurrences = {}
+        for k, step in enumerate(self._steps):
+            for service in step['services']:
+                self._service_steps.setdefault(service, set()).add(k)
+            endpoints = {}
+            for j, interaction in enumerate(step['interactions']):
+                source_id, target_id = _pair(interaction)
+                endpoints.setdefault(source_id, []).append(j)
+                if target_id != source_id:
+                    endpoints.setdefault(target_id, []).append(j)
+            self._step_endpoints.append(endpoints)
+            self._step_weights.append(interaction_weights(step['interactions'], service_weights))
+
+        # One matrix edge per (source, target) pair, in growable arrays
+        self._edges = {}
+        self._edge_source = np.zeros(0, dtype=np.int64)
+        self._edge_target = np.zeros(0, dtype=np.int64)
+        self._edge_weight = np.zeros(0)
+        self._edge_active = np.zeros(0, dtype=bool)
+        self._adjacent = {}
+
+        self._labels = {}
+        self._assigned = 0
+
+        self._dirty_pairs = set()
+        self._add_microsystems(list(model['microsystems']))
+        for interaction in model.get('interactions', []):
+            self._add_interaction(interaction)
+        self._refresh_pairs()
+        if n_clusters:
+            self.recluster()
+
+    # Microsystems (alg2 mapping, alg3 step membership, matrix rows)
+
+    def _map(self, microsystems):
+        compiled_rules = self.compiled_rules
+        unresolved = {}
+        mapped = []
+        for microsystem in microsystems:
+            axis_unresolved = []
+            mapped.append(map_microsystem(microsystem, compiled_rules, unresolved=axis_unresolved))
+            unresolved[microsystem['id']] = axis_unresolved
+        placed = placed_microsystems(microsystems, place_coordinates(mapped, position=self.placement))
+
+        for microsystem, mapped_data, placed_data in zip(microsystems, mapped, placed):
+            microsystem_id = microsystem['id']
+            if self.phases is not None:
+                placed_data['phases'] = [phase for phase in self.phases if phase in microsystem.get('involvement', [])]
+            self._microsystems[microsystem_id] = microsystem
+            self._mapped[microsystem_id] = mapped_data
+            self._placed[microsystem_id] = placed_data
+            if unresolved[microsystem_id]:
+                self._unresolved[microsystem_id] = unresolved[microsystem_id]
+            else:
+                self._unresolved.pop(microsystem_id, None)
+
+    def _add_microsystems(self, microsystems):
+        for microsystem in microsystems:
+            microsystem_id = microsystem['id']
+            if microsystem_id in self._slots:
+                raise ValueError(f"Microsystem ID {microsystem_id} already exists.")
+            if self._slot_count == len(self._alive):
+                self._alive = np.concatenate([self._alive, np.zeros(max(16, self._slot_count), dtype=bool)])
+            slot = self._slot_count
+            self._slot_count += 1
+            self._alive[slot] = True
+            self._slots[microsystem_id] = slot
+            self._move_endpoint(microsystem_id, slot)
+        self._map(microsystems)
+        for microsystem in microsystems:
+            self._update_membership(microsystem['id'], microsystem)
+
+    def _change_microsystems(self, microsystems):
+        for microsystem in microsystems:
+            if microsystem['id'] not in self._microsystems:
+                raise KeyError(f"Unknown microsystem ID {microsystem['id']}")
+        self._map(microsystems)
+        for microsystem in microsystems:
+            self._update_membership(microsystem['id'], microsystem)
+
+    def _remove_microsystem(self, microsystem_id):
+        if microsystem_id not in self._microsystems:
+            raise KeyError(f"Unknown microsystem ID {microsystem_id}")
+        self._alive[self._slots.pop(microsystem_id)] = False
+        self._move_endpoint(microsystem_id, -1)
+        for store in (self._microsystems, self._mapped, self._placed, self._unresolved, self._labels):
+            store.pop(microsystem_id, None)
+        self._update_membership(microsystem_id, None)
+
+    def _update_membership(self, microsystem_id, microsystem):
+        """
+        Move a microsystem between workflow steps and (de)activate the step
+        interactions that depend on it.
+        """
+        if not self._steps:
+            return
+        old_steps = self._memberships.pop(microsystem_id, set())
+        new_steps = set()
+        if microsystem is not None:
+            for service in microsystem_services(microsystem):
+                new_steps.update(self._service_steps.get(service, ()))
+            if new_steps:
+                self._memberships[microsystem_id] = new_steps
+
+        for k in old_steps - new_steps:
+            self._step_members[k].discard(microsystem_id)
+            for j in self._step_endpoints[k].get(microsystem_id, ()):
+                pair = _pair(self._steps[k]['interactions'][j])
+                self._pair_occurrences.get(pair, set()).discard((k, j))
+                self._dirty_pairs.add(pair)
+        for k in new_steps - old_steps:
+            members = self._step_members[k]
+            members.add(microsystem_id)
+            for j in self._step_endpoints[k].get(microsystem_id, ()):
+                pair = _pair(self._steps[k]['interactions'][j])
+                if pair[0] in members and pair[1] in members:
+                    self._pair_occurrences.setdefault(pair, set()).add((k, j))
+                    self._dirty_pairs.add(pair)
+
+    # Interactions and matrix edges
+
+    def _add_interaction(self, interaction):
+        key = self._next_interaction
+        self._next_interaction += 1
+        self._interactions[key] = interaction
+        self._interaction_weights[key] = interaction_weights([interaction], self.service_weights)[0]
+        pair = _pair(interaction)
+        self._pair_interactions.setdefault(pair, []).append(key)
+        if not self._steps:
+            self._dirty_pairs.add(pair)
+
+    def _remove_interactions(self, pair):
+        for key in self._pair_interactions.pop(pair, ()):
+            del self._interactions[key]
+            del self._interaction_weights[key]
+        if not self._steps:
+            self._dirty_pairs.add(pair)
+
+    def _move_endpoint(self, microsystem_id, slot):
+        for pair in self._adjacent.get(microsystem_id, ()):
+            edge = self._edges[pair]
+            if pair[0] == microsystem_id:
+                self._edge_source[edge] = slot
+            if pair[1] == microsystem_id:
+                self._edge_target[edge] = slot
+
+    def _edge(self, pair):
+        edge = self._edges.get(pair)
+        if edge is None:
+            edge = self._edges[pair] = len(self._edges)
+            if edge == len(self._edge_weight):
+                grow = max(16, edge)
+                self._edge_source = np.concatenate([self._edge_source, np.full(grow, -1, dtype=np.int64)])
+                self._edge_target = np.concatenate([self._edge_target, np.full(grow, -1, dtype=np.int64)])
+                self._edge_weight = np.concatenate([self._edge_weight, np.zeros(grow)])
+                self._edge_active = np.concatenate([self._edge_active, np.zeros(grow, dtype=bool)])
+            self._edge_source[edge] = self._slots.get(pair[0], -1)
+            self._edge_target[edge] = self._slots.get(pair[1], -1)
+            for microsystem_id in set(pair):
+                self._adjacent.setdefault(microsystem_id, set()).add(pair)
+        return edge
+
+    def _refresh_pairs(self):
+        """
+        Recompute the matrix entry of every pair touched since the last refresh.
+
+        Returns:
+            set: IDs of the microsystems at either end of a touched pair.
+        """
+        touched = set()
+        for pair in self._dirty_pairs:
+            if self._steps:
+                # alg3 keeps the last of duplicate interactions between two microsystems
+                occurrences = self._pair_occurrences.get(pair)
+                active = bool(occurrences)
+                if active:
+                    k, j = max(occurrences)
+                    weight = self._step_weights[k][j]
+            else:
+                keys = self._pair_interactions.get(pair, ())
+                active = bool(keys)
+                weight = sum(self._interaction_weights[key] for key in keys)
+            edge = self._edges.get(pair)
+            if edge is None and not active:
+                continue
+            edge = self._edge(pair)
+            self._edge_active[edge] = active
+            if active:
+                self._edge_weight[edge] = weight
+            touched.update(pair)
+        self._dirty_pairs = set()
+        return touched
+
+    # Deltas
+
+    def apply_delta(self, delta):
+        """
+        Apply added, changed and removed microsystems and interactions.
+
+        Args:
+            delta (dict): Delta with optional ``microsystems`` and ``interactions``
+                sections (see the module docstring).
+
+        Returns:
+            dict: Summary with the number of ``mapped`` and ``removed``
+                microsystems, the ``edges`` whose matrix entry was recomputed, the
+                ``relabeled`` microsystems and whether the model was ``reclustered``.
+
+        Raises:
+            KeyError: If a changed or removed microsystem ID is unknown.
+            ValueError: If an added microsystem ID already exists.
+        """
+        microsystem_delta = delta.get('microsystems', {})
+        interaction_delta = delta.get('interactions', {})
+
+        for microsystem_id in microsystem_delta.get('removed', []):
+            self._remove_microsystem(microsystem_id)
+        self._change_microsystems(microsystem_delta.get('changed', []))
+        self._add_microsystems(microsystem_delta.get('added', []))
+        for interaction in interaction_delta.get('removed', []):
+            self._remove_interactions(_pair(interaction))
+        for interaction in interaction_delta.get('added', []):
+            self._add_interaction(interaction)
+
+        edges = len(self._dirty_pairs)
+        touched = self._refresh_pairs()
+        updated = [m['id'] for key in ('changed', 'added') for m in microsystem_delta.get(key, [])]
+        touched.update(updated)
+
+        relabeled = 0
+        reclustered = False
+        if self.n_clusters:
+            relabeled = self._assign_labels(touched)
+            self._assigned += relabeled
+            if self._assigned > self.recluster_fraction * len(self._microsystems):
+                self.recluster()
+                reclustered = True
+
+        return {
+            'mapped': len(updated),
+            'removed': len(microsystem_delta.get('removed', [])),
+            'edges': edges,
+            'relabeled': relabeled,
+            'reclustered': reclustered,
+        }
+
+    # Clustering
+
+    def recluster(self):
+        """
+        Cluster the current interaction matrix from scratch (alg4).
+
+        Returns:
+            np.ndarray: Cluster labels in system order.
+        """
+        interaction_matrix, microsystem_ids = self.interaction_matrix()
+        if self.weighted:
+            interaction_matrix = symmetrize_interaction_matrix(interaction_matrix)
+        labels = cluster_interactions(interaction_matrix, self.n_clusters)
+        self._labels = dict(zip(microsystem_ids, labels.tolist()))
+        self._assigned = 0
+        return labels
+
+    def _assign_labels(self, microsystem_ids):
+        """
+        Give microsystems the label of their most strongly connected neighbours.
+
+        Microsystems without labelled neighbours keep their label, or join the
+        largest cluster if they have none.
+
+        Returns:
+            int: Number of labelled microsystems.
+        """
+        counts = {}
+        for label in self._labels.values():
+            counts[label] = counts.get(label, 0) + 1
+        largest = max(counts, key=lambda label: (counts[label], -label)) if counts else 0
+
+        labelled = 0
+        for microsystem_id in microsystem_ids:
+            if microsystem_id not in self._microsystems:
+                continue
+            scores = {}
+            for pair in self._adjacent.get(microsystem_id, ()):
+                edge = self._edges[pair]
+                neighbour = pair[1] if pair[0] == microsystem_id else pair[0]
+                if not self._edge_active[edge] or neighbour == microsystem_id or neighbour not in self._labels:
+                    continue
+                label = self._labels[neighbour]
+                scores[label] = scores.get(label, 0) + (self._edge_weight[edge] if self.weighted else 1)
+            if scores:
+                self._labels[microsystem_id] = max(scores, key=lambda label: (scores[label], -label))
+            else:
+                self._labels.setdefault(microsystem_id, largest)
+            labelled += 1
+        return labelled
+
+    # Results
+
+    @property
+    def unresolved(self):
+        """list: Unmatched axis mappings in system order (see alg2 batch mode)."""
+        return [entry for microsystem_id in self._microsystems for entry in self._unresolved.get(microsystem_id, ())]
+
+    def system_mapped_data(self):
+        """
+        Get the alg2 mapping of every microsystem.
+
+        Returns:
+            list: Mapped data as returned by ``map_to_rami_axes``.
+        """
+        return [self._mapped[microsystem_id] for microsystem_id in self._microsystems]
+
+    def system_data(self):
+        """
+        Get the system model with numeric coordinates.
+
+        Returns:
+            dict: Microsystems (copies with placed coordinates and, if configured,
+                phases) and interactions.
+        """
+        return {
+            'microsystems': [self._placed[microsystem_id] for microsystem_id in self._microsystems],
+            'interactions': list(self._interactions.values()),
+        }
+
+    def usecase_data(self):
+        """
+        Get the use case of the workflow, as ``filter_dynamic_workflow`` returns it.
+
+        Returns:
+            dict: Use-case microsystems and interactions; the whole system model
+                without a workflow.
+        """
+        if not self._steps:
+            return self.system_data()
+
+        selected = []
+        seen = set()
+        for members in self._step_members:
+            new = sorted(members - seen, key=self._slots.__getitem__)
+            selected.extend(self._placed[microsystem_id] for microsystem_id in new)
+            seen.update(new)
+
+        occurrences = sorted(
+            (min(occurrence), max(occurrence)) for occurrence in self._pair_occurrences.values() if occurrence
+        )
+        interactions = [self._steps[k]['interactions'][j] for _, (k, j) in occurrences]
+        return {'microsystems': selected, 'interactions': interactions}
+
+    def interaction_matrix(self):
+        """
+        Build the interaction matrix from the maintained edges.
+
+        Returns:
+            np.ndarray or scipy.sparse.csr_matrix: Weighted, directed matrix (see
+                ``create_weighted_interaction_matrix``), or binary symmetric
+                adjacency without ``weighted`` (see ``create_interaction_matrix``).
+            list: Microsystem IDs in the order of the matrix rows/columns.
+        """
+        microsystem_ids = list(self._microsystems)
+        n = len(microsystem_ids)
+        sparse = self.sparse if self.sparse is not None else n > DENSE_MAX_MICROSYSTEMS
+
+        rank = np.cumsum(self._alive[:self._slot_count]) - 1
+        count = len(self._edges)
+        source, target = self._edge_source[:count], self._edge_target[:count]
+        active = self._edge_active[:count] & (source >= 0) & (target >= 0)
+        rows, cols = rank[source[active]], rank[target[active]]
+
+        if self.weighted:
+            weights = self._edge_weight[:count][active]
+            if sparse:
+                return sp.csr_matrix((weights, (rows, cols)), shape=(n, n)), microsystem_ids
+            interaction_matrix = np.zeros((n, n))
+            interaction_matrix[rows, cols] = weights
+            return interaction_matrix, microsystem_ids
+
+        rows, cols = np.concatenate([rows, cols]), np.concatenate([cols, rows])
+        if sparse:
+            interaction_matrix = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+            interaction_matrix.data[:] = 1
+        else:
+            interaction_matrix = np.zeros((n, n))
+            interaction_matrix[rows, cols] = 1
+        return interaction_matrix, microsystem_ids
+
+    def labels(self):
+        """
+        Get the cluster labels.
+
+        Returns:
+            np.ndarray: Cluster label of each microsystem in system order, or None
+                without ``n_clusters``.
+        """
+        if not self.n_clusters:
+            return None
+        return np.array([self._labels[microsystem_id] for microsystem_id in self._microsystems], dtype=np.int64)
@@ -0,0 +1,198 @@
+"""
+Reading and editing commented JSON (``//`` and ``/* */`` comments, trailing commas).
+
+``loads`` parses such text. The editing helpers change single values of the text
+in place, so the comments and layout around them are kept: ``value_spans``
+locates every value by its path of object keys and array positions, and
+``insert_array_item``, ``insert_object_member`` and ``replace_value`` splice new
+JSON text into those spans.
+"""
+import json
+import re
+
+# Strings are matched first so that "//" inside a string value is kept
+_COMMENT_PATTERN = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*[\s\S]*?\*/|,(\s*[}\]])')
+
+# Whitespace and comments between the tokens of commented JSON
+_GAP_PATTERN = re.compile(r'(?:\s+|//[^\n]*|/\*[\s\S]*?\*/)*')
+_STRING_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"')
+_SCALAR_PATTERN = re.compile(r'[^\s,\]}/]+')
+
+# Indentation added for each nesting level of inserted values
+INDENT = "  "
+
+
+def strip_comments(text):
+    """
+    Remove // and /* */ comments and trailing commas from commented JSON.
+
+    Args:
+        text (str): JSON text with comments.
+
+    Returns:
+        str: Plain JSON text.
+    """
+    def replace(match):
+        if match.group(1) is not None:
+            return match.group(1)
+        return match.group(2) or ''
+    return _COMMENT_PATTERN.sub(replace, text)
+
+
+def loads(text):
+    """
+    Parse commented JSON text.
+
+    Args:
+        text (str): JSON text with comments.
+
+    Returns:
+        The parsed value.
+    """
+    return json.loads(strip_comments(text))
+
+
+def value_spans(text):
+    """
+    Locate every value of a commented JSON document in its text.
+
+    Args:
+        text (str): JSON text, possibly with comments and trailing commas.
+
+    Returns:
+        dict: ``(start, end)`` text offsets of each value, keyed by its path of
+            object keys and array positions; the document itself is under ``()``.
+    """
+    spans = {}
+
+    def skip(position):
+        return _GAP_PATTERN.match(text, position).end()
+
+    def parse(position, path):
+        start = position = skip(position)
+        if text[position] in '{[':
+            closing = '}' if text[position] == '{' else ']'
+            position = skip(position + 1)
+            item = 0
+            while text[position] != closing:
+                if closing == '}':
+                    key = _STRING_PATTERN.match(text, position)
+                    position = skip(key.end()) + 1  # past the colon
+                    item = json.loads(key.group())
+                position = parse(position, path + (item,))
+                position = skip(position)
+                if text[position] == ',':
+                    position = skip(position + 1)
+                if closing == ']':
+                    item += 1
+            position += 1
+        elif text[position] == '"':
+            position = _STRING_PATTERN.match(text, position).end()
+        else:
+            position = _SCALAR_PATTERN.match(text, position).end()
+        spans[path] = (start, position)
+        return position
+
+    parse(0, ())
+    return spans
+
+
+def child_spans(spans, path):
+    """
+    Get the spans of the members or items of an object or array.
+
+    Args:
+        spans (dict): Output of ``value_spans``.
+        path (tuple): Path of the object or array.
+
+    Returns:
+        dict: ``(start, end)`` of each child, keyed by its key or array position.
+    """
+    return {child[-1]: span for child, span in spans.items() if len(child) == len(path) + 1 and child[:-1] == path}
+
+
+def _line_indent(text, position):
+    """
+    Get the leading whitespace of the line containing a text offset.
+    """
+    line_start = text.rfind('\n', 0, position) + 1
+    return text[line_start:len(text) - len(text[line_start:].lstrip(' \t'))]
+
+
+def insert_array_item(text, spans, path, item_text):
+    """
+    Append an item to an array of commented JSON text, keeping the text around it.
+
+    The item goes on its own line at the indentation of the other items. A
+    trailing comma after the last item and a comment on its line are kept.
+
+    Args:
+        text (str): JSON text.
+        spans (dict): Output of ``value_spans`` for ``text``.
+        path (tuple): Path of the array.
+        item_text (str): JSON text of the new item.
+
+    Returns:
+        str: The edited text.
+    """
+    start, end = spans[path]
+    items = sorted(child_spans(spans, path).values())
+    if not items:
+        indent = _line_indent(text, start) + INDENT
+        rest = text[start + 1:end]
+        if not rest[:-1].strip():
+            rest = "\n" + _line_indent(text, start) + "]"
+        return text[:start + 1] + "\n" + indent + item_text + rest + text[end:]
+
+    indent = _line_indent(text, items[0][0])
+    last_end = items[-1][1]
+    after = _GAP_PATTERN.match(text, last_end).end()
+    if text[after] == ',':
+        # Keep a trailing comma style
+        return text[:after + 1] + "\n" + indent + item_text + "," + text[after + 1:]
+    line_end = text.find('\n', last_end)
+    if line_end != -1 and (not text[last_end:line_end].strip() or text[last_end:line_end].strip().startswith('//')):
+        # Keep a comment after the last item on its line
+        return text[:last_end] + "," + text[last_end:line_end] + "\n" + indent + item_text + text[line_end:]
+    return text[:last_end] + ",\n" + indent + item_text + text[last_end:]
+
+
+def insert_object_member(text, spans, path, key, value):
+    """
+    Add a member to an object of commented JSON text, keeping the text around it.
+
+    The member becomes the first one of the object, on its own line.
+
+    Args:
+        text (str): JSON text.
+        spans (dict): Output of ``value_spans`` for ``text``.
+        path (tuple): Path of the object.
+        key (str): Member name.
+        value: JSON value of the member.
+
+    Returns:
+        str: The edited text.
+    """
+    start, end = spans[path]
+    indent = _line_indent(text, start) + INDENT
+    member = f"{json.dumps(key)}: {json.dumps(value)}"
+    if child_spans(spans, path):
+        return text[:start + 1] + "\n" + indent + member + "," + text[start + 1:]
+    return text[:start + 1] + "\n" + indent + member + "\n" + _line_indent(text, start) + text[end - 1:]
+
+
+def replace_value(text, spans, path, value_text):
+    """
+    Replace one value of commented JSON text, keeping the text around it.
+
+    Args:
+        text (str): JSON text.
+        spans (dict): Output of ``value_spans`` for ``text``.
+        path (tuple): Path of the value.
+        value_text (str): JSON text of the new value.
+
+    Returns:
+        str: The edited text.
+    """
+    start, end = spans[path]
+    return text[:start] + value_text + text[end:]
@@ -0,0 +1,133 @@
+"""
+Lookup index over the microsystems of a loaded model.
+
+Built once per model and shared by the stages that resolve interaction
+endpoints (alg5, alg7), replacing linear searches over the microsystem list.
+"""
+import numpy as np
+
+AXES = ("X", "Y", "Z")
+
+
+def _coordinate(value):
+    """
+    Convert a coordinate value to float.
+
+    Args:
+        value: Coordinate value of a microsystem.
+
+    Returns:
+        float: The value, or NaN if it is missing or not numeric (e.g. an
+            unplaced range expression).
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ModelIndex:
+    """
+    Index of the microsystems (or system components) of one model.
+
+    Attributes:
+        ids (list): Microsystem IDs in model order.
+        positions (dict): ID to position in ``ids``.
+        microsystems (dict): ID to microsystem.
+        stakeholders (dict): ID to stakeholder (``stakeholder``, or ``stakeholder_id``
+            when the former is missing).
+        coordinates (np.ndarray): X, Y, Z coordinates of shape (n, 3); NaN where a
+            coordinate is missing or not numeric.
+
+    Args:
+        microsystems (list): Microsystems (or components) with an ``id``.
+    """
+
+    def __init__(self, microsystems):
+        microsystems = list(microsystems)
+        self.ids = [m['id'] for m in microsystems]
+        self.positions = {microsystem_id: k for k, microsystem_id in enumerate(self.ids)}
+        self.microsystems = dict(zip(self.ids, microsystems))
+        self.stakeholders = {
+            m['id']: m.get('stakeholder', m.get('stakeholder_id')) for m in microsystems
+        }
+        self.coordinates = np.array([
+            [_coordinate(m.get('coordinates', {}).get(axis)) for axis in AXES]
+            for m in microsystems
+        ], dtype=float).reshape(-1, len(AXES))
+
+    @classmethod
+    def from_columns(cls, ids, coordinates, stakeholders):
+        """
+        Build the index from columns, e.g. of a ``ramiviz.columnar`` model.
+
+        ``microsystems`` is empty for an index built this way.
+
+        Args:
+            ids (list): Microsystem IDs.
+            coordinates (np.ndarray): Coordinates of shape (n, 3), used without copying.
+            stakeholders (list): Stakeholder of each microsystem.
+
+        Returns:
+            ModelIndex: Index of the columns.
+        """
+        index = cls([])
+        index.ids = list(ids)
+        index.positions = {microsystem_id: k for k, microsystem_id in enumerate(index.ids)}
+        index.stakeholders = dict(zip(index.ids, stakeholders))
+        index.coordinates = coordinates
+        return index
+
+    @classmethod
+    def from_components(cls, system_components):
+        """
+        Build the index from system components data (``{"components": [...]}``).
+
+        Args:
+            system_components (dict): System components with ``id`` and ``stakeholder``.
+
+        Returns:
+            ModelIndex: Index of the components.
+        """
+        return cls(system_components['components'])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, microsystem_id):
+        return microsystem_id in self.positions
+
+    def positions_of(self, microsystem_ids):
+        """
+        Look up the positions of several microsystems.
+
+        Args:
+            microsystem_ids (iterable): Microsystem IDs.
+
+        Returns:
+            np.ndarray: Position of each microsystem in ``ids``.
+
+        Raises:
+            KeyError: If an ID is not in the model.
+        """
+        try:
+            return np.fromiter((self.positions[i] for i in microsystem_ids), dtype=np.intp)
+        except KeyError as error:
+            raise KeyError(f"Unknown microsystem ID {error.args[0]!r}") from None
+
+    def edge_positions(self, interactions):
+        """
+        Look up the source and target positions of interactions.
+
+        Args:
+            interactions (list): Interactions with ``source_id`` and ``target_id``.
+
+        Returns:
+            np.ndarray: Source positions.
+            np.ndarray: Target positions.
+
+        Raises:
+            KeyError: If an endpoint is not in the model.
+        """
+        return (self.positions_of(i['source_id'] for i in interactions),
+                self.positions_of(i['target_id'] for i in interactions))
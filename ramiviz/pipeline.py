@@ -0,0 +1,542 @@
+"""
+End-to-end pipeline runner chaining Algorithms 1-7 in memory.
+
+One JSON configuration file describes a run; every stage hands its result to
+the next as Python objects, and files are only written where the configuration
+asks for a checkpoint or a figure. Paths in the configuration are relative to
+the configuration file.
+
+Example configuration::
+
+    {
+        "input": "alg1/DSL",                      # XML (XMI), DSL or JSON model
+        "schema": "alg1/schem_rami_xsd",          # only needed for XML input
+        "mapping_config": "alg2/mapping_config_json",
+        "workflow": "workflow_data.json",         # optional; all microsystems otherwise
+        "phases": ["Design", "Development", "Production", "Maintenance"],
+        "lifecycle_stages": ["Concept", "Operation", "Disposal"],
+        "n_clusters": 3,                          # or "auto" to select it by modularity
+        "placement": 0.5,                         # position inside mapped ranges
+        "weighted": false, "sparse": null,        # alg4 matrix options
+        "visual_config": "visual_config.json",    # alg5 cube
+        "value_metrics": "value_metrics.json",    # alg6 metrics per microsystem
+        "projection_config": "projection_config.json",
+        "stakeholder_metrics": "stakeholder_metrics.json",  # alg7 annotations
+        "figures": {"interaction_matrix": "out/matrix.png", "rami_cube": "out/cube.png",
+                    "value_projection": "out/projection.png", "integration_map": "out/map.png"},
+        "checkpoints": {"system_mapped": "out/system_mapped_data.json",
+                        "usecase": "out/usecase_mapped_data.rami"},
+        "trace": "out/trace.json",                # Chrome trace of stages and counters
+        "trace_memory": false                     # trace peak memory with tracemalloc
+    }
+
+Stages whose inputs are not configured are skipped; ``"stages"`` restricts a
+run to a subset of ``STAGE_NAMES`` (including the stages it builds on).
+``run_pipeline`` returns every intermediate result together with the time spent
+in each stage. The algorithm modules are imported by the stages that use them,
+so e.g. xmlschema is only needed for XML input.
+"""
+import json
+import os
+import sys
+import time
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from ramiviz import trace
+from ramiviz.cache import DEFAULT_MAX_BYTES, StageCache, file_digest
+from ramiviz.columnar import save_model_file
+from ramiviz.dsl import load_dsl
+from ramiviz.model_index import ModelIndex
+from ramiviz.streaming import load_model
+
+
+def _resolve(config, path):
+    """
+    Resolve a configured path relative to the configuration file.
+
+    Args:
+        config (dict): Pipeline configuration.
+        path (str): Path from the configuration, or None.
+
+    Returns:
+        str: The resolved path, or None.
+    """
+    return None if path is None else os.path.join(config.get('base_dir', ''), path)
+
+
+def _path(config, key):
+    return _resolve(config, config.get(key))
+
+
+def _load_json(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def _write_checkpoint(state, config, stage_name):
+    if stage_name not in CHECKPOINTS:
+        return
+    name, state_key = CHECKPOINTS[stage_name]
+    path = _resolve(config, config.get('checkpoints', {}).get(name))
+    if path:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        state['checkpoints'][name] = save_model_file(state[state_key], path)
+
+
+def _figure_path(config, name):
+    path = _resolve(config, config.get('figures', {}).get(name))
+    if path:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return path
+
+
+def stage_validate(state, config):
+    """
+    Algorithm 1: read the input model (XML, DSL or JSON).
+
+    Args:
+        state (dict): Pipeline state; sets ``model``.
+        config (dict): Pipeline configuration.
+
+    Raises:
+        ValueError: If an XML model does not conform to the schema.
+        ramiviz.dsl.DSLSyntaxError: If a DSL model cannot be parsed.
+    """
+    input_path = _path(config, 'input')
+    with open(input_path, 'r') as file:
+        first = file.read(4096).lstrip()[:1]
+    if first in ('{', '['):
+        model = load_model(input_path)
+    elif first == '<':
+        from alg1.alg1 import decode_document, load_schema
+        schema_path = _path(config, 'schema')
+        if schema_path is None:
+            raise ValueError("XML input needs a 'schema' in the pipeline configuration.")
+        model, errors = decode_document(input_path, load_schema(schema_path))
+        if errors:
+            raise ValueError(f"Input model {input_path} is invalid: {errors[0]}")
+    else:
+        model = load_dsl(input_path)
+    if isinstance(model, list):
+        model = {'microsystems': model}
+    model.setdefault('interactions', [])
+    state['model'] = model
+
+
+def stage_map(state, config):
+    """
+    Algorithm 2: map microsystems to RAMI 4.0 axes and place them numerically.
+
+    Microsystems that match no rule are collected in ``unresolved`` (batch mode)
+    instead of prompting. Range mappings are placed at ``placement`` (default:
+    the middle) of their range so the visualizations get numeric coordinates.
+    With a stage cache, only the axes whose rules changed are mapped again.
+
+    Args:
+        state (dict): Pipeline state; sets ``system`` and ``unresolved``.
+        config (dict): Pipeline configuration.
+    """
+    from alg2.alg2 import (load_mapping_configuration, map_to_rami_axes, map_to_rami_axes_cached,
+                           place_coordinates, placed_microsystems)
+
+    model = state['model']
+    mapping_config = load_mapping_configuration(_path(config, 'mapping_config'))
+    unresolved = []
+    cache = state.get('cache')
+    if cache is not None:
+        model_key = state['keys'].get('validate') or cache.key(model)
+        mapped = map_to_rami_axes_cached(model, mapping_config, cache, model_key, unresolved=unresolved)
+    else:
+        mapped = map_to_rami_axes(model, mapping_config, unresolved=unresolved)
+    microsystems = placed_microsystems(model['microsystems'],
+                                       place_coordinates(mapped, position=config.get('placement', 0.5)))
+
+    state['system'] = {'microsystems': microsystems, 'interactions': model['interactions']}
+    state['unresolved'] = unresolved
+
+
+def stage_filter(state, config):
+    """
+    Algorithm 3: filter the system model to the configured workflow.
+
+    Without a workflow the whole system model is the use case.
+
+    Args:
+        state (dict): Pipeline state; sets ``usecase``.
+        config (dict): Pipeline configuration.
+    """
+    from alg3.alg3 import filter_dynamic_workflow
+
+    system = state['system']
+    workflow_path = _path(config, 'workflow')
+    if workflow_path:
+        state['usecase'] = filter_dynamic_workflow(system, _load_json(workflow_path))
+    else:
+        state['usecase'] = {'microsystems': system['microsystems'], 'interactions': system['interactions']}
+
+
+def stage_cluster(state, config):
+    """
+    Algorithm 4: build the interaction matrix, cluster it and assign phases.
+
+    Args:
+        state (dict): Pipeline state; sets ``labels`` and the ``cluster`` of
+            every system microsystem.
+        config (dict): Pipeline configuration.
+    """
+    from alg4.alg4 import (assign_phases, cluster_interactions, create_interaction_matrix,
+                           create_weighted_interaction_matrix, symmetrize_interaction_matrix,
+                           visualize_interaction_matrix)
+
+    system, usecase = state['system'], state['usecase']
+    if config.get('weighted', False):
+        directed_matrix, microsystem_ids = create_weighted_interaction_matrix(
+            system, usecase, service_weights=config.get('service_weights'), sparse=config.get('sparse')
+        )
+        interaction_matrix = symmetrize_interaction_matrix(directed_matrix)
+    else:
+        interaction_matrix, microsystem_ids = create_interaction_matrix(system, usecase, sparse=config.get('sparse'))
+
+    assign_phases(system, config.get('phases', []))
+    labels = cluster_interactions(interaction_matrix, config.get('n_clusters', 3))
+    for microsystem, label in zip(system['microsystems'], labels):
+        microsystem['cluster'] = int(label)
+    state['labels'] = labels
+
+    figure_path = _figure_path(config, 'interaction_matrix')
+    visualize_interaction_matrix(interaction_matrix, labels, microsystem_ids, figure_path=figure_path)
+    state['figures']['interaction_matrix'] = figure_path
+
+
+def stage_cube(state, config):
+    """
+    Algorithm 5: render the 3D RAMI 4.0 cube of the use case.
+
+    Args:
+        state (dict): Pipeline state.
+        config (dict): Pipeline configuration.
+    """
+    from alg5.alg5 import load_visual_config, visualize_3d_rami_cube
+
+    figure_path = _figure_path(config, 'rami_cube')
+    visual_config = load_visual_config(_path(config, 'visual_config'))
+    visualize_3d_rami_cube(state['system'], state['usecase'], visual_config, figure_path=figure_path)
+    state['figures']['rami_cube'] = figure_path
+
+
+def stage_projection(state, config):
+    """
+    Algorithm 6: project the microsystems on a 2D value plane.
+
+    Args:
+        state (dict): Pipeline state; sets ``projection``.
+        config (dict): Pipeline configuration.
+    """
+    from alg6.alg6 import map_to_2d, visualize_value_projection
+
+    figure_path = _figure_path(config, 'value_projection')
+    state['projection'] = map_to_2d(state['system'], _load_json(_path(config, 'value_metrics')))
+    visualize_value_projection(state['projection'], _load_json(_path(config, 'projection_config')),
+                               figure_path=figure_path)
+    state['figures']['value_projection'] = figure_path
+
+
+def stage_integration(state, config):
+    """
+    Algorithm 7: build, annotate and render the integration map.
+
+    Stakeholders are taken from the system components file when configured,
+    otherwise from the ``stakeholder`` of the system microsystems.
+
+    Args:
+        state (dict): Pipeline state; sets ``integration_map``.
+        config (dict): Pipeline configuration.
+    """
+    from alg7.alg7 import annotate_value_metrics, create_integration_map, visualize_integration_map
+
+    components_path = _path(config, 'system_components')
+    if components_path:
+        system_components = _load_json(components_path)
+        index = None
+    else:
+        system_components = {'components': state['system']['microsystems']}
+        index = ModelIndex(state['system']['microsystems'])
+    stakeholder_metrics_path = _path(config, 'stakeholder_metrics')
+    value_metrics = _load_json(stakeholder_metrics_path) if stakeholder_metrics_path else {}
+
+    integration_map = create_integration_map(state['usecase'], value_metrics, system_components,
+                                             config.get('phases', []), config.get('lifecycle_stages', []),
+                                             index=index)
+    state['integration_map'] = annotate_value_metrics(integration_map, value_metrics)
+
+    figure_path = _figure_path(config, 'integration_map')
+    visualize_integration_map(state['integration_map'], figure_path=figure_path)
+    state['figures']['integration_map'] = figure_path
+
+
+# Stages in run order: name, function, configuration keys it needs, configuration
+# keys its cache entry depends on (files by content) and the figure it renders
+STAGES = (
+    ('validate', stage_validate, ('input',), ('input', 'schema'), None),
+    ('map', stage_map, ('mapping_config',), ('mapping_config', 'placement'), None),
+    ('filter', stage_filter, (), ('workflow',), None),
+    ('cluster', stage_cluster, (), ('phases', 'n_clusters', 'weighted', 'sparse', 'service_weights'),
+     'interaction_matrix'),
+    ('cube', stage_cube, ('visual_config',), ('visual_config',), 'rami_cube'),
+    ('projection', stage_projection, ('value_metrics', 'projection_config'),
+     ('value_metrics', 'projection_config'), 'value_projection'),
+    ('integration', stage_integration, (),
+     ('system_components', 'stakeholder_metrics', 'phases', 'lifecycle_stages'), 'integration_map'),
+)
+
+STAGE_NAMES = tuple(stage[0] for stage in STAGES)
+
+# Stages whose state entries each stage reads; a selected stage runs them first
+STAGE_UPSTREAM = {
+    'validate': (),
+    'map': ('validate',),
+    'filter': ('map',),
+    'cluster': ('filter',),
+    'cube': ('filter',),
+    'projection': ('map',),
+    'integration': ('filter',),
+}
+
+# State entries each stage produces, which is what its cache entry holds. The
+# use case shares its microsystems with the system model, which the cluster stage
+# annotates in place, so both are cached together to keep them shared.
+STAGE_OUTPUTS = {
+    'validate': ('model',),
+    'map': ('system', 'unresolved'),
+    'filter': ('system', 'usecase'),
+    'cluster': ('system', 'usecase', 'labels'),
+    'cube': (),
+    'projection': ('projection',),
+    'integration': ('integration_map',),
+}
+
+# Checkpoint name and state entry written after the stages producing a model;
+# the cache keys of later stages build on the key of the last of these
+CHECKPOINTS = {
+    'validate': ('model', 'model'),
+    'map': ('system_mapped', 'system'),
+    'filter': ('usecase', 'usecase'),
+    'cluster': ('clustered', 'system'),
+}
+
+# Configuration values that name input files; their content goes into cache keys
+FILE_KEYS = ('input', 'schema', 'mapping_config', 'workflow', 'visual_config', 'value_metrics',
+             'projection_config', 'stakeholder_metrics', 'system_components')
+
+
+def _with_upstream(selected):
+    """
+    Add the stages that selected stages build on, transitively.
+
+    Args:
+        selected (list): Names of the selected stages.
+
+    Returns:
+        set: The selected stages and all stages upstream of them.
+    """
+    stages = set()
+    pending = list(selected)
+    while pending:
+        name = pending.pop()
+        if name not in stages:
+            stages.add(name)
+            pending.extend(STAGE_UPSTREAM[name])
+    return stages
+
+
+def _stage_key(cache, config, name, upstream_key, inputs, figure):
+    """
+    Build the cache key of a stage from the stage it builds on and its own inputs.
+
+    Args:
+        cache (ramiviz.cache.StageCache): The stage cache.
+        config (dict): Pipeline configuration.
+        name (str): Stage name.
+        upstream_key (str): Key of the last model stage run before this one, or None.
+        inputs (tuple): Configuration keys the stage depends on.
+        figure (str): Figure name of the stage, or None.
+
+    Returns:
+        str: The key.
+    """
+    values = []
+    for key in inputs:
+        path = _path(config, key) if key in FILE_KEYS else None
+        values.append(file_digest(path) if path else config.get(key))
+    figure_path = config.get('figures', {}).get(figure) if figure else None
+    return cache.key(name, upstream_key, values, figure_path)
+
+
+def _open_cache(config):
+    """
+    Open the stage cache configured under ``"cache"``.
+
+    Args:
+        config (dict): Pipeline configuration.
+
+    Returns:
+        ramiviz.cache.StageCache: The cache, or None if caching is not configured.
+    """
+    cache_config = config.get('cache')
+    if not cache_config:
+        return None
+    return StageCache(_resolve(config, cache_config['directory']),
+                      max_bytes=cache_config.get('max_bytes', DEFAULT_MAX_BYTES))
+
+
+def load_pipeline_config(config_path):
+    """
+    Load a pipeline configuration file.
+
+    Args:
+        config_path (str): Path to the JSON configuration.
+
+    Returns:
+        dict: Configuration with ``base_dir`` set to the file's directory.
+    """
+    config = _load_json(config_path)
+    config.setdefault('base_dir', os.path.dirname(os.path.abspath(config_path)))
+    return config
+
+
+def run_pipeline(config):
+    """
+    Run the configured stages of Algorithms 1-7 in memory.
+
+    Args:
+        config (dict): Pipeline configuration (see the module docstring).
+
+    Returns:
+        dict: Pipeline state with the intermediate results (``model``, ``system``,
+            ``usecase``, ``labels``, ``projection``, ``integration_map``), the
+            ``unresolved`` mappings, the written ``figures`` and ``checkpoints``,
+            the seconds spent per stage in ``timings`` and the ``total``, the
+            stages restored from the stage cache in ``cached``, and with
+            ``"trace"`` configured the ``trace`` summary (see ``ramiviz.trace``).
+
+    Raises:
+        ValueError: If a selected stage is unknown or misses its configuration.
+    """
+    selected = config.get('stages')
+    unknown = set(selected or ()) - set(STAGE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown pipeline stages: {sorted(unknown)}; expected some of {list(STAGE_NAMES)}")
+
+    if selected is not None:
+        selected = _with_upstream(selected)
+
+    cache = _open_cache(config)
+    state = {'figures': {}, 'checkpoints': {}, 'timings': {}, 'cached': [], 'keys': {}, 'cache': cache}
+    trace_path = _path(config, 'trace')
+    started_trace = bool(trace_path) and not trace.is_enabled()
+    if started_trace:
+        trace.enable(memory=config.get('trace_memory', False))
+    try:
+        start = time.perf_counter()
+        _run_stages(state, config, cache, selected)
+        state['total'] = time.perf_counter() - start
+    finally:
+        # The trace is written even if a stage fails
+        if trace_path and trace.is_enabled():
+            trace.write_trace(trace_path)
+            state['trace'] = trace.recorder().summary()
+        if started_trace:
+            trace.disable()
+    return state
+
+
+def _run_stages(state, config, cache, selected):
+    """
+    Run (or restore from the cache) every configured stage in order.
+
+    Args:
+        state (dict): Pipeline state, updated in place.
+        config (dict): Pipeline configuration.
+        cache (ramiviz.cache.StageCache): The stage cache, or None.
+        selected (set): Names of the stages to run, with their upstream stages, or None for all.
+
+    Raises:
+        ValueError: If a selected stage misses its configuration.
+    """
+    upstream_key = None
+    for name, stage, required, inputs, figure in STAGES:
+        missing = [key for key in required if config.get(key) is None]
+        if selected is not None and name not in selected:
+            continue
+        if missing:
+            if selected is not None:
+                raise ValueError(f"Stage '{name}' needs {', '.join(missing)} in the pipeline configuration.")
+            continue
+        with trace.span(f"pipeline.{name}") as stage_span:
+            stage_start = time.perf_counter()
+
+            # Every key chains the inputs of the stages before it. Figures shown on
+            # screen are never cached, so those stages always run, but their key is
+            # still what later stages build on.
+            key = None
+            if cache is not None:
+                key = _stage_key(cache, config, name, upstream_key, inputs, figure)
+                state['keys'][name] = key
+            cacheable = key is not None and (figure is None or _figure_path(config, figure))
+            entry = cache.get(key) if cacheable else None
+            if entry is not None:
+                state.update(entry['state'])
+                for figure_name, (figure_path, content) in entry['figures'].items():
+                    with open(figure_path, 'wb') as file:
+                        file.write(content)
+                    state['figures'][figure_name] = figure_path
+                state['cached'].append(name)
+                stage_span.set(cached=True)
+            else:
+                figures_before = dict(state['figures'])
+                stage(state, config)
+                if cacheable:
+                    figures = {}
+                    for figure_name, figure_path in state['figures'].items():
+                        if figure_path and figures_before.get(figure_name) != figure_path:
+                            with open(figure_path, 'rb') as file:
+                                figures[figure_name] = (figure_path, file.read())
+                    cache.put(key, {'state': {output: state[output] for output in STAGE_OUTPUTS[name]},
+                                    'figures': figures})
+            _write_checkpoint(state, config, name)
+            if name in CHECKPOINTS:
+                upstream_key = key
+            state['timings'][name] = time.perf_counter() - stage_start
+
+
+def main(config_path):
+    """
+    Run the pipeline described by a configuration file and report the timings.
+
+    Args:
+        config_path (str): Path to the JSON configuration.
+    """
+    from ramiviz.render import use_headless_backend
+
+    config = load_pipeline_config(config_path)
+    if config.get('figures'):
+        use_headless_backend()
+    state = run_pipeline(config)
+
+    for name, seconds in state['timings'].items():
+        print(f"{name:<12} {seconds:8.3f} s{' (cached)' if name in state['cached'] else ''}")
+    print(f"{'total':<12} {state['total']:8.3f} s")
+    if state['cached']:
+        print(f"Reused cached stages: {', '.join(state['cached'])}")
+    if state.get('unresolved'):
+        print(f"{len(state['unresolved'])} microsystem axes matched no mapping rule.")
+    if config.get('trace'):
+        print(f"Trace written to {_path(config, 'trace')}")
+
+
+if __name__ == "__main__":
+    config_path = sys.argv[1] if len(sys.argv) > 1 else "pipeline_config.json"  # Replace with actual path
+    main(config_path)
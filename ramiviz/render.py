@@ -0,0 +1,97 @@
+"""
+Figure creation and output for the RAMI 4.0 visualizations.
+
+Figures are shown interactively by default. When a figure path is given they
+are built on a plain Matplotlib ``Figure`` (no pyplot, no GUI backend) and
+written to that path instead, so rendering works on machines without a display
+and in parallel worker processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def use_headless_backend():
+    """
+    Select Matplotlib's non-interactive Agg backend for this process.
+
+    Call it before pyplot creates any figure, e.g. at the start of a batch job
+    or worker process.
+    """
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+
+def create_figure(figsize, headless=False):
+    """
+    Create a Matplotlib figure.
+
+    Args:
+        figsize (tuple): Figure size in inches.
+        headless (bool): Create a standalone ``Figure`` that is not managed by
+            pyplot and needs no GUI backend.
+
+    Returns:
+        matplotlib.figure.Figure: The new figure.
+    """
+    if headless:
+        from matplotlib.figure import Figure
+        return Figure(figsize=figsize)
+
+    import matplotlib.pyplot as plt
+    return plt.figure(figsize=figsize)
+
+
+def finish_figure(fig, figure_path=None):
+    """
+    Write a figure to a file, or show it when no path is given.
+
+    Matplotlib figures are saved in the format given by the file extension
+    (e.g. PNG, SVG, PDF). Plotly figures are written as HTML for ``.html`` paths
+    and as images otherwise (which requires the ``kaleido`` package).
+
+    Args:
+        fig (matplotlib.figure.Figure or plotly.graph_objects.Figure): Figure to output.
+        figure_path (str, optional): Output file path.
+
+    Returns:
+        The figure.
+    """
+    is_plotly = hasattr(fig, "write_html")
+
+    if figure_path is None:
+        if is_plotly:
+            fig.show()
+        else:
+            import matplotlib.pyplot as plt
+            plt.show()
+        return fig
+
+    if is_plotly:
+        if os.path.splitext(figure_path)[1].lower() in (".html", ".htm"):
+            fig.write_html(figure_path)
+        else:
+            fig.write_image(figure_path)
+    else:
+        fig.savefig(figure_path, bbox_inches="tight")
+    return fig
+
+
+def render_in_processes(render_function, jobs, processes=None):
+    """
+    Render many figures in parallel worker processes.
+
+    Every worker selects the headless backend before rendering. The render
+    function must be importable by the workers (defined at module level) and
+    write its figure to a path given in its arguments.
+
+    Args:
+        render_function (callable): Function rendering one figure.
+        jobs (list): Argument tuples, one per figure.
+        processes (int, optional): Number of worker processes (default: CPU count).
+
+    Returns:
+        list: Results of ``render_function`` in the order of ``jobs``.
+    """
+    with ProcessPoolExecutor(max_workers=processes, initializer=use_headless_backend) as pool:
+        futures = [pool.submit(render_function, *args) for args in jobs]
+        return [future.result() for future in futures]
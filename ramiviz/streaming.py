@@ -0,0 +1,374 @@
+"""
+Streaming reading and writing of large system models.
+
+System models are JSON documents with ``microsystems`` and ``interactions``
+arrays, or bare arrays such as the mapped data written by alg2. The readers here
+yield the items of one array at a time, so memory is bounded by the largest item
+(plus whatever the caller keeps) rather than by the model size. ``ijson`` is used
+when it is installed; otherwise a chunked ``json.JSONDecoder.raw_decode`` scanner
+does the same with the standard library.
+
+JSON Lines files (``.jsonl`` / ``.ndjson``) hold one item per line. A model with
+several arrays tags each line with its array name, e.g.
+``{"microsystems": {"id": "M1", ...}}``; untagged lines belong to every array,
+like the items of a bare JSON array.
+"""
+import json
+import os
+import re
+import textwrap
+
+try:
+    import ijson
+except ImportError:  # optional, the standard library scanner is used instead
+    ijson = None
+
+# Top-level arrays of a system model
+MODEL_ARRAYS = ("microsystems", "interactions")
+
+JSON_LINES_SUFFIXES = (".jsonl", ".ndjson")
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_NUMBER_END = re.compile(r"[,\]}\s]")
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+
+def is_json_lines(path):
+    """
+    Check whether a path names a JSON Lines file.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        bool: True for ``.jsonl`` and ``.ndjson`` files.
+    """
+    return os.path.splitext(str(path))[1].lower() in JSON_LINES_SUFFIXES
+
+
+class _ArrayScanner:
+    """
+    Incremental reader for the top-level arrays of one JSON document.
+
+    Args:
+        file (io.TextIOBase): Text file positioned at the start of the document.
+        chunk_size (int): Characters read at a time.
+    """
+
+    def __init__(self, file, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # Drop what has been consumed; read at least as much as is buffered so
+        # a large item is completed in a logarithmic number of retries
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+
+    def _peek(self):
+        # Skip whitespace and return the next character ('' at the end of the file)
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._fill()
+
+    def _expect(self, characters):
+        character = self._peek()
+        if not character or character not in characters:
+            found = repr(character) if character else "end of file"
+            raise ValueError(f"Expected one of {characters!r} in JSON document, found {found}")
+        self.pos += 1
+        return character
+
+    def _decode(self):
+        # A number cut off by the end of the buffer ("2." of "2.5") still
+        # decodes, so numbers are only decoded once their delimiter is buffered
+        if self.buffer[self.pos] in "-0123456789":
+            while not self.eof and not _NUMBER_END.search(self.buffer, self.pos):
+                self._fill()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # Strings, arrays and objects are complete once decoded; a number
+            # may continue in the next chunk
+            if end == len(self.buffer) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def _items(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            self._peek()
+            yield self._decode()
+            if self._expect(",]") == "]":
+                return
+
+    def items(self, key=None):
+        """
+        Yield the items of the array under ``key`` (or of a bare array).
+
+        Args:
+            key (str, optional): Name of a top-level array of a JSON object.
+
+        Yields:
+            object: The decoded items, one at a time.
+        """
+        if self._peek() == "[":
+            yield from self._items()
+            return
+
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            self._peek()
+            name = self._decode()
+            self._expect(":")
+            if name == key:
+                yield from self._items()
+                return
+            if self._peek() == "[":
+                # Skip other arrays item by item instead of decoding them whole
+                for _ in self._items():
+                    pass
+            else:
+                self._decode()
+            if self._expect(",}") == "}":
+                return
+
+
+def _first_character(path):
+    with open(path, "r") as file:
+        while True:
+            character = file.read(1)
+            if not character or not character.isspace():
+                return character
+
+
+def _iter_json_lines(path, key):
+    with open(path, "r") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict) and len(record) == 1:
+                name = next(iter(record))
+                if name == key:
+                    yield record[name]
+                    continue
+                if name in MODEL_ARRAYS:
+                    continue
+            yield record
+
+
+def iter_items(path, key=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Iterate over the items of one array of a JSON or JSON Lines file.
+
+    Args:
+        path (str): Path to the model file.
+        key (str, optional): Name of the top-level array, e.g. ``"microsystems"``.
+            Ignored when the document is a bare array. Yields nothing when the
+            document is an object without this key.
+        chunk_size (int): Characters read at a time by the standard library scanner.
+
+    Yields:
+        object: The decoded items, one at a time.
+
+    Raises:
+        ValueError: If the document is not a JSON array or object (or is malformed).
+    """
+    if is_json_lines(path):
+        yield from _iter_json_lines(path, key)
+        return
+
+    if ijson is not None:
+        prefix = "item" if _first_character(path) == "[" else f"{key}.item"
+        with open(path, "rb") as file:
+            yield from ijson.items(file, prefix, use_float=True)
+        return
+
+    with open(path, "r") as file:
+        yield from _ArrayScanner(file, chunk_size).items(key)
+
+
+def iter_microsystems(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Iterate over the microsystems of a model file (see ``iter_items``).
+
+    Args:
+        path (str): Path to the model file.
+        chunk_size (int): Characters read at a time.
+
+    Yields:
+        dict: One microsystem at a time.
+    """
+    return iter_items(path, "microsystems", chunk_size)
+
+
+def iter_interactions(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Iterate over the interactions of a model file (see ``iter_items``).
+
+    Args:
+        path (str): Path to the model file.
+        chunk_size (int): Characters read at a time.
+
+    Yields:
+        dict: One interaction at a time.
+    """
+    return iter_items(path, "interactions", chunk_size)
+
+
+def batched(items, batch_size):
+    """
+    Group an iterable into lists of at most ``batch_size`` items.
+
+    Args:
+        items (iterable): Items to group.
+        batch_size (int): Maximum number of items per batch.
+
+    Yields:
+        list: The next batch.
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_model(path):
+    """
+    Load a whole JSON or JSON Lines model file.
+
+    Args:
+        path (str): Path to the model file.
+
+    Returns:
+        dict or list: The JSON document. A JSON Lines model with tagged lines is
+        returned as a dict of arrays, one with untagged lines as a list.
+    """
+    if not is_json_lines(path):
+        with open(path, "r") as file:
+            return json.load(file)
+
+    arrays = {}
+    untagged = []
+    with open(path, "r") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict) and len(record) == 1 and next(iter(record)) in MODEL_ARRAYS:
+                name, item = next(iter(record.items()))
+                arrays.setdefault(name, []).append(item)
+            else:
+                untagged.append(record)
+    if not arrays:
+        return untagged
+    for name in arrays:
+        arrays[name].extend(untagged)
+    return arrays
+
+
+def _write_array(file, items, indent, depth):
+    # Writes exactly what json.dump writes for a list at this nesting depth
+    count = 0
+    if indent is None:
+        file.write("[")
+        for count, item in enumerate(items, 1):
+            file.write((", " if count > 1 else "") + json.dumps(item))
+        file.write("]")
+        return count
+
+    prefix = " " * (indent * depth)
+    file.write("[")
+    for count, item in enumerate(items, 1):
+        file.write(",\n" if count > 1 else "\n")
+        file.write(textwrap.indent(json.dumps(item, indent=indent), prefix, lambda line: True))
+    if count:
+        file.write("\n" + " " * (indent * (depth - 1)))
+    file.write("]")
+    return count
+
+
+def write_items(path, items, indent=None):
+    """
+    Write items one at a time as a bare JSON array or as JSON Lines.
+
+    The JSON output is identical to ``json.dump(list(items), file, indent=indent)``
+    without holding the list in memory.
+
+    Args:
+        path (str): Output path; ``.jsonl`` / ``.ndjson`` writes one item per line.
+        items (iterable): Items to write.
+        indent (int, optional): JSON indentation; None writes compact JSON.
+
+    Returns:
+        int: Number of items written.
+    """
+    with open(path, "w") as file:
+        if not is_json_lines(path):
+            return _write_array(file, items, indent, depth=1)
+        count = 0
+        for count, item in enumerate(items, 1):
+            file.write(json.dumps(item) + "\n")
+        return count
+
+
+def write_model(path, arrays, indent=None):
+    """
+    Write named arrays one item at a time as a JSON object or tagged JSON Lines.
+
+    The JSON output is identical to ``json.dump`` of the same object with lists.
+
+    Args:
+        path (str): Output path; ``.jsonl`` / ``.ndjson`` writes one tagged item
+            per line.
+        arrays (dict): Array name (e.g. ``"microsystems"``) to iterable of items.
+        indent (int, optional): JSON indentation; None writes compact JSON.
+
+    Returns:
+        dict: Number of items written per array.
+    """
+    counts = {}
+    with open(path, "w") as file:
+        if is_json_lines(path):
+            for name, items in arrays.items():
+                counts[name] = 0
+                for counts[name], item in enumerate(items, 1):
+                    file.write(json.dumps({name: item}) + "\n")
+            return counts
+
+        if not arrays:
+            file.write("{}")
+            return counts
+        separator = ", " if indent is None else ",\n" + " " * indent
+        file.write("{" if indent is None else "{\n" + " " * indent)
+        for k, (name, items) in enumerate(arrays.items()):
+            file.write((separator if k else "") + json.dumps(name) + ": ")
+            counts[name] = _write_array(file, items, indent, depth=2)
+        file.write("}" if indent is None else "\n}")
+    return counts
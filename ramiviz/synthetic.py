@@ -0,0 +1,321 @@
+"""
+Seeded generator of synthetic SHP-like models for benchmarks.
+
+``generate_dataset`` builds every input of Algorithms 2-7 for a model of any
+size: microsystems with types, roles, services, stakeholders and layers like
+the SHP system model, interactions from providers to consumers of a service,
+a workflow, a mapping configuration matching every microsystem, and value
+metrics. The same seed and size always give the same dataset.
+``write_dataset`` stores it as files together with a pipeline configuration
+(see ``ramiviz.pipeline``), and optionally the model as DSL text, the input of
+Algorithm 1.
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from ramiviz.dsl import write_dsl
+from ramiviz.streaming import write_model
+
+# Named model sizes (number of microsystems)
+SIZES = {"1k": 1000, "10k": 10000, "100k": 100000, "1m": 1000000}
+
+# Microsystem types of the SHP system model; each maps to one hierarchy level
+TYPES = (
+    "Product Design Microsystem", "Smart Contract Proxy Microsystem", "Smart Workflow Management Microsystem",
+    "Inventory Management Microsystem", "Production Line Microsystem", "Logistic Robot Microsystem",
+    "Human/Worker Aide Microsystem", "Smart Energy Management Microsystem", "Production Information Microsystem",
+    "Quality Control Microsystem", "Predictive Maintenance Microsystem", "Customer Portal Microsystem",
+)
+
+# Roles of the SHP system model; each maps to one architecture layer
+ROLES = (
+    "Design", "Contract Management", "Workflow Management", "Inventory Management", "Production", "Logistics",
+    "Assistance", "Energy Optimization", "Information Management", "Quality Assurance", "Maintenance",
+    "Customer Service",
+)
+
+LAYERS = ("Asset Layer", "Integration Layer", "Communication Layer", "Information Layer", "Functional Layer",
+          "Business Layer")
+
+PHASES = ["Requirements", "Functional Design", "Procurement & Engineering", "Deployment & Commissioning",
+          "Operation & Management"]
+
+LIFECYCLE_STAGES = ["Development", "Production", "Maintenance"]
+
+# Number of cells along the hierarchy (X), lifecycle (Y) and layer (Z) axes
+AXIS_CELLS = (7, 4, 6)
+
+STAKEHOLDER_COLORS = ("red", "green", "blue", "yellow", "orange", "purple", "cyan", "brown")
+
+
+def size_of(size):
+    """
+    Resolve a model size given by name (``"10k"``) or number.
+
+    Args:
+        size (str or int): Key of SIZES or a number of microsystems.
+
+    Returns:
+        int: Number of microsystems.
+
+    Raises:
+        ValueError: If the size is neither a known name nor a positive number.
+    """
+    if isinstance(size, str) and size.lower() in SIZES:
+        return SIZES[size.lower()]
+    try:
+        n_microsystems = int(size)
+    except (TypeError, ValueError):
+        raise ValueError(f"Unknown model size {size!r}; use one of {', '.join(SIZES)} or a number") from None
+    if n_microsystems <= 0:
+        raise ValueError(f"Model size must be positive, got {n_microsystems}")
+    return n_microsystems
+
+
+def _mapping_rules(services, n_lifecycle_rules):
+    """
+    Build a mapping configuration with rules for every type, role and some services.
+
+    Each axis ends with a catch-all rule, so no microsystem is left unresolved.
+
+    Args:
+        services (list): Service names.
+        n_lifecycle_rules (int): Number of services with a lifecycle rule.
+
+    Returns:
+        dict: Mapping configuration with ``hierarchy_rules``, ``lifecycle_rules``
+            and ``layer_rules``.
+    """
+    def cell(axis, k, variable):
+        lower = k % AXIS_CELLS[axis]
+        return f"{lower} <= {variable} < {lower + 1}"
+
+    return {
+        "hierarchy_rules": [{"conditions": {"type": name}, "mapping": cell(0, k, "x")}
+                            for k, name in enumerate(TYPES)] + [{"conditions": {}, "mapping": "0 <= x < 1"}],
+        "lifecycle_rules": [{"conditions": {"provides": service}, "mapping": cell(1, k, "y")}
+                            for k, service in enumerate(services[:n_lifecycle_rules])]
+                           + [{"conditions": {}, "mapping": "0 <= y < 1"}],
+        "layer_rules": [{"conditions": {"role": name}, "mapping": cell(2, k, "z")}
+                        for k, name in enumerate(ROLES)] + [{"conditions": {}, "mapping": "0 <= z < 1"}],
+    }
+
+
+def _distinct_pairs(rng, n, n_values):
+    """
+    Draw n pairs of distinct values from ``range(n_values)``.
+
+    Args:
+        rng (np.random.Generator): Random generator.
+        n (int): Number of pairs.
+        n_values (int): Number of values, at least 2.
+
+    Returns:
+        np.ndarray: Pairs of shape (n, 2).
+    """
+    first = rng.integers(n_values, size=n)
+    second = (first + 1 + rng.integers(n_values - 1, size=n)) % n_values
+    return np.column_stack([first, second])
+
+
+def generate_dataset(size, seed=0, n_stakeholders=None, n_services=None, n_steps=None,
+                     interactions_per_microsystem=2, services_per_step=3, interactions_per_step=20):
+    """
+    Generate a synthetic SHP-like model with all inputs of Algorithms 2-7.
+
+    Every microsystem provides and consumes two services. Every interaction
+    carries one service from one of its providers to one of its consumers,
+    and every workflow step selects some services and the interactions
+    carrying them.
+
+    Args:
+        size (str or int): Number of microsystems, or a key of SIZES.
+        seed (int): Seed of the random generator.
+        n_stakeholders (int, optional): Number of stakeholders; grows with the
+            model by default (4 for 1k, 100 for 1M).
+        n_services (int, optional): Number of distinct services; one per 20
+            microsystems by default.
+        n_steps (int, optional): Number of workflow steps; one per 100
+            microsystems by default.
+        interactions_per_microsystem (float): Model interactions per microsystem.
+        services_per_step (int): Services selected by each workflow step.
+        interactions_per_step (int): Maximum interactions of each workflow step.
+
+    Returns:
+        dict: ``model`` (microsystems and interactions), ``mapping_config``,
+            ``workflow``, ``value_metrics`` (per microsystem, alg6),
+            ``stakeholder_metrics`` (per stakeholder and column, alg7),
+            ``system_components``, ``visual_config``, ``projection_config``,
+            ``phases`` and ``lifecycle_stages``.
+    """
+    n = size_of(size)
+    rng = np.random.default_rng(seed)
+    if n_stakeholders is None:
+        n_stakeholders = max(4, n // 10000)
+    if n_services is None:
+        n_services = max(50, n // 20)
+    if n_steps is None:
+        n_steps = max(10, n // 100)
+
+    stakeholders = [f"Stakeholder-{k + 1}" for k in range(n_stakeholders)]
+    services = [f"Service {k}" for k in range(n_services)]
+    ids = [f"MS{i}" for i in range(n)]
+
+    # Draw every attribute as an array first; building the dicts is the only per-item Python work
+    types = rng.integers(len(TYPES), size=n).tolist()
+    roles = rng.integers(len(ROLES), size=n).tolist()
+    layers = rng.integers(len(LAYERS), size=n).tolist()
+    owners = rng.integers(n_stakeholders, size=n).tolist()
+    provides = _distinct_pairs(rng, n, n_services)
+    consumes = _distinct_pairs(rng, n, n_services)
+    involvement = (rng.random((n, len(PHASES))) < 0.4).tolist()
+
+    microsystems = [
+        {
+            "id": ids[i],
+            "type": TYPES[types[i]],
+            "role": ROLES[roles[i]],
+            "asset": f"Asset {i}",
+            "shell": f"Shell {i}",
+            "provides": [services[s] for s in provided],
+            "consumes": [services[s] for s in consumed],
+            "stakeholder": stakeholders[owners[i]],
+            "layers": [LAYERS[layers[i]]],
+            "involvement": [phase for phase, involved in zip(PHASES, involvement[i]) if involved],
+        }
+        for i, (provided, consumed) in enumerate(zip(provides.tolist(), consumes.tolist()))
+    ]
+
+    # Interactions from a provider to a consumer of the same service
+    microsystem_rows = np.repeat(np.arange(n), 2)
+    provider_order = np.argsort(provides.ravel(), kind='stable')
+    consumer_order = np.argsort(consumes.ravel(), kind='stable')
+    provider_start = np.searchsorted(provides.ravel()[provider_order], np.arange(n_services + 1))
+    consumer_start = np.searchsorted(consumes.ravel()[consumer_order], np.arange(n_services + 1))
+    connected = np.flatnonzero((np.diff(provider_start) > 0) & (np.diff(consumer_start) > 0))
+
+    n_interactions = int(n * interactions_per_microsystem) if len(connected) else 0
+    carried = connected[rng.integers(len(connected), size=n_interactions)] if n_interactions else np.zeros(0, int)
+    provider_count = (provider_start[carried + 1] - provider_start[carried])
+    consumer_count = (consumer_start[carried + 1] - consumer_start[carried])
+    sources = microsystem_rows[provider_order[provider_start[carried]
+                                              + (rng.random(n_interactions) * provider_count).astype(np.intp)]]
+    targets = microsystem_rows[consumer_order[consumer_start[carried]
+                                              + (rng.random(n_interactions) * consumer_count).astype(np.intp)]]
+    interactions = [
+        {"source_id": ids[source], "target_id": ids[target], "services": [services[service]]}
+        for source, target, service in zip(sources.tolist(), targets.tolist(), carried.tolist())
+    ]
+
+    # Workflow steps select services and (some of) the interactions carrying them
+    interaction_order = np.argsort(carried, kind='stable')
+    interaction_start = np.searchsorted(carried[interaction_order], np.arange(n_services + 1))
+    steps = []
+    for step in range(n_steps):
+        step_services = rng.choice(n_services, size=min(services_per_step, n_services), replace=False)
+        selected = np.concatenate(
+            [interaction_order[interaction_start[s]:interaction_start[s + 1]] for s in step_services]
+        )
+        if len(selected) > interactions_per_step:
+            selected = rng.choice(selected, size=interactions_per_step, replace=False)
+        steps.append({
+            "step_id": f"Step{step}",
+            "services": [services[s] for s in step_services.tolist()],
+            "interactions": [interactions[k] for k in np.sort(selected).tolist()],
+        })
+
+    metrics = rng.integers(0, 100, size=(n, 3)).tolist()
+    columns = PHASES + LIFECYCLE_STAGES
+    stakeholder_metrics = rng.integers(0, 10, size=(n_stakeholders, len(columns))).tolist()
+
+    return {
+        "model": {"microsystems": microsystems, "interactions": interactions},
+        "mapping_config": _mapping_rules(services, min(n_services, 100)),
+        "workflow": {"steps": steps},
+        "value_metrics": {
+            ids[i]: {"profit": profit, "cost": cost, "environmental_impact": impact}
+            for i, (profit, cost, impact) in enumerate(metrics)
+        },
+        "stakeholder_metrics": {
+            stakeholder: dict(zip(columns, values)) for stakeholder, values in zip(stakeholders, stakeholder_metrics)
+        },
+        "system_components": {
+            "components": [{"id": m["id"], "stakeholder": m["stakeholder"]} for m in microsystems]
+        },
+        "visual_config": {
+            "x_limits": [0, AXIS_CELLS[0]],
+            "y_limits": [0, AXIS_CELLS[1]],
+            "z_limits": [0, AXIS_CELLS[2]],
+            "ellipsoid_radii": [0.2, 0.1, 0.3],
+            "stakeholder_colors": {
+                stakeholder: STAKEHOLDER_COLORS[k % len(STAKEHOLDER_COLORS)] for k, stakeholder in enumerate(stakeholders)
+            },
+        },
+        "projection_config": {"x_limits": [0, AXIS_CELLS[0]], "y_limits": [0, AXIS_CELLS[1]]},
+        "phases": list(PHASES),
+        "lifecycle_stages": list(LIFECYCLE_STAGES),
+    }
+
+
+# Dataset entries written by write_dataset and their file names
+DATASET_FILES = {
+    "model": "model.json",
+    "mapping_config": "mapping_config.json",
+    "workflow": "workflow.json",
+    "value_metrics": "value_metrics.json",
+    "stakeholder_metrics": "stakeholder_metrics.json",
+    "system_components": "system_components.json",
+    "visual_config": "visual_config.json",
+    "projection_config": "projection_config.json",
+}
+
+# File name of the model as DSL text (see write_dataset)
+DSL_FILE = "model.dsl"
+
+
+def write_dataset(dataset, directory, n_clusters=3, dsl=False):
+    """
+    Write a generated dataset and a pipeline configuration running on it.
+
+    Args:
+        dataset (dict): Output of ``generate_dataset``.
+        directory (str): Output directory, created if needed.
+        n_clusters (int): Number of clusters in the pipeline configuration.
+        dsl (bool): Also write the model as DSL text (``model.dsl``); the
+            configuration then reads it as its input, so the pipeline runs
+            Algorithm 1 on it.
+
+    Returns:
+        str: Path of the pipeline configuration (``pipeline.json``).
+    """
+    os.makedirs(directory, exist_ok=True)
+    for key, name in DATASET_FILES.items():
+        path = os.path.join(directory, name)
+        if key == "model":
+            write_model(path, dataset[key])
+        else:
+            with open(path, 'w') as file:
+                json.dump(dataset[key], file)
+
+    config = {"input" if key == "model" else key: name for key, name in DATASET_FILES.items()}
+    if dsl:
+        write_dsl(os.path.join(directory, DSL_FILE), dataset["model"])
+        config["input"] = DSL_FILE
+    config.update({
+        "phases": dataset["phases"],
+        "lifecycle_stages": dataset["lifecycle_stages"],
+        "n_clusters": n_clusters,
+        "figures": {name: os.path.join("out", f"{name}.png")
+                    for name in ("interaction_matrix", "rami_cube", "value_projection", "integration_map")},
+    })
+    config_path = os.path.join(directory, "pipeline.json")
+    with open(config_path, 'w') as file:
+        json.dump(config, file, indent=4)
+    return config_path
@@ -0,0 +1,368 @@
+"""
+Lightweight instrumentation of the algorithm stages: timing spans, memory
+deltas and counters, exported as a Chrome trace.
+
+Tracing is off by default. ``span`` then returns a shared no-op context,
+and ``count`` and functions decorated with ``traced`` cost a single check,
+so the instrumentation stays in the code of Algorithms 1-7. Switch it on with
+``enable()``, the ``"trace"`` entry of a pipeline configuration, or the
+``RAMIVIZ_TRACE`` environment variable:
+
+    RAMIVIZ_TRACE=trace.json python alg2/alg2.py
+
+The trace file opens in chrome://tracing or https://ui.perfetto.dev. Every span
+records its duration, the growth of the process's peak resident memory and
+the counters reported inside it (including nested spans). With
+``enable(memory=True)`` (or ``RAMIVIZ_TRACE_MEMORY=1``) the peak of the memory
+allocated inside each span is traced with ``tracemalloc``, which is exact but
+slows allocation-heavy code down.
+
+Spans are recorded per thread; work done in worker processes is not recorded.
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# The active recorder, or None while tracing is off
+_RECORDER = None
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def _max_rss():
+    """
+    Get the peak resident memory of this process.
+
+    Returns:
+        int: Peak resident set size in bytes, or 0 where it is not available.
+    """
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+
+class _NullSpan:
+    """
+    Span used while tracing is off; does nothing.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Timed region of a trace, used as a context manager (see ``span``).
+
+    Args:
+        recorder (TraceRecorder): Recorder the span belongs to.
+        name (str): Span name, e.g. ``alg2.map_to_rami_axes``.
+        args (dict): Extra values shown with the span.
+    """
+
+    def __init__(self, recorder, name, args):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+        self.counters = {}
+        self.peak = 0
+
+    def set(self, **args):
+        """
+        Attach extra values to the span, e.g. results only known at its end.
+
+        Args:
+            **args: JSON-serializable values.
+        """
+        self.args.update(args)
+
+    def __enter__(self):
+        self.recorder._open(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is not None:
+            self.args['error'] = exc_info[0].__name__
+        self.recorder._close(self)
+        return False
+
+
+class TraceRecorder:
+    """
+    Collects spans and counters in memory.
+
+    Args:
+        memory (bool): Trace the peak allocated memory of every span with
+            ``tracemalloc``.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.events = []
+        self.counters = {}
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _now(self):
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def _open(self, span):
+        stack = self._stack()
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is reset for the new span; keep what the enclosing span reached so far
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            span.start_memory = span.peak = current
+        span.start_rss = _max_rss()
+        span.start = self._now()
+        stack.append(span)
+
+    def _close(self, span):
+        end = self._now()
+        stack = self._stack()
+        stack.pop()
+        args = dict(span.args, **span.counters)
+        args['max_rss_growth_bytes'] = _max_rss() - span.start_rss
+        if self.memory:
+            span.peak = max(span.peak, tracemalloc.get_traced_memory()[1])
+            args['peak_allocated_bytes'] = span.peak - span.start_memory
+        if stack:
+            parent = stack[-1]
+            parent.peak = max(parent.peak, span.peak)
+            for name, value in span.counters.items():
+                parent.counters[name] = parent.counters.get(name, 0) + value
+
+        self.events.append({"name": span.name, "cat": span.name.split('.')[0], "ph": "X", "ts": span.start,
+                            "dur": end - span.start, "pid": self.pid, "tid": threading.get_ident(), "args": args})
+        for name in span.counters:
+            self.events.append({"name": name, "ph": "C", "ts": end, "pid": self.pid,
+                                "args": {name: self.counters[name]}})
+
+    def span(self, name, args):
+        return Span(self, name, args)
+
+    def count(self, name, value):
+        self.counters[name] = self.counters.get(name, 0) + value
+        stack = self._stack()
+        if stack:
+            counters = stack[-1].counters
+            counters[name] = counters.get(name, 0) + value
+
+    def close(self):
+        """
+        Stop ``tracemalloc`` if this recorder started it.
+        """
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def summary(self):
+        """
+        Aggregate the recorded spans by name.
+
+        Returns:
+            dict: Per span name, the number of ``calls``, the total ``seconds``
+                and the summed counters; the totals of all counters under
+                ``"counters"``.
+        """
+        spans = {}
+        for event in self.events:
+            if event['ph'] != 'X':
+                continue
+            entry = spans.setdefault(event['name'], {"calls": 0, "seconds": 0.0})
+            entry['calls'] += 1
+            entry['seconds'] += event['dur'] / 1e6
+            for name, value in event['args'].items():
+                if name in self.counters:
+                    entry[name] = entry.get(name, 0) + value
+        return {"spans": spans, "counters": dict(self.counters)}
+
+    def chrome_trace(self):
+        """
+        Build the Chrome trace of the recorded spans and counters.
+
+        Returns:
+            dict: Trace in the Chrome trace event format.
+        """
+        return {"traceEvents": list(self.events), "displayTimeUnit": "ms",
+                "otherData": {"counters": dict(self.counters)}}
+
+
+def enable(memory=False):
+    """
+    Start recording spans and counters.
+
+    Args:
+        memory (bool): Trace the peak allocated memory of every span.
+
+    Returns:
+        TraceRecorder: The new recorder.
+    """
+    global _RECORDER
+    if _RECORDER is not None:
+        _RECORDER.close()
+    _RECORDER = TraceRecorder(memory=memory)
+    return _RECORDER
+
+
+def disable():
+    """
+    Stop recording.
+
+    Returns:
+        TraceRecorder: The recorder with everything recorded so far, or None
+            if tracing was off.
+    """
+    global _RECORDER
+    recorder, _RECORDER = _RECORDER, None
+    if recorder is not None:
+        recorder.close()
+    return recorder
+
+
+def is_enabled():
+    """
+    Check whether tracing is on.
+
+    Returns:
+        bool: True while a recorder is active.
+    """
+    return _RECORDER is not None
+
+
+def recorder():
+    """
+    Get the active recorder.
+
+    Returns:
+        TraceRecorder: The recorder, or None while tracing is off.
+    """
+    return _RECORDER
+
+
+def span(name, **args):
+    """
+    Time a region of code.
+
+    Example::
+
+        with span("alg4.cluster", n_clusters=3):
+            ...
+
+    Args:
+        name (str): Span name; the part before the first dot is its category.
+        **args: JSON-serializable values shown with the span.
+
+    Returns:
+        Span: Context manager; a shared no-op one while tracing is off.
+    """
+    if _RECORDER is None:
+        return _NULL_SPAN
+    return _RECORDER.span(name, args)
+
+
+def count(name, value=1):
+    """
+    Add to a counter of the innermost open span (and of the whole trace).
+
+    Args:
+        name (str): Counter name, e.g. ``microsystems_mapped``.
+        value (int): Amount to add.
+    """
+    if _RECORDER is not None:
+        _RECORDER.count(name, value)
+
+
+def traced(function=None, name=None):
+    """
+    Decorate a function so each call is recorded as a span.
+
+    The span is named ``<script>.<function>``, e.g. ``alg2.map_to_rami_axes``,
+    unless ``name`` is given. While tracing is off, the call costs one check.
+
+    Args:
+        function (callable): Function to decorate.
+        name (str, optional): Span name.
+
+    Returns:
+        callable: The decorated function (or a decorator when only ``name`` is given).
+    """
+    if function is None:
+        return functools.partial(traced, name=name)
+    if name is None:
+        script = os.path.splitext(os.path.basename(function.__code__.co_filename))[0]
+        name = f"{script}.{function.__qualname__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _RECORDER is None:
+            return function(*args, **kwargs)
+        with _RECORDER.span(name, {}):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def write_trace(path, trace_recorder=None):
+    """
+    Write the recorded spans and counters as a Chrome trace JSON file.
+
+    Args:
+        path (str): Output path.
+        trace_recorder (TraceRecorder, optional): Recorder to write; the active one by default.
+
+    Returns:
+        str: The path, or None if there is nothing to write.
+    """
+    trace_recorder = trace_recorder or _RECORDER
+    if trace_recorder is None:
+        return None
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(trace_recorder.chrome_trace(), file)
+    return path
+
+
+def _write_at_exit(path, pid):
+    # Worker processes inherit the environment; only the process that enabled tracing writes
+    if os.getpid() == pid and _RECORDER is not None:
+        write_trace(path)
+
+
+if os.environ.get('RAMIVIZ_TRACE') and _RECORDER is None:
+    enable(memory=os.environ.get('RAMIVIZ_TRACE_MEMORY') == '1')
+    atexit.register(_write_at_exit, os.environ['RAMIVIZ_TRACE'], os.getpid())
@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: makes the repository importable and keeps figures off screen.
+"""
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
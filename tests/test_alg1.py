@@ -0,0 +1,103 @@
+"""
+Tests for the validation and conversion of Algorithm 1 (alg1/alg1.py).
+"""
+import json
+import os
+import pickle
+import shutil
+
+import pytest
+
+from alg1 import alg1
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_FILE = os.path.join(REPO_ROOT, 'alg1', 'schem_rami_xsd')
+
+VALID_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<microsystem>
+    <id>microsystem_01</id>
+    <name>Temperature Sensor</name>
+    <description>Measures temperature</description>
+    <type>Field Device</type>
+    <role>data acquisition</role>
+    <asset>Temperature Sensor Module</asset>
+    <shell><capability>provide data</capability></shell>
+    <provides>sensor_data</provides>
+    <consumes>calibration_commands</consumes>
+    <stakeholder_id>stakeholder_001</stakeholder_id>
+    <stakeholder_description>Manufacturer</stakeholder_description>
+</microsystem>
+"""
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    # Valid and invalid XML and DSL; "model" is the stem of two files
+    directory = tmp_path / 'inputs'
+    directory.mkdir()
+    (directory / 'model.xml').write_text(VALID_XML)
+    shutil.copy(os.path.join(REPO_ROOT, 'alg1', 'DSL'), directory / 'model.dsl')
+    (directory / 'broken.xml').write_text(VALID_XML.replace('<name>Temperature Sensor</name>', ''))
+    (directory / 'broken.dsl').write_text('microsystem {\n  role: Design\n}\n')
+    (directory / 'sample.xmi').write_text(VALID_XML)
+    (directory / '.hidden').write_text('ignored')
+    return directory
+
+
+def _by_name(report):
+    return {os.path.basename(entry['input']): entry for entry in report}
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_validate_directory_reports_every_file(input_dir, tmp_path, processes):
+    output_dir = tmp_path / 'out'
+
+    report = alg1.validate_directory(str(input_dir), SCHEMA_FILE, str(output_dir), processes=processes)
+
+    entries = _by_name(report)
+    assert sorted(entries) == ['broken.dsl', 'broken.xml', 'model.dsl', 'model.xml', 'sample.xmi']
+    assert {name: entry['status'] for name, entry in entries.items()} == {
+        'broken.dsl': 'invalid', 'broken.xml': 'invalid', 'model.dsl': 'valid', 'model.xml': 'valid',
+        'sample.xmi': 'valid'}
+    assert entries['broken.dsl']['errors'][0].endswith("string values must be quoted")
+    assert entries['broken.xml']['output'] is None
+    # Inputs sharing a stem keep their extension; the others drop it
+    assert sorted(os.listdir(output_dir)) == ['model.dsl.json', 'model.xml.json', 'sample.json',
+                                              alg1.REPORT_FILE]
+    with open(output_dir / alg1.REPORT_FILE) as file:
+        assert json.load(file) == report
+    with open(output_dir / 'model.dsl.json') as file:
+        assert json.load(file)['microsystems'][0]['id'] == 'microsystem_01'
+
+
+def test_validate_directory_writes_json_lines(input_dir, tmp_path):
+    report = alg1.validate_directory(str(input_dir), SCHEMA_FILE, str(tmp_path / 'out'), output_format='jsonl',
+                                     extensions=('.xmi',))
+
+    assert [entry['output'] for entry in report] == [str(tmp_path / 'out' / 'sample.jsonl')]
+    assert len((tmp_path / 'out' / 'sample.jsonl').read_text().splitlines()) == 1
+    with pytest.raises(ValueError):
+        alg1.validate_directory(str(input_dir), SCHEMA_FILE, str(tmp_path / 'out'), output_format='xml')
+
+
+def test_schema_pickle_must_match_the_schema_file(tmp_path):
+    schema_file = tmp_path / 'schema.xsd'
+    shutil.copy(SCHEMA_FILE, schema_file)
+    cache_dir = tmp_path / 'cache'
+    alg1._SCHEMA_CACHE.clear()
+    alg1.load_schema(str(schema_file), cache_dir=str(cache_dir))
+    (cache_file,) = cache_dir.iterdir()
+
+    # A pickle compiled from another schema is not used, and is replaced
+    with open(cache_file, 'wb') as file:
+        pickle.dump({'digest': 'another schema', 'schema': 'not a schema'}, file)
+    alg1._SCHEMA_CACHE.clear()
+    schema = alg1.load_schema(str(schema_file), cache_dir=str(cache_dir))
+    assert schema.is_valid(VALID_XML)
+
+    # A truncated pickle is compiled again as well
+    cache_file.write_bytes(cache_file.read_bytes()[:20])
+    alg1._SCHEMA_CACHE.clear()
+    assert alg1.load_schema(str(schema_file), cache_dir=str(cache_dir)).is_valid(VALID_XML)
+    with open(cache_file, 'rb') as file:
+        assert pickle.load(file)['schema'].is_valid(VALID_XML)
@@ -0,0 +1,173 @@
+"""
+Tests for the RAMI 4.0 axis mapping of Algorithm 2 (alg2/alg2.py).
+"""
+import difflib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from alg2.alg2 import (AXIS_RULES, CompiledRules, Interval, axis_rules, load_mapping_configuration,
+                       map_to_axis, map_to_rami_axes, parse_range, place_coordinates, resolve_main)
+from ramiviz.synthetic import generate_dataset
+
+SHIPPED_CONFIG = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) / 'alg2' / 'mapping_config_json'
+
+
+def _random_rules(rng, n_rules):
+    # Conditions on scalar and list attributes, one to three attributes per rule
+    choices = {'type': ['A', 'B', 'C'], 'role': ['r1', 'r2'], 'provides': ['s1', 's2', 's3', ['s1', 's2']]}
+    rules = []
+    for position in range(n_rules):
+        attributes = rng.choice(list(choices), size=rng.integers(1, 4), replace=False)
+        conditions = {attr: choices[attr][rng.integers(len(choices[attr]))] for attr in attributes}
+        rules.append({'conditions': conditions, 'mapping': position})
+    return rules
+
+
+def _random_microsystems(rng, n):
+    return [
+        {'id': f"M{k}", 'type': ['A', 'B', 'C', 'D'][rng.integers(4)], 'role': ['r1', 'r2', 'r3'][rng.integers(3)],
+         'provides': [f"s{s}" for s in sorted(rng.choice(4, size=rng.integers(0, 3), replace=False) + 1)]}
+        for k in range(n)
+    ]
+
+
+def _mapped(ranges):
+    return [{'id': f"M{k}", 'coordinates': dict(zip('XYZ', axes))} for k, axes in enumerate(ranges)]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_compiled_rules_match_the_linear_scan(seed):
+    rng = np.random.default_rng(seed)
+    rules = _random_rules(rng, 12)
+    compiled = CompiledRules(rules)
+
+    for microsystem in _random_microsystems(rng, 200):
+        scanned = []
+        expected = map_to_axis(microsystem, rules, 'X', unresolved=scanned)
+        indexed = []
+        assert map_to_axis(microsystem, compiled, 'X', unresolved=indexed) == expected
+        assert indexed == scanned
+
+
+def test_compiled_rules_keep_the_first_matching_rule():
+    rules = [
+        {'conditions': {'type': 'A', 'role': 'r1'}, 'mapping': 0},
+        {'conditions': {'type': 'A'}, 'mapping': 1},
+        {'conditions': {'provides': 's2'}, 'mapping': 2},
+        {'conditions': {}, 'mapping': 3},
+    ]
+    compiled = CompiledRules(rules)
+
+    assert compiled.match({'type': 'A', 'role': 'r1'}) == 0
+    assert compiled.match({'type': 'A', 'role': 'r2', 'provides': ['s2']}) == 1
+    assert compiled.match({'type': 'B', 'provides': ['s1', 's2']}) == 2
+    assert compiled.match({'type': 'B'}) == 3
+
+
+def test_map_to_rami_axes_matches_the_linear_scan_on_a_synthetic_model():
+    dataset = generate_dataset(300, seed=5)
+    microsystems = dataset['model']['microsystems']
+
+    mapped = map_to_rami_axes(dataset['model'], dataset['mapping_config'], unresolved=[])
+
+    for axis, key in AXIS_RULES:
+        rules = axis_rules(dataset['mapping_config'], key)
+        assert [entry['coordinates'][axis] for entry in mapped] == [
+            map_to_axis(microsystem, rules, axis) for microsystem in microsystems
+        ]
+
+
+@pytest.mark.parametrize('mapping, expected', [
+    ("1 <= x < 2", Interval(1.0, 2.0, True, False)),
+    ("0 < y <= 3.5", Interval(0.0, 3.5, False, True)),
+    ("6 <= x", Interval(6.0, None, True, False)),
+    ("x < 2", Interval(None, 2.0, True, False)),
+    ("z = 4", Interval(4.0, 4.0, True, True)),
+    (3, Interval(3, 3, True, True)),
+    ([0, 2, 1], Interval(0, 2, True, True)),
+])
+def test_parse_range(mapping, expected):
+    assert parse_range(mapping) == expected
+
+
+@pytest.mark.parametrize('mapping', ["x", "between 1 and 2", True, [], ["a"], None])
+def test_parse_range_rejects_unsupported_values(mapping):
+    with pytest.raises(ValueError):
+        parse_range(mapping)
+
+
+def test_interval_contains_respects_open_bounds():
+    interval = parse_range("1 < x <= 2")
+    assert interval.contains([1, 1.5, 2, 2.5]).tolist() == [False, True, True, False]
+
+
+def test_place_coordinates_puts_microsystems_inside_their_ranges():
+    mapped = _mapped([("1 <= x < 2", "0 <= y < 4", "z = 3"), ("6 <= x", None, [0, 2])])
+
+    coordinates = place_coordinates(mapped)
+
+    assert coordinates[0].tolist() == [1.5, 2.0, 3.0]
+    assert coordinates[1, 0] == 6.5
+    assert np.isnan(coordinates[1, 1])
+    assert coordinates[1, 2] == 1.0
+
+
+def test_place_coordinates_accepts_one_position_per_microsystem():
+    mapped = _mapped([("0 <= x < 2", "0 <= y < 4", "0 <= z < 8")] * 2)
+
+    per_microsystem = place_coordinates(mapped, position=np.array([0.0, 0.5]))
+    per_axis = place_coordinates(mapped, position=np.array([[0.0, 0.5, 1.0], [0.25, 0.25, 0.25]]))
+
+    assert per_microsystem.tolist() == [[0.0, 0.0, 0.0], [1.0, 2.0, 4.0]]
+    assert per_axis.tolist() == [[0.0, 2.0, 8.0], [0.5, 1.0, 2.0]]
+
+
+def _resolve(tmp_path, config_text, unresolved):
+    config_path = tmp_path / 'mapping_config.json'
+    unresolved_path = tmp_path / 'unresolved.json'
+    config_path.write_text(config_text)
+    unresolved_path.write_text(json.dumps({'unresolved': unresolved}))
+    resolve_main(str(unresolved_path), str(config_path), prompt=False)
+    return config_path.read_text(), load_mapping_configuration(str(config_path))
+
+
+def test_resolve_keeps_comments_of_commented_configuration(tmp_path):
+    original = SHIPPED_CONFIG.read_text()
+
+    text, mapping_config = _resolve(tmp_path, original, [
+        {'id': 'M1', 'axis': 'X', 'mapping': 3},
+        {'id': 'M2', 'axis': 'Z', 'mapping': None},
+    ])
+
+    assert text.count('//') == original.count('//')
+    removed = [line for line in difflib.ndiff(original.splitlines(), text.splitlines()) if line.startswith('- ')]
+    assert [line[2:].split('//')[0].strip() for line in removed] == ['"usr_rules": []']
+    assert '{"id": "M1", "map_to": 3}' in text
+    assert mapping_config['ext']['hierarchy_rules']['usr_rules'] == [{'conditions': {'id': 'M1'}, 'mapping': 3}]
+
+    # A second answer for the same microsystem replaces the first; a new one is appended
+    text, mapping_config = _resolve(tmp_path, text, [
+        {'id': 'M1', 'axis': 'X', 'mapping': 4},
+        {'id': 'M3', 'axis': 'X', 'mapping': "2 <= x < 3"},
+    ])
+    assert mapping_config['ext']['hierarchy_rules']['usr_rules'] == [
+        {'conditions': {'id': 'M1'}, 'mapping': 4},
+        {'conditions': {'id': 'M3'}, 'mapping': "2 <= x < 3"},
+    ]
+    assert text.count('//') == original.count('//')
+    assert mapping_config['hierarchy_rules'] == load_mapping_configuration(str(SHIPPED_CONFIG))['hierarchy_rules']
+
+
+def test_resolve_adds_missing_user_rule_sections(tmp_path):
+    original = '{\n  "hierarchy_rules": [],  // none yet\n  "lifecycle_rules": [],\n  "layer_rules": []\n}\n'
+
+    text, mapping_config = _resolve(tmp_path, original, [{'id': 'M1', 'axis': 'Y', 'mapping': 2}])
+
+    assert '// none yet' in text
+    assert mapping_config['ext']['lifecycle_rules']['usr_rules'] == [{'conditions': {'id': 'M1'}, 'mapping': 2}]
+    assert mapping_config['hierarchy_rules'] == []
+
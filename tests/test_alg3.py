@@ -0,0 +1,88 @@
+"""
+Tests for the workflow filtering of Algorithm 3 (alg3/alg3.py).
+"""
+import json
+
+import pytest
+
+from alg3 import alg3
+from alg3.alg3 import SystemIndex, filter_dynamic_workflow, filter_workflow_stream, filter_workflows
+
+SYSTEM = {
+    'microsystems': [
+        {'id': 'A', 'provides': ['sense'], 'consumes': []},
+        {'id': 'B', 'provides': 'plan', 'consumes': ['sense']},
+        {'id': 'C', 'provides': ['act'], 'consumes': ['plan']},
+        {'id': 'D', 'provides': ['report']},
+    ],
+    'interactions': [],
+}
+
+WORKFLOWS = [
+    {'steps': [
+        {'services': ['sense'], 'interactions': [{'source_id': 'A', 'target_id': 'B'}]},
+        {'services': ['plan'], 'interactions': [{'source_id': 'B', 'target_id': 'C'},
+                                                {'source_id': 'C', 'target_id': 'D'}]},
+    ]},
+    {'steps': [{'services': ['report', 'unknown'], 'interactions': []}]},
+]
+
+
+def _scan(system_data, workflow_data):
+    # Reference: the linear scan over all microsystems of the original alg3
+    microsystems, interactions = [], []
+    for step in workflow_data['steps']:
+        step_microsystems = [m for m in system_data['microsystems']
+                             if set(alg3.microsystem_services(m)) & set(step['services'])]
+        microsystems.extend(m for m in step_microsystems if m not in microsystems)
+        ids = {m['id'] for m in step_microsystems}
+        interactions.extend(i for i in step['interactions'] if i['source_id'] in ids and i['target_id'] in ids)
+    return microsystems, interactions
+
+
+def test_filter_matches_linear_scan():
+    for workflow_data in WORKFLOWS:
+        usecase = filter_dynamic_workflow(SYSTEM, workflow_data)
+        microsystems, interactions = _scan(SYSTEM, workflow_data)
+        assert usecase['microsystems'] == microsystems
+        assert usecase['interactions'] == interactions
+
+
+def test_filter_with_an_index_without_microsystems():
+    index = SystemIndex(SYSTEM, keep_microsystems=False)
+
+    for workflow in WORKFLOWS:
+        assert filter_dynamic_workflow(SYSTEM, workflow, index=index) == filter_dynamic_workflow(SYSTEM, workflow)
+    with pytest.raises(ValueError, match="index holds 4 microsystems"):
+        filter_dynamic_workflow({'microsystems': SYSTEM['microsystems'][:2]}, WORKFLOWS[0], index=index)
+
+
+def test_batch_and_stream_match_single_workflow(tmp_path):
+    system_path = tmp_path / 'system.json'
+    with open(system_path, 'w') as file:
+        json.dump(SYSTEM, file)
+
+    expected = [filter_dynamic_workflow(SYSTEM, workflow_data) for workflow_data in WORKFLOWS]
+
+    assert filter_workflows(SYSTEM, WORKFLOWS) == expected
+    assert [filter_workflow_stream(str(system_path), workflow_data) for workflow_data in WORKFLOWS] == expected
+
+
+def test_main_batch_in_process_leaves_no_worker_state(tmp_path):
+    system_path = tmp_path / 'system.json'
+    with open(system_path, 'w') as file:
+        json.dump(SYSTEM, file)
+    workflow_paths, output_paths = [], []
+    for k, workflow_data in enumerate(WORKFLOWS):
+        workflow_paths.append(str(tmp_path / f'workflow_{k}.json'))
+        output_paths.append(str(tmp_path / f'usecase_{k}.json'))
+        with open(workflow_paths[-1], 'w') as file:
+            json.dump(workflow_data, file)
+
+    alg3.main_batch(str(system_path), workflow_paths, output_paths)
+
+    assert alg3._worker_system_data is None
+    assert alg3._worker_index is None
+    for output_path, workflow_data in zip(output_paths, WORKFLOWS):
+        with open(output_path) as file:
+            assert json.load(file) == filter_dynamic_workflow(SYSTEM, workflow_data)
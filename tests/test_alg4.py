@@ -0,0 +1,198 @@
+"""
+Tests for the interaction matrices and clustering of Algorithm 4 (alg4/alg4.py).
+"""
+import json
+
+import numpy as np
+import pytest
+
+from alg4 import alg4
+from alg4.alg4 import (create_interaction_matrix, create_weighted_interaction_matrix, index_interactions,
+                       interaction_weights)
+
+
+def _dict_matrix(microsystem_ids, interactions):
+    positions = {microsystem_id: position for position, microsystem_id in enumerate(microsystem_ids)}
+    matrix = np.zeros((len(microsystem_ids), len(microsystem_ids)))
+    for interaction in interactions:
+        source, target = positions.get(interaction['source_id']), positions.get(interaction['target_id'])
+        if source is not None and target is not None:
+            matrix[source, target] = matrix[target, source] = 1
+    return matrix
+
+
+def test_index_interactions_matches_ids_of_any_type():
+    microsystem_ids = [3, 1, 'B', 2.5]
+    interactions = [
+        {'source_id': 1, 'target_id': 3},
+        {'source_id': 'X', 'target_id': 1},
+        {'source_id': 'B', 'target_id': 2.5},
+        {'source_id': None, 'target_id': 3},
+        {'source_id': 3, 'target_id': '3'},
+    ]
+
+    source_idx, target_idx, known = index_interactions(microsystem_ids, interactions)
+
+    assert known.tolist() == [True, False, True, False, False]
+    assert source_idx.tolist() == [1, 2]
+    assert target_idx.tolist() == [0, 3]
+
+
+@pytest.mark.parametrize('microsystem_ids', [[7, 3, 11, 5], ['m7', 'm3', 'm11', 'm5']])
+def test_index_interactions_matches_homogeneous_ids_like_a_dictionary(microsystem_ids):
+    unknown = 4 if isinstance(microsystem_ids[0], int) else 'm4'
+    interactions = [{'source_id': microsystem_ids[s], 'target_id': microsystem_ids[t]}
+                    for s, t in [(0, 1), (3, 2), (1, 1), (2, 0)]]
+    interactions.insert(2, {'source_id': unknown, 'target_id': microsystem_ids[0]})
+    interactions.append({'source_id': microsystem_ids[3], 'target_id': str(unknown) + '0'})
+
+    source_idx, target_idx, known = index_interactions(microsystem_ids, interactions)
+
+    assert known.tolist() == [True, True, False, True, True, False]
+    assert source_idx.tolist() == [0, 3, 1, 2]
+    assert target_idx.tolist() == [1, 2, 1, 0]
+    assert [len(a) for a in index_interactions([], interactions)] == [0, 0, 6]
+    assert [len(a) for a in index_interactions(microsystem_ids, [])] == [0, 0, 0]
+
+
+def test_index_interactions_matches_integer_ids_beyond_64_bits():
+    microsystem_ids = [2 ** 70, 1]
+    interactions = [{'source_id': 1, 'target_id': 2 ** 70}, {'source_id': 2 ** 70, 'target_id': 2}]
+
+    source_idx, target_idx, known = index_interactions(microsystem_ids, interactions)
+
+    assert known.tolist() == [True, False]
+    assert (source_idx.tolist(), target_idx.tolist()) == ([1], [0])
+
+
+def test_interaction_weights_sum_service_weights():
+    interactions = [{'services': ['read', 'write', 'read']}, {'service': 'write'}, {'services': []}, {}]
+
+    assert interaction_weights(interactions).tolist() == [3.0, 1.0, 1.0, 1.0]
+    assert interaction_weights(interactions, {'write': 2.5}).tolist() == [4.5, 2.5, 1.0, 1.0]
+    assert interaction_weights([{}], {'write': 2.5}).tolist() == [1.0]
+    assert interaction_weights([]).tolist() == []
+
+
+def test_integer_ids_with_unknown_string_endpoint_keep_valid_interactions():
+    system_data = {'microsystems': [{'id': i} for i in range(5)]}
+    interactions = [{'source_id': i, 'target_id': (i + 1) % 5} for i in range(5)]
+    usecase_data = {'interactions': interactions + [{'source_id': 'external', 'target_id': 0}]}
+
+    matrix, microsystem_ids = create_interaction_matrix(system_data, usecase_data)
+
+    assert microsystem_ids == list(range(5))
+    assert (matrix == _dict_matrix(microsystem_ids, usecase_data['interactions'])).all()
+    assert matrix.sum() == 10
+
+
+def test_weighted_matrix_sums_services_per_direction():
+    system_data = {'microsystems': [{'id': 'A'}, {'id': 'B'}]}
+    usecase_data = {'interactions': [
+        {'source_id': 'A', 'target_id': 'B', 'services': ['read', 'write']},
+        {'source_id': 'A', 'target_id': 'B', 'service': 'read'},
+        {'source_id': 'B', 'target_id': 'A'},
+    ]}
+
+    dense, _ = create_weighted_interaction_matrix(system_data, usecase_data, service_weights={'write': 2.0})
+    sparse, _ = create_weighted_interaction_matrix(system_data, usecase_data, service_weights={'write': 2.0},
+                                                   sparse=True)
+
+    assert dense.tolist() == [[0.0, 4.0], [1.0, 0.0]]
+    assert (sparse.toarray() == dense).all()
+
+
+def test_main_clusters_binary_adjacency_by_default(tmp_path, monkeypatch):
+    system_data = {'microsystems': [{'id': i, 'involvement': ['Design']} for i in range(6)], 'interactions': []}
+    interactions = [{'source_id': a, 'target_id': b, 'services': ['s'] * (a + 1)}
+                    for a, b in [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 0)]]
+    for name, data in (('system.json', system_data), ('usecase.json', {'interactions': interactions})):
+        with open(tmp_path / name, 'w') as file:
+            json.dump(data, file)
+
+    clustered = []
+    cluster_interactions = alg4.cluster_interactions
+    monkeypatch.setattr(alg4, 'cluster_interactions',
+                        lambda matrix, n_clusters: clustered.append(matrix) or cluster_interactions(matrix, n_clusters))
+    alg4.main(str(tmp_path / 'system.json'), str(tmp_path / 'usecase.json'), ['Design'], 2,
+              str(tmp_path / 'out.json'), figure_path=str(tmp_path / 'matrix.png'))
+
+    assert set(np.unique(clustered[0])) == {0.0, 1.0}
+
+
+def _planted_matrix(n, groups, seed=0):
+    rng = np.random.default_rng(seed)
+    group = rng.integers(0, groups, n)
+    probability = np.where(group[:, None] == group[None, :], 0.1, 0.005)
+    upper = np.triu(rng.random((n, n)) < probability, k=1)
+    return (upper | upper.T).astype(float), group
+
+
+def test_dense_cuts_match_agglomerative_clustering():
+    from sklearn.cluster import AgglomerativeClustering
+    from sklearn.metrics import adjusted_rand_score
+
+    matrix, _ = _planted_matrix(150, 4)
+    alg4._TREE_CACHE.clear()
+    for n_clusters in (2, 4, 9):
+        expected = AgglomerativeClustering(n_clusters=n_clusters, metric='precomputed',
+                                           linkage='average').fit_predict(1 - matrix)
+        labels = alg4.cluster_interactions(matrix, n_clusters)
+        assert len(np.unique(labels)) == n_clusters
+        assert adjusted_rand_score(expected, labels) == 1.0
+
+
+def test_auto_selects_planted_cluster_count():
+    matrix, group = _planted_matrix(300, 4)
+    alg4._TREE_CACHE.clear()
+
+    n_clusters, labels, scores = alg4.cluster_tree(matrix).select(2, 10)
+
+    assert n_clusters == 4
+    assert scores[4] == max(scores.values())
+    assert (alg4.cluster_interactions(matrix, 'auto') == labels).all()
+
+
+def _weak_sparse_matrix(n, groups, seed=0):
+    from scipy import sparse as sp
+
+    # Weakly separated groups, joined by a chain so the graph is connected
+    rng = np.random.default_rng(seed)
+    group = rng.integers(0, groups, n)
+    probability = np.where(group[:, None] == group[None, :], 0.02, 0.002)
+    upper = np.triu(rng.random((n, n)) < probability, k=1)
+    upper[np.arange(n - 1), np.arange(1, n)] = True
+    return sp.csr_matrix((upper | upper.T).astype(float))
+
+
+@pytest.mark.filterwarnings('error')
+def test_sparse_labels_do_not_depend_on_cache_history():
+    matrix = _weak_sparse_matrix(300, 4)
+    alg4._TREE_CACHE.clear()
+    fresh = alg4.cluster_interactions(matrix, 4)
+
+    alg4._TREE_CACHE.clear()
+    alg4.cluster_tree(matrix).select(2, 30)
+    after_sweep = alg4.cluster_interactions(matrix, 4)
+
+    assert (fresh == after_sweep).all()
+    assert (alg4.ClusterTree(matrix).labels(4) == fresh).all()
+
+
+@pytest.mark.filterwarnings('error')
+def test_sparse_sweep_shares_embeddings_between_cluster_counts(monkeypatch):
+    sizes = []
+
+    def recording_embedding(affinity, n_components, **kwargs):
+        sizes.append(n_components)
+        return spectral_embedding(affinity, n_components=n_components, **kwargs)
+
+    spectral_embedding = alg4.spectral_embedding
+    monkeypatch.setattr(alg4, 'spectral_embedding', recording_embedding)
+    tree = alg4.ClusterTree(_weak_sparse_matrix(200, 4))
+
+    n_clusters, labels, scores = tree.select(2, 50)
+
+    assert sizes == [2, 4, 8, 16, 32, 64]
+    assert sorted(scores) == list(range(2, 51))
+    assert len(np.unique(labels)) <= n_clusters
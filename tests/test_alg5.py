@@ -0,0 +1,96 @@
+"""
+Tests for the RAMI 4.0 cube rendering of Algorithm 5 (alg5/alg5.py).
+"""
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import to_rgba
+
+from alg5.alg5 import aggregate_cells, draw_cell_glyphs, visualize_3d_rami_cube
+
+VISUAL_CONFIG = {
+    'x_limits': [0, 7], 'y_limits': [0, 4], 'z_limits': [0, 6], 'ellipsoid_radii': [0.2, 0.1, 0.3],
+    'stakeholder_colors': {'OEM': 'red', 'Supplier': (0.0, 0.5, 0.0), 'Integrator': [0, 0, 1]},
+}
+
+
+def _usecase(placed):
+    microsystems = [
+        {'id': f"M{k}", 'stakeholder': stakeholder, 'coordinates': dict(zip('XYZ', coordinates))}
+        for k, (stakeholder, coordinates) in enumerate(placed)
+    ]
+    return {'microsystems': microsystems, 'interactions': []}
+
+
+def test_aggregate_cells_counts_and_dominant_colors():
+    centers = np.array([[0.2, 0.5, 0.5], [0.8, 0.5, 0.5], [0.5, 0.1, 0.9], [3.5, 1.5, 2.5]])
+    colors = ['red', (0.0, 0.5, 0.0), (1.0, 0.0, 0.0), '#008000']
+
+    aggregation = aggregate_cells(centers, colors)
+
+    assert aggregation['cells'].tolist() == [[0, 0, 0], [3, 1, 2]]
+    assert aggregation['cell_of'].tolist() == [0, 0, 0, 1]
+    assert aggregation['counts'].tolist() == [3, 1]
+    assert np.allclose(aggregation['centers'], [[0.5, 1.1 / 3, 1.9 / 3], [3.5, 1.5, 2.5]])
+    # Red twice (as a name and as a tuple) outweighs green once
+    assert aggregation['colors'].tolist() == [list(to_rgba('red')), list(to_rgba('#008000'))]
+
+
+def test_aggregate_cells_without_microsystems():
+    aggregation = aggregate_cells(np.zeros((0, 3)), [])
+
+    assert aggregation['cells'].shape == (0, 3)
+    assert aggregation['counts'].tolist() == []
+    assert aggregation['colors'].shape == (0, 4)
+
+
+def test_draw_cell_glyphs_skips_unplaced_microsystems_and_expands_cells():
+    centers = np.array([[0.5, 0.5, 0.5], [0.6, 0.5, 0.5], [np.nan, 1, 1], [2.5, 2.5, 2.5]])
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+
+    aggregation = draw_cell_glyphs(ax, centers, (0.2, 0.1, 0.3), ['red', 'red', 'blue', (0, 0, 1)],
+                                   expand_cells=[(2, 2, 2)])
+
+    assert aggregation['counts'].tolist() == [2, 1]
+    assert [text.get_text() for text in ax.texts] == ['2']
+    assert len(ax.collections) == 2
+    plt.close(fig)
+
+
+def test_aggregated_cube_with_rgb_stakeholder_colors(tmp_path):
+    placed = [('OEM', (0.5, 0.5, 0.5)), ('Supplier', (0.5, 0.6, 0.5)), ('Integrator', (3.5, 2.5, 1.5)),
+              ('Supplier', ('0 <= x < 1', None, None))]
+
+    fig = visualize_3d_rami_cube(_usecase(placed), _usecase(placed), VISUAL_CONFIG,
+                                 figure_path=str(tmp_path / 'cube.png'), aggregate=True)
+
+    assert (tmp_path / 'cube.png').stat().st_size > 0
+    assert sorted(text.get_text() for text in fig.axes[0].texts) == ['1', '2']
+
+
+def test_aggregated_cube_without_placed_microsystems(tmp_path):
+    for placed in ([], [('OEM', (None, None, None))]):
+        visualize_3d_rami_cube(_usecase(placed), _usecase(placed), VISUAL_CONFIG,
+                               figure_path=str(tmp_path / 'cube.png'), aggregate=True)
+
+        assert (tmp_path / 'cube.png').exists()
+
+
+def test_draw_ellipsoids_builds_one_mesh_with_a_color_per_face():
+    from alg5.alg5 import draw_ellipsoids
+    from ramiviz.geometry import unit_sphere_mesh
+
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+
+    mesh = draw_ellipsoids(ax, [[1, 1, 1], [2, 2, 2], [3, 3, 3]], (0.2, 0.1, 0.3), ['red', 'blue', (0, 1, 0)],
+                           resolution=10)
+
+    fig.canvas.draw()
+
+    faces_per_ellipsoid = len(unit_sphere_mesh(10)[1])
+    assert list(ax.collections) == [mesh]
+    assert len(mesh.get_paths()) == 3 * faces_per_ellipsoid
+    assert len(mesh.get_facecolor()) == 3 * faces_per_ellipsoid
+    assert draw_ellipsoids(ax, np.zeros((0, 3)), (0.2, 0.1, 0.3), []) is None
+    plt.close(fig)
@@ -0,0 +1,102 @@
+"""
+Tests for the value metrics, Pareto front and value projection of Algorithm 6 (alg6/alg6.py).
+"""
+import numpy as np
+import pytest
+
+from alg6.alg6 import (ValueMetrics, bin_value_projection, map_to_2d, pareto_front, rank_value_metrics,
+                       top_microsystems, weighted_scores)
+
+
+def _brute_force_front(objectives):
+    objectives = np.asarray(objectives, dtype=float)
+    dominated = [
+        any((other <= row).all() and (other < row).any() for other in objectives)
+        for row in objectives
+    ]
+    return ~np.array(dominated, dtype=bool)
+
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('k', [1, 2, 3])
+def test_pareto_front_matches_brute_force(seed, k):
+    rng = np.random.default_rng(seed)
+    # Few distinct values give ties and duplicate rows
+    objectives = rng.integers(0, 6 if seed % 2 else 1000, size=(300, k)).astype(float)
+
+    assert (pareto_front(objectives) == _brute_force_front(objectives)).all()
+
+
+def test_pareto_front_keeps_identical_front_rows():
+    objectives = [[1, 2, 3], [1, 2, 3], [2, 2, 3], [0, 5, 5]]
+
+    assert pareto_front(objectives).tolist() == [True, True, False, True]
+    assert pareto_front(np.zeros((0, 3))).tolist() == []
+
+
+@pytest.mark.parametrize('objectives', [np.zeros((3, 4)), np.zeros(3), [[0, np.nan]]])
+def test_pareto_front_rejects_unsupported_objectives(objectives):
+    with pytest.raises(ValueError):
+        pareto_front(objectives)
+
+
+def test_value_metrics_join_both_layouts():
+    by_id = ValueMetrics.from_json({'MS2': {'profit': 5, 'cost': 1}, 'MS1': {'profit': 1, 'cost': 2,
+                                                                            'environmental_impact': 3}})
+    by_stakeholder = ValueMetrics.from_json({'stakeholders': [
+        {'microsystems': [{'microsystem_id': 'MS1', 'value_metrics': {'profit': 9}}]},
+        {'microsystems': [{'microsystem_id': 'MS1', 'value_metrics': {'profit': 1, 'cost': 2,
+                                                                       'environmental_impact': 3}},
+                          {'microsystem_id': 'MS2', 'value_metrics': {'profit': 5, 'cost': 1}}]},
+    ]})
+
+    for metrics in (by_id, by_stakeholder):
+        assert metrics.join(['MS2', 'missing', 'MS1', 'MS2']).tolist() == [
+            [5, 1, 0], [0, 0, 0], [1, 2, 3], [5, 1, 0]]
+    with pytest.raises(ValueError):
+        ValueMetrics(['A', 'B', 'A'], np.zeros((3, 3)))
+
+
+def test_map_to_2d_joins_metrics_by_id():
+    system = {'microsystems': [{'id': 'B', 'coordinates': {'X': 1.5, 'Y': 2.5, 'Z': 0}},
+                               {'id': 'C', 'coordinates': {'X': 0.5, 'Y': 0.5, 'Z': 0}}]}
+
+    mapped = map_to_2d(system, {'B': {'profit': 4, 'cost': 2, 'environmental_impact': 1}})
+
+    assert mapped == [
+        {'id': 'B', 'coordinates': (1.5, 2.5), 'profit': 4.0, 'cost': 2.0, 'environmental_impact': 1.0},
+        {'id': 'C', 'coordinates': (0.5, 0.5), 'profit': 0.0, 'cost': 0.0, 'environmental_impact': 0.0},
+    ]
+
+
+def test_rank_value_metrics_orders_by_score_and_marks_the_front():
+    metrics = ValueMetrics(['A', 'B', 'C', 'D'], [[10, 1, 1], [5, 5, 5], [10, 1, 2], [1, 0, 0]])
+
+    ranking = rank_value_metrics(metrics)
+    scores = weighted_scores(metrics.values)
+
+    assert [entry['id'] for entry in ranking] == ['A', 'C', 'D', 'B']
+    assert [entry['score'] for entry in ranking] == sorted(scores.tolist(), reverse=True)
+    assert {entry['id']: entry['pareto_optimal'] for entry in ranking} == {'A': True, 'B': False, 'C': False,
+                                                                           'D': True}
+    assert [entry['id'] for entry in rank_value_metrics(metrics, k=2)] == ['A', 'C']
+    with pytest.raises(ValueError):
+        weighted_scores(metrics.values, {'risk': 1})
+
+
+def test_top_microsystems_ignores_nan():
+    values = np.array([3.0, np.nan, 7.0, 1.0, 7.0])
+
+    assert top_microsystems(values, 2).tolist() == [2, 4]
+    assert top_microsystems(values, 10).tolist() == [2, 4, 0, 3]
+
+
+def test_bin_value_projection_sums_metrics_per_cell():
+    coordinates = np.array([[0.2, 0.2], [0.7, 0.3], [2.0, 1.0], [5.0, 0.5], [np.nan, 0.5]])
+    metrics = {'profit': np.array([1.0, 2.0, 4.0, 8.0, 16.0])}
+
+    grid = bin_value_projection(coordinates, metrics, (0, 2), (0, 1), bins=(2, 1))
+
+    assert grid['count'].tolist() == [[2, 1]]
+    assert grid['profit'].tolist() == [[3.0, 4.0]]
+    assert grid['extent'] == (0, 2, 0, 1)
@@ -0,0 +1,52 @@
+"""
+Tests for the integration map of Algorithm 7 (alg7/alg7.py).
+"""
+import pandas as pd
+import pytest
+
+from alg3.alg3 import filter_dynamic_workflow
+from alg7.alg7 import annotate_value_metrics, create_integration_map
+from ramiviz.synthetic import generate_dataset
+
+
+def _reference_integration_map(usecase_data, system_components, phases, lifecycle_stages):
+    # Cell by cell accumulation of the original implementation
+    stakeholder_of = {comp['id']: comp['stakeholder'] for comp in system_components['components']}
+    stakeholders = sorted(set(stakeholder_of.values()))
+    integration_map = pd.DataFrame(0, index=stakeholders, columns=phases + lifecycle_stages)
+    for interaction in usecase_data['interactions']:
+        for endpoint in (interaction['source_id'], interaction['target_id']):
+            for column in phases + lifecycle_stages:
+                integration_map.loc[stakeholder_of[endpoint], column] += 1
+    return integration_map
+
+
+def test_integration_map_matches_cell_by_cell_accumulation():
+    dataset = generate_dataset(300, seed=7, n_stakeholders=5)
+    usecase = filter_dynamic_workflow(dataset['model'], dataset['workflow'])
+    assert usecase['interactions']
+
+    integration_map = create_integration_map(usecase, dataset['stakeholder_metrics'], dataset['system_components'],
+                                             dataset['phases'], dataset['lifecycle_stages'])
+
+    expected = _reference_integration_map(usecase, dataset['system_components'], dataset['phases'],
+                                          dataset['lifecycle_stages'])
+    pd.testing.assert_frame_equal(integration_map, expected, check_dtype=False)
+
+
+def test_integration_map_rejects_unknown_endpoints():
+    components = {'components': [{'id': 'A', 'stakeholder': 'OEM'}]}
+
+    with pytest.raises(KeyError, match="'B'"):
+        create_integration_map({'interactions': [{'source_id': 'A', 'target_id': 'B'}]}, {}, components,
+                               ['Design'], ['Operation'])
+
+
+def test_annotate_value_metrics_adds_known_cells():
+    integration_map = pd.DataFrame([[1, 2], [3, 4]], index=['OEM', 'Supplier'], columns=['Design', 'Operation'])
+
+    annotated = annotate_value_metrics(integration_map, {'OEM': {'Design': 10, 'Other': 5}, 'Unknown': {'Design': 1}})
+
+    assert annotated.values.tolist() == [[11, 2], [3, 4]]
+    assert integration_map.values.tolist() == [[1, 2], [3, 4]]
+    assert annotate_value_metrics(integration_map, {}).equals(integration_map)
@@ -0,0 +1,77 @@
+"""
+Tests for the columnar handoff format (ramiviz/columnar.py) and the stages reading it.
+"""
+import json
+
+import numpy as np
+
+from alg2.alg2 import map_to_rami_axes, place_coordinates, placed_microsystems
+from alg3 import alg3
+from alg4 import alg4
+from alg6 import alg6
+from alg7 import alg7
+from ramiviz.columnar import ColumnarModel, load_columnar, load_model_json, save_columnar
+from ramiviz.synthetic import generate_dataset
+
+
+def test_round_trip_keeps_columns(tmp_path):
+    model = {
+        'microsystems': [
+            {'id': 'A', 'coordinates': {'X': 1, 'Y': 2.5, 'Z': 0}, 'stakeholder': 'OEM', 'cluster': 1},
+            {'id': 'B', 'coordinates': {'X': None, 'Y': 1, 'Z': 2}},
+        ],
+        'interactions': [{'source_id': 'A', 'target_id': 'B'}, {'source_id': 'B', 'target_id': 'A'}],
+    }
+
+    save_columnar(ColumnarModel.from_json(model), str(tmp_path / 'model.rami'))
+    loaded = load_columnar(str(tmp_path / 'model.rami'))
+
+    assert isinstance(loaded.coordinates, np.memmap)
+    assert loaded.to_json() == {
+        'microsystems': [
+            {'id': 'A', 'coordinates': {'X': 1.0, 'Y': 2.5, 'Z': 0.0}, 'stakeholder': 'OEM', 'cluster': 1},
+            {'id': 'B', 'coordinates': {'X': None, 'Y': 1.0, 'Z': 2.0}},
+        ],
+        'interactions': model['interactions'],
+    }
+    assert load_model_json(str(tmp_path / 'model.rami')) == loaded.to_json()
+
+
+def test_from_json_skips_interactions_with_unknown_endpoints():
+    model = {
+        'microsystems': [{'id': 'A'}, {'id': 'B'}],
+        'interactions': [{'source_id': 'A', 'target_id': 'B'}, {'source_id': 'A', 'target_id': 'gone'}],
+    }
+
+    columnar = ColumnarModel.from_json(model)
+
+    assert columnar.sources.tolist() == [0]
+    assert columnar.targets.tolist() == [1]
+
+
+def test_every_rami_output_has_a_reader(tmp_path):
+    dataset = generate_dataset(80, seed=2)
+    model = dataset['model']
+    mapped = map_to_rami_axes(model, dataset['mapping_config'], unresolved=[])
+    system = {'microsystems': placed_microsystems(model['microsystems'], place_coordinates(mapped)),
+              'interactions': model['interactions']}
+    paths = {}
+    for name in ('system', 'workflow', 'value_metrics', 'projection_config', 'system_components'):
+        paths[name] = str(tmp_path / f'{name}.json')
+        with open(paths[name], 'w') as file:
+            json.dump(system if name == 'system' else dataset[name], file)
+    usecase_path = str(tmp_path / 'usecase.rami')
+    clustered_path = str(tmp_path / 'clustered.rami')
+
+    alg3.main(paths['system'], paths['workflow'], usecase_path)
+    alg4.main(paths['system'], usecase_path, dataset['phases'], 2, clustered_path,
+              figure_path=str(tmp_path / 'matrix.png'))
+    alg6.main(clustered_path, paths['value_metrics'], paths['projection_config'],
+              figure_path=str(tmp_path / 'projection.png'))
+    alg7.main(usecase_path, paths['value_metrics'], paths['system_components'], dataset['phases'],
+              dataset['lifecycle_stages'], figure_path=str(tmp_path / 'map.png'))
+
+    clustered = load_columnar(clustered_path)
+    assert len(clustered) == len(model['microsystems'])
+    assert set(clustered.clusters.tolist()) == {0, 1}
+    assert all((tmp_path / name).exists() for name in ('matrix.png', 'projection.png', 'map.png'))
@@ -0,0 +1,112 @@
+"""
+Tests for the RAMI DSL parser (ramiviz/dsl.py) and its use in Algorithm 1.
+"""
+import os
+
+import pytest
+
+from alg1.alg1 import decode_document
+from ramiviz.dsl import DSLSyntaxError, dsl_to_json, load_dsl, parse_dsl
+from ramiviz.streaming import load_model
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RECORD = {'id': 'PDM', 'provides': ['Design Specifications', 'Bill of Materials'], 'weight': 2,
+          'coordinates': {'X': 1, 'Y': 2.5, 'Z': -3}, 'active': True, 'note': None}
+
+
+def test_shipped_models_parse():
+    shp = load_dsl(os.path.join(REPO_ROOT, 'algorithms-input-output-files', 'SHP-SystemModel'))
+    sample = load_dsl(os.path.join(REPO_ROOT, 'alg1', 'DSL'))
+
+    assert len(shp['microsystems']) == 20
+    assert shp['microsystems'][0]['provides'] == ['Design Specifications', 'Bill of Materials']
+    assert sample['microsystems'][0]['id'] == 'microsystem_01'
+    assert sample['interactions'][0]['services'] == ['sensor_data']
+
+
+@pytest.mark.parametrize('text', [
+    # One field per line, with and without commas and comments
+    '''microsystem {
+      id: "PDM",  // comment
+      provides: ["Design Specifications", "Bill of Materials"]
+      weight: 2
+      coordinates: {X: 1, Y: 2.5, Z: -3}
+      active: true, note: null
+    }''',
+    # Whole record on one line
+    'Microsystem { id: "PDM", provides: ["Design Specifications", "Bill of Materials"], weight: 2, '
+    'coordinates: {X: 1, Y: 2.5, Z: -3}, active: true, note: null }',
+    # Values spread over several lines
+    '''# header comment
+    MICROSYSTEM
+    {
+      "id":
+        "PDM"
+      provides: [
+        "Design Specifications",
+        "Bill of Materials",
+      ]
+      weight: 2 coordinates: {
+        X: 1
+        Y: 2.5, Z: -3
+      }
+      active: true note: null
+    }''',
+])
+def test_layouts_parse_to_the_same_record(text):
+    assert parse_dsl(text) == {'microsystems': [RECORD], 'interactions': []}
+
+
+def test_latex_wrapped_model_skips_json_blocks():
+    text = '''\\section{Model}
+\\begin{verbatim}
+microsystem { id: "A" }
+\\end{verbatim}
+\\begin{verbatim}
+{"microsystems": [{"id": "B"}]}
+\\end{verbatim}
+\\begin{verbatim}
+interaction { source_id: "A", target_id: "A" }
+\\end{verbatim}
+'''
+    assert parse_dsl(text) == {'microsystems': [{'id': 'A'}],
+                               'interactions': [{'source_id': 'A', 'target_id': 'A'}]}
+
+
+@pytest.mark.parametrize('text, message, line, column', [
+    ('microsystem {\n  id: "PDM\n}', "Unterminated string", 2, 7),
+    ('component { id: "A" }', "Unknown record type 'component'", 1, 1),
+    ('microsystem {\n  id "A"\n}', "Expected ':'", 2, 6),
+    ('microsystem {\n  role: Design\n}', "string values must be quoted", 2, 9),
+    ('microsystem {\n  id: "A"\n  id: "B"\n}', "Duplicate field 'id'", 3, 3),
+    ('microsystem {\n  provides: ["A", "B"\n', "Unterminated list", 3, 1),
+    ('microsystem {\n  id: "A";\n}', "Unexpected character ';'", 2, 10),
+    ('microsystem { id: "A" }\n"stray"', "Expected a record", 2, 1),
+])
+def test_syntax_errors_report_their_position(text, message, line, column):
+    with pytest.raises(DSLSyntaxError, match=message) as error:
+        parse_dsl(text)
+
+    assert (error.value.line, error.value.column) == (line, column)
+
+
+def test_decode_document_reports_dsl_errors(tmp_path):
+    path = tmp_path / 'model.dsl'
+    path.write_text('microsystem {\n  role: Design\n}\n')
+
+    data, errors = decode_document(str(path), None)
+
+    assert data is None
+    assert errors and errors[0].startswith(f"{path}:2:9:")
+
+
+@pytest.mark.parametrize('name', ['model.json', 'model.jsonl'])
+def test_dsl_to_json_writes_the_parsed_model(tmp_path, name):
+    source = os.path.join(REPO_ROOT, 'alg1', 'DSL')
+    output = str(tmp_path / name)
+
+    counts = dsl_to_json(source, output)
+
+    assert counts == {'microsystems': 1, 'interactions': 1}
+    assert load_model(output) == load_dsl(source)
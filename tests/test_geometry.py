@@ -0,0 +1,66 @@
+"""
+Tests for the batched ellipsoid meshes (ramiviz/geometry.py).
+"""
+import numpy as np
+import pytest
+
+from ramiviz.geometry import DEFAULT_TRIANGLE_BUDGET, ellipsoid_mesh, mesh_resolution, unit_sphere_mesh
+
+
+def test_unit_sphere_mesh_shape_at_a_resolution():
+    vertices, faces = unit_sphere_mesh(8)
+
+    # 8 points per ring, 5 rings from pole to pole, two triangles per grid cell
+    assert vertices.shape == (40, 3)
+    assert faces.shape == (2 * 8 * 4, 3)
+    assert np.allclose(np.linalg.norm(vertices, axis=1), 1)
+    assert faces.min() == 0 and faces.max() == len(vertices) - 1
+    assert not vertices.flags.writeable
+    assert unit_sphere_mesh(2)[0].shape == unit_sphere_mesh(3)[0].shape
+
+
+def test_ellipsoid_mesh_offsets_centers_and_radii():
+    centers = [[1.0, 2.0, 3.0], [-4.0, 0.0, 0.5]]
+    radii = [[0.5, 0.25, 1.0], [1.0, 1.0, 2.0]]
+    template_vertices, template_faces = unit_sphere_mesh(12)
+
+    vertices, faces = ellipsoid_mesh(centers, radii, resolution=12)
+
+    assert vertices.shape == (2 * len(template_vertices), 3)
+    assert faces.shape == (2 * len(template_faces), 3)
+    assert (faces[len(template_faces):] == template_faces + len(template_vertices)).all()
+    for k, (center, radius) in enumerate(zip(np.array(centers), np.array(radii))):
+        own = vertices[k * len(template_vertices):(k + 1) * len(template_vertices)]
+        assert np.allclose((((own - center) / radius) ** 2).sum(axis=1), 1)
+        assert np.allclose(own.max(axis=0)[2], center[2] + radius[2])
+        assert np.allclose(own.min(axis=0)[2], center[2] - radius[2])
+
+
+def test_ellipsoid_mesh_shares_radii_and_tilts():
+    vertices, _ = ellipsoid_mesh([[0, 0, 0], [5, 5, 5]], (1.0, 0.1, 2.0), resolution=16, angles=[0, 90])
+    half = len(vertices) // 2
+
+    upright, tilted = vertices[:half], vertices[half:] - 5
+    assert np.allclose(np.ptp(upright, axis=0), [2.0, 0.2, 4.0], atol=0.05)
+    # A quarter turn around the x-axis swaps the y and z extents
+    assert np.allclose(np.ptp(tilted, axis=0), [2.0, 4.0, 0.2], atol=0.05)
+    assert ellipsoid_mesh(np.zeros((0, 3)), (1, 1, 1), resolution=8)[0].shape == (0, 3)
+
+
+def test_mesh_resolution_drops_with_the_number_of_ellipsoids():
+    counts = [1, 10, 100, 1000, 10_000, 100_000, 1_000_000]
+    resolutions = [mesh_resolution(count) for count in counts]
+
+    assert resolutions == sorted(resolutions, reverse=True)
+    assert resolutions[0] == 40 and resolutions[-1] == 6
+    for count, resolution in zip(counts, resolutions):
+        if 6 < resolution < 40:
+            triangles = count * len(unit_sphere_mesh(resolution)[1])
+            assert triangles <= DEFAULT_TRIANGLE_BUDGET
+    assert mesh_resolution(0) == mesh_resolution(1)
+
+
+@pytest.mark.parametrize('minimum, maximum', [(3, 10), (12, 12)])
+def test_mesh_resolution_respects_its_bounds(minimum, maximum):
+    for count in (1, 500, 10 ** 7):
+        assert minimum <= mesh_resolution(count, minimum=minimum, maximum=maximum) <= maximum
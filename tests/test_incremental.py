@@ -0,0 +1,90 @@
+"""
+Tests for incremental model updates (ramiviz/incremental.py).
+"""
+import numpy as np
+import pytest
+
+from alg2.alg2 import map_to_rami_axes, place_coordinates, placed_microsystems
+from alg3.alg3 import filter_dynamic_workflow
+from alg4.alg4 import create_interaction_matrix, create_weighted_interaction_matrix
+from ramiviz.incremental import IncrementalModel
+from ramiviz.synthetic import generate_dataset
+
+
+def _full_run(model, mapping_config, workflow_data, weighted):
+    mapped = map_to_rami_axes(model, mapping_config, unresolved=[])
+    system = {'microsystems': placed_microsystems(model['microsystems'], place_coordinates(mapped)),
+              'interactions': model['interactions']}
+    usecase = filter_dynamic_workflow(system, workflow_data) if workflow_data else system
+    create_matrix = create_weighted_interaction_matrix if weighted else create_interaction_matrix
+    matrix, ids = create_matrix(system, usecase, sparse=False)
+    return mapped, system, usecase, matrix, ids
+
+
+def _delta(microsystems, interactions):
+    removed = [m['id'] for m in microsystems[5:15]]
+    changed = [dict(m, provides=microsystems[0]['provides'], role=microsystems[1]['role'])
+               for m in microsystems[20:30]]
+    added = [dict(m, id=f"New{k}") for k, m in enumerate(microsystems[40:50])]
+    return {
+        'microsystems': {'added': added, 'changed': changed, 'removed': removed},
+        'interactions': {
+            'added': [{'source_id': 'New0', 'target_id': microsystems[60]['id'], 'services': ['Service 1']}],
+            'removed': interactions[:10],
+        },
+    }
+
+
+def _apply(model, delta):
+    removed = set(delta['microsystems']['removed'])
+    changed = {m['id']: m for m in delta['microsystems']['changed']}
+    removed_pairs = {(i['source_id'], i['target_id']) for i in delta['interactions']['removed']}
+    microsystems = [changed.get(m['id'], m) for m in model['microsystems'] if m['id'] not in removed]
+    interactions = [i for i in model['interactions'] if (i['source_id'], i['target_id']) not in removed_pairs]
+    return {'microsystems': microsystems + delta['microsystems']['added'],
+            'interactions': interactions + delta['interactions']['added']}
+
+
+@pytest.mark.parametrize('with_workflow', [True, False])
+@pytest.mark.parametrize('weighted', [True, False])
+def test_delta_gives_the_results_of_a_full_run(with_workflow, weighted):
+    dataset = generate_dataset(200, seed=6)
+    workflow_data = dataset['workflow'] if with_workflow else None
+    incremental = IncrementalModel(dataset['model'], dataset['mapping_config'], workflow_data=workflow_data,
+                                   weighted=weighted, sparse=False)
+    delta = _delta(dataset['model']['microsystems'], dataset['model']['interactions'])
+
+    summary = incremental.apply_delta(delta)
+
+    mapped, system, usecase, matrix, ids = _full_run(_apply(dataset['model'], delta), dataset['mapping_config'],
+                                                     workflow_data, weighted)
+    assert summary['mapped'] == 20 and summary['removed'] == 10
+    assert incremental.system_mapped_data() == mapped
+    assert incremental.system_data() == system
+    assert incremental.usecase_data() == usecase
+    incremental_matrix, incremental_ids = incremental.interaction_matrix()
+    assert incremental_ids == ids
+    assert np.array_equal(incremental_matrix, matrix)
+
+
+def test_delta_labels_new_microsystems_and_reclusters():
+    dataset = generate_dataset(200, seed=6)
+    incremental = IncrementalModel(dataset['model'], dataset['mapping_config'], n_clusters=3,
+                                   recluster_fraction=0.05)
+    delta = _delta(dataset['model']['microsystems'], dataset['model']['interactions'])
+
+    summary = incremental.apply_delta(delta)
+
+    assert summary['reclustered']
+    assert len(incremental.labels()) == len(incremental.system_data()['microsystems'])
+    assert set(incremental.labels().tolist()) <= {0, 1, 2}
+
+
+def test_delta_rejects_unknown_and_duplicate_ids():
+    dataset = generate_dataset(50, seed=6)
+    incremental = IncrementalModel(dataset['model'], dataset['mapping_config'])
+
+    with pytest.raises(KeyError):
+        incremental.apply_delta({'microsystems': {'removed': ['missing']}})
+    with pytest.raises(ValueError):
+        incremental.apply_delta({'microsystems': {'added': [dataset['model']['microsystems'][0]]}})
@@ -0,0 +1,90 @@
+"""
+Tests for reading and editing commented JSON (ramiviz/jsonc.py).
+"""
+import pytest
+
+from ramiviz import jsonc
+
+DOCUMENT = """{
+  // Rules of one axis
+  "name": "a // not a comment",
+  "rules": [
+    {"id": 1}, /* first */
+    {"id": 2} // second
+  ],
+  "empty": [],
+  "ext": {}
+}
+"""
+
+
+def test_loads_drops_comments_and_trailing_commas():
+    assert jsonc.loads(DOCUMENT) == {'name': 'a // not a comment', 'rules': [{'id': 1}, {'id': 2}],
+                                     'empty': [], 'ext': {}}
+    assert jsonc.loads('[1, 2, /* three */ 3,]') == [1, 2, 3]
+
+
+def test_value_spans_locate_every_value():
+    spans = jsonc.value_spans(DOCUMENT)
+
+    def text_of(path):
+        start, end = spans[path]
+        return DOCUMENT[start:end]
+
+    assert text_of(()) == DOCUMENT.strip()
+    assert text_of(('name',)) == '"a // not a comment"'
+    assert text_of(('rules', 1)) == '{"id": 2}'
+    assert text_of(('rules', 1, 'id')) == '2'
+    assert text_of(('empty',)) == '[]'
+    assert set(jsonc.child_spans(spans, ('rules',))) == {0, 1}
+    assert jsonc.child_spans(spans, ('ext',)) == {}
+
+
+def test_replace_value_splices_one_value():
+    text = jsonc.replace_value(DOCUMENT, jsonc.value_spans(DOCUMENT), ('rules', 0), '{"id": 10}')
+
+    assert text == DOCUMENT.replace('{"id": 1}', '{"id": 10}')
+
+
+def test_insert_array_item_keeps_a_comment_after_the_last_item():
+    text = jsonc.insert_array_item(DOCUMENT, jsonc.value_spans(DOCUMENT), ('rules',), '{"id": 3}')
+
+    assert '    {"id": 2}, // second\n    {"id": 3}\n  ],' in text
+    assert '/* first */' in text
+    assert jsonc.loads(text)['rules'] == [{'id': 1}, {'id': 2}, {'id': 3}]
+
+
+def test_insert_array_item_keeps_trailing_commas():
+    document = '{\n  "rules": [\n    1,\n    2,\n  ]\n}'
+
+    text = jsonc.insert_array_item(document, jsonc.value_spans(document), ('rules',), '3')
+
+    assert text == '{\n  "rules": [\n    1,\n    2,\n    3,\n  ]\n}'
+
+
+@pytest.mark.parametrize('document', ['[1, 2]', '{"rules": [1, 2]}'])
+def test_insert_array_item_into_a_one_line_array(document):
+    path = ('rules',) if document.startswith('{') else ()
+
+    text = jsonc.insert_array_item(document, jsonc.value_spans(document), path, '3')
+
+    assert text == document.replace('2]', '2,\n3]')
+    assert jsonc.loads(text) in ([1, 2, 3], {'rules': [1, 2, 3]})
+
+
+def test_insert_array_item_into_an_empty_array():
+    text = jsonc.insert_array_item(DOCUMENT, jsonc.value_spans(DOCUMENT), ('empty',), '"x"')
+
+    assert '  "empty": [\n    "x"\n  ],' in text
+    assert jsonc.loads(text)['empty'] == ['x']
+
+
+def test_insert_object_member_into_empty_and_filled_objects():
+    text = jsonc.insert_object_member(DOCUMENT, jsonc.value_spans(DOCUMENT), ('ext',), 'usr_rules', [])
+    assert '  "ext": {\n    "usr_rules": []\n  }\n}' in text
+
+    text = jsonc.insert_object_member(text, jsonc.value_spans(text), (), 'first', {'a': 1})
+    assert text.startswith('{\n  "first": {"a": 1},\n  // Rules of one axis')
+
+    assert jsonc.loads(text)['ext'] == {'usr_rules': []}
+    assert list(jsonc.loads(text)) == ['first', 'name', 'rules', 'empty', 'ext']
@@ -0,0 +1,56 @@
+"""
+Tests for the shared microsystem lookup index (ramiviz/model_index.py).
+"""
+import numpy as np
+import pytest
+
+from ramiviz.model_index import ModelIndex
+
+MICROSYSTEMS = [
+    {'id': 'A', 'stakeholder': 'OEM', 'coordinates': {'X': 1, 'Y': 2.5, 'Z': '3'}},
+    {'id': 'B', 'stakeholder_id': 'S-2', 'coordinates': {'X': '0 <= x < 1', 'Y': None}},
+    {'id': 7, 'stakeholder': 'OEM'},
+]
+
+
+def test_looks_up_ids_and_stakeholders():
+    index = ModelIndex(MICROSYSTEMS)
+
+    assert len(index) == 3
+    assert 'B' in index and 7 in index and 'C' not in index
+    assert index.positions_of(['B', 7, 'A', 'B']).tolist() == [1, 2, 0, 1]
+    assert index.microsystems['B'] is MICROSYSTEMS[1]
+    assert index.stakeholders == {'A': 'OEM', 'B': 'S-2', 7: 'OEM'}
+
+
+def test_missing_and_unplaced_coordinates_are_nan():
+    coordinates = ModelIndex(MICROSYSTEMS).coordinates
+
+    assert coordinates.shape == (3, 3)
+    assert coordinates[0].tolist() == [1.0, 2.5, 3.0]
+    assert np.isnan(coordinates[1:]).all()
+    assert ModelIndex([]).coordinates.shape == (0, 3)
+
+
+def test_edge_positions_and_unknown_endpoints():
+    index = ModelIndex(MICROSYSTEMS)
+
+    sources, targets = index.edge_positions([{'source_id': 'A', 'target_id': 7}, {'source_id': 'B', 'target_id': 'A'}])
+
+    assert sources.tolist() == [0, 1]
+    assert targets.tolist() == [2, 0]
+    assert [array.tolist() for array in index.edge_positions([])] == [[], []]
+    with pytest.raises(KeyError, match="'gone'"):
+        index.edge_positions([{'source_id': 'A', 'target_id': 'gone'}])
+
+
+def test_from_columns_shares_the_coordinates():
+    coordinates = np.arange(6, dtype=float).reshape(2, 3)
+
+    index = ModelIndex.from_columns(['A', 'B'], coordinates, ['OEM', 'Supplier'])
+
+    assert index.coordinates is coordinates
+    assert index.positions_of(['B']).tolist() == [1]
+    assert index.stakeholders == {'A': 'OEM', 'B': 'Supplier'}
+    assert index.microsystems == {}
+    assert ModelIndex.from_components({'components': MICROSYSTEMS[:1]}).ids == ['A']
@@ -0,0 +1,118 @@
+"""
+Tests for the pipeline runner and its stage cache (ramiviz/pipeline.py, ramiviz/cache.py).
+"""
+import json
+import os
+import shutil
+
+from ramiviz.cache import StageCache
+from ramiviz.pipeline import load_pipeline_config, run_pipeline
+from ramiviz.synthetic import generate_dataset, write_dataset
+
+
+def _write_config(directory, size, figures=None):
+    config_path = write_dataset(generate_dataset(size, seed=1), str(directory))
+    with open(config_path) as file:
+        config = json.load(file)
+    config['cache'] = {'directory': 'cache'}
+    if figures is not None:
+        config['figures'] = figures
+    with open(config_path, 'w') as file:
+        json.dump(config, file)
+    return config_path
+
+
+def test_cache_reuses_stages_of_unchanged_run(tmp_path):
+    figures = {'value_projection': 'out/projection.png', 'integration_map': 'out/map.png'}
+    config_path = _write_config(tmp_path, 120, figures)
+
+    first = run_pipeline(load_pipeline_config(config_path))
+    second = run_pipeline(load_pipeline_config(config_path))
+
+    assert first['cached'] == []
+    assert {'validate', 'map', 'filter', 'projection', 'integration'} <= set(second['cached'])
+    assert second['projection'] == first['projection']
+
+
+def test_cache_keys_follow_model_through_uncached_stage(tmp_path):
+    # The interaction matrix and the cube are shown on screen, so those stages are never cached
+    figures = {'value_projection': 'out/projection.png', 'integration_map': 'out/map.png'}
+    config_path = _write_config(tmp_path, 300, figures)
+    first = run_pipeline(load_pipeline_config(config_path))
+    assert len(first['projection']) == 300
+
+    # Only the model changes; the value metrics still cover all 300 microsystems
+    smaller = write_dataset(generate_dataset(150, seed=1), str(tmp_path / 'smaller'))
+    shutil.copy(os.path.join(os.path.dirname(smaller), 'model.json'), tmp_path / 'model.json')
+    second = run_pipeline(load_pipeline_config(config_path))
+
+    assert 'projection' not in second['cached']
+    assert len(second['projection']) == 150
+    assert os.path.exists(tmp_path / 'out' / 'projection.png')
+
+
+def test_editing_an_input_reruns_its_stage_and_the_stages_after_it(tmp_path):
+    figures = {'value_projection': 'out/projection.png', 'integration_map': 'out/map.png'}
+    config_path = _write_config(tmp_path, 120, figures)
+    run_pipeline(load_pipeline_config(config_path))
+
+    # Only the integration map reads the stakeholder metrics
+    with open(tmp_path / 'stakeholder_metrics.json') as file:
+        metrics = json.load(file)
+    metrics['Stakeholder-1']['Development'] += 1
+    with open(tmp_path / 'stakeholder_metrics.json', 'w') as file:
+        json.dump(metrics, file)
+    second = run_pipeline(load_pipeline_config(config_path))
+    assert set(second['cached']) == {'validate', 'map', 'filter', 'projection'}
+
+    # Every stage after the mapping builds on its key
+    with open(tmp_path / 'mapping_config.json') as file:
+        mapping_config = json.load(file)
+    mapping_config['hierarchy_rules'].insert(0, {'conditions': {'id': 'MS0'}, 'mapping': '6 <= x < 7'})
+    with open(tmp_path / 'mapping_config.json', 'w') as file:
+        json.dump(mapping_config, file)
+    third = run_pipeline(load_pipeline_config(config_path))
+    assert third['cached'] == ['validate']
+    assert third['system']['microsystems'][0]['coordinates']['X'] >= 6
+
+
+def test_stage_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = StageCache(str(tmp_path))
+    keys = [cache.key('stage', k) for k in range(3)]
+    for k, key in enumerate(keys):
+        cache.put(key, bytes(1000))
+        os.utime(tmp_path / f"{key}.pickle", ns=(k * 10 ** 9, k * 10 ** 9))
+
+    assert cache.get(keys[0]) == bytes(1000)  # now the most recently used
+    cache.max_bytes = 2 * os.path.getsize(tmp_path / f"{keys[0]}.pickle")
+    assert cache.evict() == 1
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == cache.get(keys[2]) == bytes(1000)
+
+
+def test_stage_cache_drops_unreadable_entries(tmp_path):
+    cache = StageCache(str(tmp_path))
+    key = cache.key('stage', 'input-digest')
+    cache.put(key, {'labels': [1, 2]})
+    assert cache.key('stage', 'other-digest') != key
+
+    with open(tmp_path / f"{key}.pickle", 'r+b') as file:
+        file.truncate(5)
+
+    assert cache.get(key) is None
+    assert not os.path.exists(tmp_path / f"{key}.pickle")
+
+
+def test_selected_stages_run_the_stages_they_build_on(tmp_path):
+    config_path = _write_config(tmp_path, 80, figures={'value_projection': 'out/projection.png'})
+    config = load_pipeline_config(config_path)
+    del config['cache']
+
+    filtered = run_pipeline(dict(config, stages=['filter']))
+    projected = run_pipeline(dict(config, stages=['projection']))
+
+    assert list(filtered['timings']) == ['validate', 'map', 'filter']
+    assert filtered['usecase']['microsystems']
+    assert list(projected['timings']) == ['validate', 'map', 'projection']
+    assert len(projected['projection']) == 80
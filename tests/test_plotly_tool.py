@@ -0,0 +1,54 @@
+"""
+Smoke tests for the Plotly cube tool (RAMI4.0-VIZ-Tool-1.1.py).
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('plotly')
+
+TOOL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'RAMI4.0-VIZ-Tool-1.1.py')
+
+MICROSYSTEMS = [
+    {'id': 'MS1', 'name': 'Sensor', 'coordinates': {'x1': 0, 'x2': 1, 'y1': 0, 'y2': 1, 'z1': 0, 'z2': 1}},
+    {'id': 'MS2', 'coordinates': {'X': 3.5, 'Y': 2.5, 'Z': 4.5}, 'color': 'rgb(0, 0, 0)',
+     'ellipsoidDimensions': {'a': 0.4, 'b': 0.3, 'c': 0.2, 'angle': 30}},
+]
+
+
+@pytest.fixture(scope='module')
+def tool():
+    spec = importlib.util.spec_from_file_location('rami_viz_tool', TOOL_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_builds_the_cube_of_a_small_model(tool):
+    fig = tool.build_cube_figure(MICROSYSTEMS, resolution=8)
+
+    frame, layers, ellipsoids, labels = fig.data
+    # One color index per vertex, half of the vertices for each ellipsoid
+    assert list(ellipsoids.intensity).count(0.5) == list(ellipsoids.intensity).count(1.5) == len(ellipsoids.x) // 2
+    assert max(ellipsoids.i.max(), ellipsoids.j.max(), ellipsoids.k.max()) < len(ellipsoids.x)
+    assert [color for _, color in ellipsoids.colorscale][::2] == ['rgb(200, 10, 10)', 'rgb(0, 0, 0)']
+    assert list(labels.hovertext) == ['MS1: Sensor', 'MS2: ']
+
+
+def test_builds_the_cube_without_microsystems(tool, tmp_path):
+    fig = tool.build_cube_figure([])
+
+    assert [trace.type for trace in fig.data] == ['scatter3d', 'mesh3d']
+    tool.finish_figure(fig, str(tmp_path / 'cube.html'))
+    assert (tmp_path / 'cube.html').stat().st_size > 0
+
+
+def test_imports_from_another_directory(tmp_path):
+    # Only the module level runs: run_path does not execute the __main__ block
+    result = subprocess.run([sys.executable, '-c', f'import runpy; runpy.run_path({TOOL_PATH!r})'],
+                            cwd=tmp_path, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
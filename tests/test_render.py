@@ -0,0 +1,97 @@
+"""
+Tests for headless figure creation and output (ramiviz/render.py).
+"""
+import os
+import subprocess
+import sys
+
+import matplotlib
+import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+import pytest
+from matplotlib.figure import Figure
+
+from ramiviz.render import create_figure, finish_figure, render_in_processes, use_headless_backend
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Leading bytes of each written format
+SIGNATURES = {'.png': b'\x89PNG', '.svg': b'<?xml', '.pdf': b'%PDF'}
+
+
+@pytest.fixture
+def no_window(monkeypatch):
+    """Fail the test if anything tries to show a figure on screen."""
+    def show(*args, **kwargs):
+        raise AssertionError("a figure was shown")
+    monkeypatch.setattr(plt, 'show', show)
+    monkeypatch.setattr(go.Figure, 'show', show)
+
+
+def _render_bars(path, heights):
+    """Worker job for render_in_processes: write a bar chart and report the worker's backend."""
+    fig = create_figure((2, 2), headless=True)
+    fig.add_subplot(111).bar(range(len(heights)), heights)
+    finish_figure(fig, path)
+    return matplotlib.get_backend().lower(), os.getpid()
+
+
+def test_use_headless_backend_switches_to_agg():
+    code = ("import matplotlib; matplotlib.use('svg'); "
+            "from ramiviz.render import use_headless_backend; use_headless_backend(); "
+            "print(matplotlib.get_backend())")
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip().lower() == 'agg'
+    use_headless_backend()
+    assert matplotlib.get_backend().lower() == 'agg'
+
+
+def test_headless_figure_is_not_managed_by_pyplot():
+    before = plt.get_fignums()
+
+    fig = create_figure((3, 2), headless=True)
+
+    assert type(fig) is Figure
+    assert tuple(fig.get_size_inches()) == (3, 2)
+    assert plt.get_fignums() == before
+    managed = create_figure((3, 2))
+    assert managed.number in plt.get_fignums()
+    plt.close(managed)
+
+
+@pytest.mark.parametrize('extension', sorted(SIGNATURES))
+def test_finish_figure_writes_matplotlib_formats(tmp_path, no_window, extension):
+    fig = create_figure((2, 2), headless=True)
+    fig.add_subplot(111).plot([0, 1], [1, 0])
+    path = tmp_path / f"figure{extension}"
+
+    assert finish_figure(fig, str(path)) is fig
+
+    assert path.read_bytes().startswith(SIGNATURES[extension])
+
+
+def test_finish_figure_writes_plotly_html(tmp_path, no_window):
+    fig = go.Figure(go.Scatter3d(x=[0, 1], y=[0, 1], z=[0, 1]))
+    path = tmp_path / 'figure.html'
+
+    assert finish_figure(fig, str(path)) is fig
+
+    assert '<html>' in path.read_text()
+
+
+def test_finish_figure_shows_without_a_path(no_window):
+    with pytest.raises(AssertionError, match="shown"):
+        finish_figure(create_figure((2, 2), headless=True))
+
+
+def test_render_in_processes_writes_every_figure_headless(tmp_path):
+    jobs = [(str(tmp_path / f"bars{k}.png"), [1, k, 3]) for k in range(4)]
+
+    results = render_in_processes(_render_bars, jobs, processes=2)
+
+    assert [backend for backend, _ in results] == ['agg'] * len(jobs)
+    assert os.getpid() not in {pid for _, pid in results}
+    for path, _ in jobs:
+        with open(path, 'rb') as file:
+            assert file.read(4) == SIGNATURES['.png']
@@ -0,0 +1,88 @@
+"""
+Tests for streaming model reading and writing (ramiviz/streaming.py).
+"""
+import json
+
+import pytest
+
+from ramiviz import streaming
+from ramiviz.streaming import iter_interactions, iter_items, iter_microsystems, load_model, write_items, write_model
+from ramiviz.synthetic import generate_dataset
+
+MODEL = {
+    'microsystems': [
+        {'id': 'A', 'provides': ["Order \"Data\"", "ü"], 'coordinates': {'X': 1, 'Y': 2.5, 'Z': None}},
+        {'id': 'B', 'provides': [], 'flags': [True, False, -1.5e-3, {}]},
+    ],
+    'interactions': [{'source_id': 'A', 'target_id': 'B', 'services': ["Order \"Data\""]}],
+}
+
+
+@pytest.fixture(params=['ijson', 'scanner'])
+def reader(request, monkeypatch):
+    # Run every reading test with and without ijson
+    if request.param == 'scanner':
+        monkeypatch.setattr(streaming, 'ijson', None)
+    elif streaming.ijson is None:
+        pytest.skip("ijson is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize('indent', [None, 4])
+def test_write_model_writes_what_json_dump_writes(tmp_path, indent):
+    path = tmp_path / 'model.json'
+
+    counts = write_model(str(path), {name: iter(items) for name, items in MODEL.items()}, indent=indent)
+
+    assert counts == {'microsystems': 2, 'interactions': 1}
+    assert path.read_text() == json.dumps(MODEL, indent=indent)
+    write_model(str(path), {'microsystems': [], 'interactions': []}, indent=indent)
+    assert path.read_text() == json.dumps({'microsystems': [], 'interactions': []}, indent=indent)
+
+
+@pytest.mark.parametrize('name', ['model.json', 'model.jsonl'])
+def test_model_round_trip(tmp_path, reader, name):
+    path = str(tmp_path / name)
+
+    write_model(path, MODEL)
+
+    assert list(iter_microsystems(path)) == MODEL['microsystems']
+    assert list(iter_interactions(path)) == MODEL['interactions']
+    assert load_model(path) == MODEL
+
+
+def test_scanner_reads_items_across_chunk_boundaries(tmp_path, monkeypatch):
+    monkeypatch.setattr(streaming, 'ijson', None)
+    model = generate_dataset(200, seed=4)['model']
+    path = str(tmp_path / 'model.json')
+    write_model(path, model, indent=2)
+
+    for chunk_size in (1, 7, 4096):
+        assert list(iter_microsystems(path, chunk_size=chunk_size)) == model['microsystems']
+        assert list(iter_interactions(path, chunk_size=chunk_size)) == model['interactions']
+
+
+@pytest.mark.parametrize('name', ['mapped.json', 'mapped.jsonl'])
+def test_bare_arrays_round_trip(tmp_path, reader, name):
+    path = str(tmp_path / name)
+
+    assert write_items(path, iter(MODEL['microsystems'])) == 2
+
+    assert list(iter_items(path, 'microsystems')) == MODEL['microsystems']
+    assert load_model(path) == MODEL['microsystems']
+
+
+def test_missing_array_yields_nothing(tmp_path, reader):
+    path = str(tmp_path / 'model.json')
+    write_model(path, {'microsystems': MODEL['microsystems']})
+
+    assert list(iter_interactions(path)) == []
+
+
+def test_malformed_document_raises_value_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(streaming, 'ijson', None)
+    path = tmp_path / 'model.json'
+    path.write_text('{"microsystems": [{"id": "A"}, {"id": }]}')
+
+    with pytest.raises(ValueError):
+        list(iter_microsystems(str(path)))
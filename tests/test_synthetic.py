@@ -0,0 +1,62 @@
+"""
+Tests for the synthetic dataset generator (ramiviz/synthetic.py) and the DSL it writes.
+"""
+import json
+
+import pytest
+
+from alg1.alg1 import decode_document
+from ramiviz.dsl import load_dsl, write_dsl
+from ramiviz.pipeline import load_pipeline_config, run_pipeline
+from ramiviz.synthetic import generate_dataset, size_of, write_dataset
+
+
+def test_same_seed_gives_same_dataset():
+    assert generate_dataset(200, seed=3) == generate_dataset(200, seed=3)
+    assert generate_dataset(200, seed=3)['model'] != generate_dataset(200, seed=4)['model']
+
+
+def test_size_of_rejects_unknown_sizes():
+    assert size_of("10k") == 10000
+    assert size_of("250") == 250
+    with pytest.raises(ValueError):
+        size_of("huge")
+    with pytest.raises(ValueError):
+        size_of(0)
+
+
+def test_written_dsl_decodes_to_the_model(tmp_path):
+    model = generate_dataset(150, seed=2)['model']
+    path = str(tmp_path / 'model.dsl')
+
+    counts = write_dsl(path, model)
+    decoded, errors = decode_document(path, None)
+
+    assert counts == {'microsystems': 150, 'interactions': len(model['interactions'])}
+    assert errors == []
+    assert decoded == model
+    assert load_dsl(path) == model
+
+
+def test_write_dsl_quotes_names_and_nested_values(tmp_path):
+    model = {'microsystems': [{'id': 'A', 'coordinates': {'X': 1, 'Y': 2.5}, 'odd key': None, 'note': 'a "b"'}]}
+    path = str(tmp_path / 'model.dsl')
+
+    write_dsl(path, model)
+
+    assert load_dsl(path) == dict(model, interactions=[])
+    with pytest.raises(ValueError):
+        write_dsl(path, {'components': []})
+
+
+def test_dsl_dataset_runs_algorithm_1_in_pipeline(tmp_path):
+    dataset = generate_dataset(120, seed=1)
+    config_path = write_dataset(dataset, str(tmp_path), dsl=True)
+    with open(config_path) as file:
+        assert json.load(file)['input'] == 'model.dsl'
+
+    config = load_pipeline_config(config_path)
+    config['stages'] = ['validate']
+    state = run_pipeline(config)
+
+    assert state['model'] == dataset['model']
@@ -0,0 +1,86 @@
+"""
+Tests for the stage instrumentation (ramiviz/trace.py) and its use in the pipeline.
+"""
+import json
+
+import numpy as np
+import pytest
+
+from ramiviz import trace
+from ramiviz.pipeline import load_pipeline_config, run_pipeline
+from ramiviz.synthetic import generate_dataset, write_dataset
+
+
+@pytest.fixture(autouse=True)
+def tracing_off():
+    trace.disable()
+    yield
+    trace.disable()
+
+
+@trace.traced
+def _double(value):
+    trace.count('doubled')
+    return 2 * value
+
+
+def test_disabled_tracing_records_nothing():
+    with trace.span('alg.stage') as span:
+        span.set(size=1)
+        trace.count('items', 3)
+
+    assert _double(2) == 4
+    assert not trace.is_enabled()
+    assert trace.recorder() is None
+    assert trace.write_trace('unused.json') is None
+
+
+def test_counters_roll_up_into_enclosing_spans():
+    recorder = trace.enable()
+
+    with trace.span('pipeline.map', n=2):
+        assert _double(1) == 2
+        assert _double(2) == 4
+        trace.count('mapped', 5)
+    with pytest.raises(RuntimeError):
+        with trace.span('pipeline.filter'):
+            raise RuntimeError
+
+    spans = {event['name']: event for event in recorder.events if event['ph'] == 'X'}
+    assert spans['pipeline.map']['args']['doubled'] == 2
+    assert spans['pipeline.map']['args']['mapped'] == 5
+    assert spans['pipeline.map']['args']['n'] == 2
+    assert spans['pipeline.map']['cat'] == 'pipeline'
+    assert spans['pipeline.filter']['args']['error'] == 'RuntimeError'
+    summary = recorder.summary()
+    assert summary['spans']['test_trace._double']['calls'] == 2
+    assert summary['spans']['test_trace._double']['doubled'] == 2
+    assert summary['counters'] == {'doubled': 2, 'mapped': 5}
+
+
+def test_memory_tracing_reports_the_peak_of_each_span():
+    recorder = trace.enable(memory=True)
+
+    with trace.span('outer'):
+        with trace.span('inner'):
+            block = np.ones(1 << 20)
+            del block
+
+    spans = {event['name']: event['args'] for event in recorder.events if event['ph'] == 'X'}
+    assert spans['inner']['peak_allocated_bytes'] >= 8 << 20
+    assert spans['outer']['peak_allocated_bytes'] >= spans['inner']['peak_allocated_bytes']
+
+
+def test_pipeline_writes_a_chrome_trace(tmp_path):
+    config_path = write_dataset(generate_dataset(100, seed=2), str(tmp_path))
+    config = load_pipeline_config(config_path)
+    config.update(stages=['validate', 'map', 'filter'], trace='out/trace.json')
+
+    state = run_pipeline(config)
+
+    with open(tmp_path / 'out' / 'trace.json') as file:
+        events = json.load(file)['traceEvents']
+    names = {event['name'] for event in events if event['ph'] == 'X'}
+    assert {'pipeline.validate', 'pipeline.map', 'pipeline.filter', 'alg2.map_to_rami_axes'} <= names
+    assert state['trace']['counters']['microsystems_mapped'] == 100
+    assert not trace.is_enabled()